@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+"""
+Micro-benchmark of the pure-python rpm header reader in osc.util.rpmquery.
+
+Run it on a corpus of real rpms, for example on the package cache of osc build:
+
+    ./contrib/benchmark_rpmquery.py /var/tmp/osbuild-packagecache/
+"""
+
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from osc.util.rpmquery import RpmError  # noqa: E402
+from osc.util.rpmquery import RpmQuery  # noqa: E402
+
+
+def find_rpms(paths):
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                result.extend(os.path.join(root, i) for i in files if i.endswith(".rpm"))
+        else:
+            result.append(path)
+    return sorted(result)
+
+
+def query(path):
+    RpmQuery.query(path)
+
+
+def query_canonname(path):
+    # what Fetcher.move_package() needs
+    RpmQuery.query(path).canonname()
+
+
+def query_deps(path):
+    # what get_prefer_pkgs() needs
+    rpmq = RpmQuery.query(path)
+    rpmq.name()
+    rpmq.version()
+    rpmq.release()
+    rpmq.arch()
+    rpmq.provides()
+    rpmq.requires()
+
+
+def queryhdrmd5(path):
+    RpmQuery.queryhdrmd5(path)
+
+
+BENCHMARKS = {
+    "query": query,
+    "canonname": query_canonname,
+    "deps": query_deps,
+    "hdrmd5": queryhdrmd5,
+}
+
+
+def run_benchmark(func, rpms, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in rpms:
+            func(path)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reading rpm headers")
+    parser.add_argument("paths", nargs="+", help="rpm files or directories searched for rpm files recursively")
+    parser.add_argument("-r", "--rounds", type=int, default=5, help="number of rounds, the best one is reported (default: 5)")
+    parser.add_argument("-b", "--benchmark", action="append", choices=sorted(BENCHMARKS), help="run only the specified benchmarks")
+    args = parser.parse_args()
+
+    rpms = []
+    for path in find_rpms(args.paths):
+        try:
+            RpmQuery.query(path)
+        except (RpmError, OSError) as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            continue
+        rpms.append(path)
+
+    if not rpms:
+        parser.error("No rpms found")
+
+    print(f"{len(rpms)} rpms, best of {args.rounds} rounds")
+    for name in args.benchmark or BENCHMARKS:
+        duration = run_benchmark(BENCHMARKS[name], rpms, args.rounds)
+        print(f"{name:>10}: {duration:8.3f} s total, {duration / len(rpms) * 10**6:10.1f} us per rpm")
+
+
+if __name__ == "__main__":
+    main()
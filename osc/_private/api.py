@@ -97,6 +97,41 @@ def put(apiurl, path, query=None, data=None):
     return root
 
 
+async def async_get(apiurl, path, query=None, client=None):
+    """
+    Send a GET request to OBS from a coroutine.
+    The request and parsing the response run in a worker thread of the ``client``.
+
+    :param client: ``osc.connection_async.AsyncClient`` instance, the default client is used if not specified.
+    :returns: Parsed XML root.
+    :rtype:   xml.etree.ElementTree.Element
+    """
+    from .. import connection_async
+
+    client = client or connection_async.get_client()
+    return await client.run(get, apiurl, path, query)
+
+
+async def async_post(apiurl, path, query=None, client=None):
+    """
+    Send a POST request to OBS from a coroutine, see ``async_get()``.
+    """
+    from .. import connection_async
+
+    client = client or connection_async.get_client()
+    return await client.run(post, apiurl, path, query)
+
+
+async def async_put(apiurl, path, query=None, data=None, client=None):
+    """
+    Send a PUT request to OBS from a coroutine, see ``async_get()``.
+    """
+    from .. import connection_async
+
+    client = client or connection_async.get_client()
+    return await client.run(put, apiurl, path, query, data)
+
+
 def _to_xpath(*args):
     """
     Convert strings and dictionaries to xpath:
@@ -22,6 +22,7 @@ from . import conf
 from . import connection
 from . import core
 from . import oscerr
+from . import pkgcache
 from .core import get_buildinfo, meta_exists, get_buildconfig, dgst
 from .core import get_binarylist, get_binary_file, run_external, return_external, raw_input
 from .fetch import Fetcher, OscFileGrabber, verify_pacs
@@ -29,6 +30,7 @@ from .meter import create_text_meter
 from .util import cpio
 from .util import archquery, debquery, packagequery, rpmquery
 from .util import repodata
+from .util import xdg
 from .util.helper import decode_it
 from .util.models import *
 from .util.xml import xml_parse
@@ -543,6 +545,12 @@ def get_preinstall_image(apiurl, arch, cache_dir, img_info, offline=False):
     imagesource = "%s/%s/%s [%s]" % (img_project, img_repository, img_pkg, img_hdrmd5)
     imageinfo = info_file_path
 
+    progress_obj = None
+    if sys.stdout.isatty():
+        progress_obj = create_text_meter(use_pb_fallback=False)
+    gr = OscFileGrabber(progress_obj=progress_obj)
+
+    image_downloaded = False
     if not os.path.exists(ifile_path):
         if offline:
             return "", "", "", []
@@ -555,15 +563,12 @@ def get_preinstall_image(apiurl, arch, cache_dir, img_info, offline=False):
                 print('packagecachedir is not writable for you?', file=sys.stderr)
                 print(e, file=sys.stderr)
                 sys.exit(1)
-        progress_obj = None
-        if sys.stdout.isatty():
-            progress_obj = create_text_meter(use_pb_fallback=False)
-        gr = OscFileGrabber(progress_obj=progress_obj)
         with NamedTemporaryFile(dir=cache_path, delete=False) as temp_file:
             try:
                 gr.urlgrab(url, filename=temp_file.name, text="fetching image")
                 # download ok, rename temp file to final file name
                 os.rename(temp_file.name, ifile_path)
+                image_downloaded = True
             except HTTPError as e:
                 print("Failed to download! ecode:%i reason:%s" % (e.code, e.reason))
                 # Clean up temp file if it still exists
@@ -571,24 +576,49 @@ def get_preinstall_image(apiurl, arch, cache_dir, img_info, offline=False):
                     os.unlink(temp_file.name)
                 return ("", "", "", [])
 
-        # Also download the corresponding .info file
-        if not os.path.exists(info_file_path):
-            info_url = "%s/build/%s/%s/%s/%s/%s" % (apiurl, img_project, img_repository, img_arch, img_pkg, info_file)
-            print("downloading preinstall image info file")
-            with NamedTemporaryFile(dir=cache_path, delete=False) as temp_file:
-                try:
-                    gr.urlgrab(info_url, filename=temp_file.name, text="fetching image info")
-                    # download ok, rename temp file to final file name
-                    os.rename(temp_file.name, info_file_path)
-                except HTTPError as e:
-                    print("Failed to download info file! ecode:%i reason:%s" % (e.code, e.reason))
-                    # Clean up temp file if it still exists
-                    if os.path.exists(temp_file.name):
-                        os.unlink(temp_file.name)
+    # Also download the corresponding .info file, either with a new image
+    # or again if it was removed from the cache
+    if not offline and (image_downloaded or not os.path.exists(info_file_path)):
+        info_url = "%s/build/%s/%s/%s/%s/%s" % (apiurl, img_project, img_repository, img_arch, img_pkg, info_file)
+        print("downloading preinstall image info file")
+        with NamedTemporaryFile(dir=cache_path, delete=False) as temp_file:
+            try:
+                gr.urlgrab(info_url, filename=temp_file.name, text="fetching image info")
+                # download ok, rename temp file to final file name
+                os.rename(temp_file.name, info_file_path)
+            except HTTPError as e:
+                print("Failed to download info file! ecode:%i reason:%s" % (e.code, e.reason))
+                # Clean up temp file if it still exists
+                if os.path.exists(temp_file.name):
+                    os.unlink(temp_file.name)
+
+    if not os.path.exists(info_file_path):
+        # never pass a path to a missing file to the build script
+        imageinfo = ""
+
+    # record the use of the image for the garbage collection of the cache
+    index = pkgcache.PackageCacheIndex(cache_dir)
+    index.touch([ifile_path], kind="preinstallimage")
+    if imageinfo:
+        # the info file is not an image, it must not compete with the images in the same directory
+        index.touch([imageinfo])
+    index.close()
 
     return (imagefile, imagesource, imageinfo, img_bins)
 
 
+def collect_package_cache_garbage(apiurl, cache_dir, keep=()):
+    """
+    Enforce the ``package_cache_size`` budget of the package cache of ``apiurl``.
+    """
+    max_size = conf.config["api_host_options"][apiurl]["package_cache_size"]
+    if not max_size:
+        return
+    result = pkgcache.collect_garbage(cache_dir, max_size * 1024**2, keep=keep)
+    if result.removed:
+        print(f"Removed {len(result.removed)} files ({result.freed / 1024**2:.1f} MiB) from the package cache {cache_dir}")
+
+
 def get_built_files(pacdir, buildtype, *, binary_type: Optional[str] = None) -> Tuple[str, str]:
     build_type = get_build_type(buildtype, binary_type=binary_type)
     sources = build_type.get_sources(pacdir)
@@ -613,8 +643,72 @@ def get_repo(path):
     return None
 
 
+# don't start processes for querying just a few packages
+PREFER_PKGS_MIN_PER_JOB = 20
+
+
+def _query_prefer_pkg(path):
+    """
+    Return a tuple with ``PackageQuerySnapshot`` of the package and a flag indicating a failure.
+    It runs in worker processes; the errors are not returned because ``PackageError`` cannot be pickled.
+    """
+    try:
+        return packagequery.query_snapshot(path), False
+    except Exception:
+        return None, True
+
+
+def query_prefer_pkgs(paths_by_dir, jobs=None):
+    """
+    Return ``PackageQuerySnapshot`` objects of the packages in the order of the paths.
+
+    Packages that haven't changed since the previous run are taken from a ``PackageCacheIndex``,
+    the remaining packages are queried in ``jobs`` processes.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    cache_dir = os.path.join(os.path.expanduser(xdg.XDG_CACHE_HOME), "osc", "prefer-pkgs")
+    index = pkgcache.PackageCacheIndex(cache_dir)
+    results = {}
+    missing = []
+
+    for paths in paths_by_dir.values():
+        for path in paths:
+            snapshot = index.get_snapshot(path)
+            if snapshot is None:
+                missing.append(path)
+            else:
+                results[path] = snapshot
+
+    if missing:
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = max(1, min(jobs, len(missing) // PREFER_PKGS_MIN_PER_JOB))
+        if jobs == 1:
+            query_results = [_query_prefer_pkg(path) for path in missing]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                chunksize = max(1, len(missing) // (jobs * 4))
+                query_results = list(executor.map(_query_prefer_pkg, missing, chunksize=chunksize))
+
+        snapshots = []
+        for path, (snapshot, failed) in zip(missing, query_results):
+            if failed:
+                # query the package again to raise the original error
+                snapshot = packagequery.query_snapshot(path)
+            results[path] = snapshot
+            if snapshot is not None:
+                snapshots.append((path, snapshot))
+        index.add_snapshots(snapshots)
+
+    index.prune_snapshots()
+    index.close()
+
+    return [results[path] for paths in paths_by_dir.values() for path in paths if results[path] is not None]
+
+
 def get_prefer_pkgs(dirs, wanted_arch, type, cpio):
-    paths = []
+    paths_by_dir = {}
     repositories = []
 
     for pkgs_dir in dirs:
@@ -636,17 +730,17 @@ def get_prefer_pkgs(dirs, wanted_arch, type, cpio):
                                 use_package = False
                                 break
                         if use_package:
-                            paths.append(pkg_path)
+                            # the patterns may overlap, a dict keeps the order and drops the duplicates
+                            paths_by_dir.setdefault(pkgs_dir, {})[pkg_path] = None
 
     packageQueries = packagequery.PackageQueries(wanted_arch)
 
     for repository in repositories:
-        repodataPackageQueries = repodata.queries(repository)
-        for packageQuery in repodataPackageQueries:
+        for packageQuery in repodata.iter_queries(repository, wanted_arch):
             packageQueries.add(packageQuery)
 
-    for path in paths:
-        packageQuery = packagequery.PackageQuery.query(path)
+    paths_by_dir = {pkgs_dir: list(paths) for pkgs_dir, paths in paths_by_dir.items()}
+    for packageQuery in query_prefer_pkgs(paths_by_dir):
         packageQueries.add(packageQuery)
 
     prefer_pkgs = {decode_it(name): packageQuery.path()
@@ -1278,7 +1372,8 @@ def main(apiurl, store, opts, argv):
                       modules=bi.modules,
                       enable_cpio=not opts.disable_cpio_bulk_download and bi.enable_cpio,
                       cookiejar=connection.CookieJarAuthHandler(apiurl, os.path.expanduser(config["cookiejar"]))._cookiejar,
-                      download_api_only=opts.download_api_only)
+                      download_api_only=opts.download_api_only,
+                      download_jobs=opts.download_jobs or config.download_jobs)
 
     if not opts.trust_all_projects:
         # implicitly trust the project we are building for
@@ -1565,7 +1660,7 @@ def main(apiurl, store, opts, argv):
             print('Skipping verification of package signatures')
         else:
             print('Verifying integrity of cached packages')
-            verify_pacs(bi)
+            verify_pacs(bi, index=fetcher.header_index)
     elif bi.pacsuffix == 'deb':
         if opts.no_verify or opts.noinit:
             print('Skipping verification of package signatures')
@@ -1579,7 +1674,7 @@ def main(apiurl, store, opts, argv):
             if i.name.startswith('container:') or i.binary == 'updateinfo.xml' or i.binary == '_modulemd.yaml':
                 hdrmd5 = dgst(i.fullfilename)
             elif i.fullfilename.endswith(".rpm"):
-                hdrmd5 = packagequery.PackageQuery.queryhdrmd5(i.fullfilename)
+                hdrmd5 = fetcher.header_index.get_hdrmd5(i.fullfilename)
             else:
                 continue
             if not hdrmd5:
@@ -1710,13 +1805,18 @@ def main(apiurl, store, opts, argv):
             print("Cleaning the build root may fix the problem or allow you to start debugging from a well-defined state:")
             print("  - add '--clean' option to your 'osc build' command")
             print("  - run 'osc wipe [--vm-type=...]' prior running your 'osc build' command again")
-            sys.exit(rc)
     except KeyboardInterrupt as keyboard_interrupt_exception:
         print("keyboard interrupt, killing build ...")
         cmd.append('--kill')
         run_external(cmd[0], *cmd[1:])
         raise keyboard_interrupt_exception
 
+    # the files used by the build root must stay in the cache
+    keep = [i.fullfilename for i in bi.deps] + [i for i in (imagefile, imageinfo) if i]
+    collect_package_cache_garbage(apiurl, cache_dir, keep=keep)
+    if rc:
+        sys.exit(rc)
+
     pacdir = os.path.join(build_root, '.build.packages')
     if os.path.islink(pacdir):
         pacdir = os.readlink(pacdir)
@@ -20,7 +20,7 @@ import textwrap
 import tempfile
 import time
 import traceback
-from functools import cmp_to_key
+from functools import cmp_to_key, partial
 from operator import itemgetter
 from pathlib import Path
 from tempfile import NamedTemporaryFile
@@ -5481,6 +5481,8 @@ Please submit there instead, or use --nodevelproject to force direct submission.
                         help='Skip all files with a given size')
     @cmdln.option('--native-obs-package', action='store_true',
                         help='Do not clone native scm repositories: Different representation and you will not be able to submit changes!')
+    @cmdln.option('-j', '--jobs', metavar='N', type=int, default=1,
+                        help='Check out N packages of a project in parallel (ignored with --source-service-files)')
     @cmdln.alias('co')
     def do_checkout(self, subcmd, opts, *args):
         """
@@ -5510,6 +5512,7 @@ Please submit there instead, or use --nodevelproject to force direct submission.
         """
 
         from . import conf
+        from .connection import set_pool_maxsize
         from .core import ET
         from .core import Linkinfo
         from .core import Project
@@ -5629,15 +5632,15 @@ Please submit there instead, or use --nodevelproject to force direct submission.
             if scm_url is not None:
                 return
 
-            # all packages
-            for package in meta_get_packagelist(apiurl, project):
-                if opts.output_dir is not None:
-                    outputdir = os.path.join(opts.output_dir, package)
-                    if not os.path.exists(opts.output_dir):
-                        os.mkdir(os.path.join(opts.output_dir))
-                else:
-                    outputdir = None
+            # share a single project object, so the concurrent checkouts don't overwrite
+            # each other's changes of the package list
+            prj_obj = Project(prj_dir, getPackageList=False)
 
+            if opts.output_dir is not None:
+                if not os.path.exists(opts.output_dir):
+                    os.mkdir(os.path.join(opts.output_dir))
+
+            def checkout_project_package(package, progress_obj):
                 # don't check out local links by default
                 try:
                     m = show_files_meta(apiurl, project, package)
@@ -5646,15 +5649,15 @@ Please submit there instead, or use --nodevelproject to force direct submission.
                     if not li.haserror():
                         if li.project == project:
                             print(statfrmt('S', package + " link to package " + li.package))
-                            continue
+                            return False
                 except:
                     pass
 
                 try:
                     checkout_package(apiurl, project, package, expand_link=expand_link,
-                                     prj_dir=prj_dir, service_files=opts.source_service_files,
+                                     prj_dir=prj_dir, prj_obj=prj_obj, service_files=opts.source_service_files,
                                      server_service_files=opts.server_side_source_service_files,
-                                     progress_obj=self.download_progress, size_limit=opts.limit_size,
+                                     progress_obj=progress_obj, size_limit=opts.limit_size,
                                      meta=opts.meta, native_obs_package=opts.native_obs_package,
                                      linkrev=opts.linkrev)
                 except oscerr.LinkExpandError as e:
@@ -5662,10 +5665,23 @@ Please submit there instead, or use --nodevelproject to force direct submission.
                     print('Use "osc repairlink" for fixing merge conflicts:\n', file=sys.stderr)
                     # check out in unexpanded form at least
                     checkout_package(apiurl, project, package, expand_link=False,
-                                     prj_dir=prj_dir, service_files=opts.source_service_files,
+                                     prj_dir=prj_dir, prj_obj=prj_obj, service_files=opts.source_service_files,
                                      server_service_files=opts.server_side_source_service_files,
-                                     progress_obj=self.download_progress, size_limit=opts.limit_size,
+                                     progress_obj=progress_obj, size_limit=opts.limit_size,
                                      meta=opts.meta, native_obs_package=opts.native_obs_package)
+                return True
+
+            # all packages
+            packages = meta_get_packagelist(apiurl, project)
+            # source services change the working directory of the whole process, they can't run concurrently
+            if opts.jobs > 1 and len(packages) > 1 and not opts.source_service_files:
+                set_pool_maxsize(opts.jobs)
+                # progress bars of concurrent downloads would overwrite each other
+                tasks = [(package, partial(checkout_project_package, package, None)) for package in packages]
+                prj_obj.run_checkout_tasks(tasks, opts.jobs)
+            else:
+                for package in packages:
+                    checkout_project_package(package, self.download_progress)
             if os.isatty(sys.stdout.fileno()):
                 print_request_list(apiurl, project)
 
@@ -6086,6 +6102,8 @@ Please submit there instead, or use --nodevelproject to force direct submission.
                         help='Use server side generated sources instead of local generation.')
     @cmdln.option('-l', '--limit-size', metavar='limit_size',
                         help='Skip all files with a given size')
+    @cmdln.option('-j', '--jobs', metavar='N', type=int, default=1,
+                        help='Update N packages of a project working copy in parallel')
     @cmdln.alias('up')
     def do_update(self, subcmd, opts, *args):
         """
@@ -6146,7 +6164,8 @@ Please submit there instead, or use --nodevelproject to force direct submission.
 
                 if conf.config['do_package_tracking']:
                     prj.update(expand_link=opts.expand_link,
-                               unexpand_link=opts.unexpand_link)
+                               unexpand_link=opts.unexpand_link,
+                               jobs=opts.jobs)
                     args.remove(arg)
                 else:
                     # if not tracking package, and 'update' is run inside a project dir,
@@ -7751,6 +7770,8 @@ Please submit there instead, or use --nodevelproject to force direct submission.
                   dest='disable_cpio_bulk_download', help=argparse.SUPPRESS)
     @cmdln.option('--download-api-only', action='store_true',
                   help='only fetch packages from the api')
+    @cmdln.option('--download-jobs', metavar='N', type=int,
+                  help='download N packages in parallel (overrides download_jobs from oscrc)')
     @cmdln.option('--oldpackages', metavar='DIR',
                   help='take previous build from DIR (special values: _self, _link)')
     @cmdln.option('--verbose-mode', metavar='MODE',
@@ -1,8 +1,15 @@
 import argparse
+import functools
 import glob
+import json
 import os
 import subprocess
 import sys
+import threading
+import time
+from typing import Callable
+from typing import List
+from typing import Optional
 
 import osc.commandline_common
 import osc.commands_git
@@ -79,6 +86,46 @@ class BooleanAction(argparse.Action):
             raise argparse.ArgumentError(self, f"Invalid boolean value: {value}")
 
 
+class RateLimiter:
+    """
+    Let at most ``rate`` operations start per second.
+    The value ``0`` disables the limit.
+    """
+
+    def __init__(self, rate: float = 0):
+        self.interval = 1 / rate if rate else 0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class BatchResult:
+    def __init__(self, pr_id: str, exception: Optional[Exception] = None):
+        self.pr_id = pr_id
+        self.exception = exception
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+    def dict(self):
+        return {
+            "id": self.pr_id,
+            "ok": self.ok,
+            "error": str(self.exception) if self.exception else None,
+            "status": getattr(self.exception, "status", None),
+        }
+
+
 class GitObsCommand(osc.commandline_common.Command):
     @property
     def gitea_conf(self):
@@ -104,6 +151,15 @@ class GitObsCommand(osc.commandline_common.Command):
     def gitea_conn(self, value):
         self.main_command.gitea_conn = value
 
+    @property
+    def git_mirror(self):
+        """
+        ``GitMirror`` configured with the ``git_mirror_dir`` option or ``None``.
+        """
+        from . import gitea_api
+
+        return gitea_api.GitMirror.from_login(self.gitea_conf, self.gitea_login)
+
     @property
     def quiet(self):
         if self.main_command._args.quiet:
@@ -142,6 +198,82 @@ class GitObsCommand(osc.commandline_common.Command):
             **kwargs,
         )
 
+    def add_argument_batch(self):
+        """
+        Add arguments that control ``run_batch()``.
+        """
+        self.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of pull requests processed at the same time. Default: 1",
+        )
+        self.add_argument(
+            "--rate-limit",
+            type=float,
+            default=0,
+            metavar="OPS",
+            help="Start at most OPS operations per second. Default: no limit",
+        )
+        self.add_argument(
+            "--summary-json",
+            action="store_true",
+            help="Print the summary of the processed pull requests as json to stdout",
+        )
+
+    def run_batch(self, args, pr_ids: List[str], func: Callable[[str, str, int], None]) -> List[BatchResult]:
+        """
+        Run ``func(owner, repo, number)`` for all ``pr_ids`` according to the ``add_argument_batch()`` arguments,
+        concurrently if more than one job is requested.
+
+        The output of each operation is printed in the order of ``pr_ids``,
+        to stderr if ``--summary-json`` is specified so stdout contains only valid json.
+        Failed operations are reported on stderr and don't stop the remaining ones.
+        Finally, a summary is printed and the process exits with ``1`` if any of the operations has failed.
+        """
+        from . import gitea_api
+        from .output import tty
+        from .util.parallel import run_tasks_and_report
+
+        jobs = max(1, args.jobs)
+        # each job needs a connection to send requests at the same time
+        self.gitea_conn.pool_size = max(self.gitea_conn.pool_size, jobs)
+        rate_limiter = RateLimiter(args.rate_limit)
+
+        def task(owner, repo, number):
+            rate_limiter.wait()
+            return func(owner, repo, number)
+
+        tasks = []
+        for pr_id in pr_ids:
+            owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
+            tasks.append((pr_id, functools.partial(task, owner, repo, number)))
+
+        # stdout is reserved for the json summary
+        output = sys.stderr if args.summary_json else sys.stdout
+
+        task_results = run_tasks_and_report(tasks, jobs, error_prefix=f"{tty.colorize('ERROR', 'red,bold')}: ", output=output)
+        results = [BatchResult(i.name, i.exception) for i in task_results]
+
+        failed = [i for i in results if not i.ok]
+        if args.summary_json:
+            summary = {
+                "total": len(results),
+                "succeeded": len(results) - len(failed),
+                "failed": len(failed),
+                "results": [i.dict() for i in results],
+            }
+            print(json.dumps(summary, indent=4))
+        print(f"Total pull requests: {len(results)}, succeeded: {len(results) - len(failed)}, failed: {len(failed)}", file=sys.stderr)
+        if failed:
+            print(
+                f"{tty.colorize('ERROR', 'red,bold')}: The following pull requests have failed: {', '.join(i.pr_id for i in failed)}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        return results
+
     def add_argument_owner_repo_branch(self, *args, **kwargs):
         owner_optional = kwargs.pop("owner_optional", False)
         repo_optional = kwargs.pop("repo_optional", False)
@@ -344,7 +476,8 @@ class GitObsMainCommand(osc.commandline_common.MainCommand):
         from . import gitea_api
 
         if self._gitea_conn is None:
-            self._gitea_conn = gitea_api.Connection(self.gitea_login)
+            cache = gitea_api.GiteaHttpCache.from_login(self.gitea_conf, self.gitea_login)
+            self._gitea_conn = gitea_api.Connection(self.gitea_login, cache=cache)
             assert self._gitea_login is not None
         return self._gitea_conn
 
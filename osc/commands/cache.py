@@ -0,0 +1,12 @@
+import osc.commandline
+
+
+class CacheCommand(osc.commandline.OscCommand):
+    """
+    Manage the local package cache
+    """
+
+    name = "cache"
+
+    def run(self, args):
+        pass
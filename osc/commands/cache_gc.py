@@ -0,0 +1,46 @@
+import osc.commandline
+
+
+class CacheGcCommand(osc.commandline.OscCommand):
+    """
+    Remove stale and least recently used files from the package cache
+
+    The cache of the apiurl is shrunk to the size budget from the 'package_cache_size' option.
+    Only the most recently used preinstall image is kept in each repository.
+    """
+
+    name = "gc"
+    parent = "CacheCommand"
+
+    def init_arguments(self):
+        self.add_argument(
+            "--max-size",
+            metavar="MIB",
+            type=int,
+            help="Size budget in MiB, overrides the 'package_cache_size' option; 0 removes only stale preinstall images",
+        )
+        self.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the files that would be removed",
+        )
+
+    def run(self, args):
+        from urllib.parse import urlsplit
+
+        from .. import conf
+        from .. import pkgcache
+
+        max_size = args.max_size
+        if max_size is None:
+            max_size = conf.config["api_host_options"][args.apiurl]["package_cache_size"]
+
+        apihost = urlsplit(args.apiurl)[1]
+        cache_dir = conf.config["packagecachedir"] % {"apihost": apihost}
+
+        result = pkgcache.collect_garbage(cache_dir, max_size * 1024**2, dry_run=args.dry_run)
+        for path in result.removed:
+            print(path)
+
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"{action} {len(result.removed)} files ({result.freed / 1024**2:.1f} MiB), {result.size / 1024**2:.1f} MiB remain in {cache_dir}")
@@ -20,17 +20,15 @@ class PullRequestCloseCommand(osc.commandline_git.GitObsCommand):
             "--message",
             help="Text of the comment",
         )
+        self.add_argument_batch()
 
     def run(self, args):
         from osc import gitea_api
 
         self.print_gitea_settings()
 
-        pull_request_ids = args.id
-
-        for pr_index, pr_id in enumerate(pull_request_ids):
-            print(f"Closing {pr_id} ...")
-            owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
+        def close(owner, repo, number):
+            print(f"Closing {owner}/{repo}#{number} ...")
 
             gitea_api.PullRequest.close(
                 self.gitea_conn,
@@ -47,3 +45,5 @@ class PullRequestCloseCommand(osc.commandline_git.GitObsCommand):
                     number,
                     msg=args.message,
                 )
+
+        self.run_batch(args, args.id, close)
@@ -1,3 +1,5 @@
+import sys
+
 import osc.commandline_git
 
 
@@ -20,6 +22,7 @@ class PullRequestCommentCommand(osc.commandline_git.GitObsCommand):
             "--message",
             help="Text of the comment",
         )
+        self.add_argument_batch()
 
     def run(self, args):
         from osc import gitea_api
@@ -50,14 +53,15 @@ class PullRequestCommentCommand(osc.commandline_git.GitObsCommand):
 
         self.print_gitea_settings()
 
-        print(tty.colorize("Message:", "bold"))
-        print(message)
-        print()
+        # stdout is reserved for the json summary
+        output = sys.stderr if args.summary_json else sys.stdout
+        print(tty.colorize("Message:", "bold"), file=output)
+        print(message, file=output)
+        print(file=output)
 
-        for pr_id in pull_request_ids:
-            print(f"Adding a comment to pull request {pr_id} ...")
+        def comment(owner, repo, number):
+            print(f"Adding a comment to pull request {owner}/{repo}#{number} ...")
 
-            owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
             gitea_api.PullRequest.add_comment(
                 self.gitea_conn,
                 owner,
@@ -65,3 +69,5 @@ class PullRequestCommentCommand(osc.commandline_git.GitObsCommand):
                 number,
                 msg=message,
             )
+
+        self.run_batch(args, pull_request_ids, comment)
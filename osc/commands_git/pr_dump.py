@@ -16,6 +16,9 @@ class PullRequestDumpCommand(osc.commandline_git.GitObsCommand):
 
     In addition to the return codes, a STATUS file is written in each target directory,
     the values are: RUNNING, FAILED, SUCCESS
+
+    Pull requests that haven't changed since the last successful dump are skipped
+    and their target directories are left untouched.
     """
     # NOTE: the return codes are according to `git-obs pr review interactive`
 
@@ -45,22 +48,35 @@ class PullRequestDumpCommand(osc.commandline_git.GitObsCommand):
             help="Pull request ID in <owner>/<repo>#<number> format",
         ).completer = complete_checkout_pr
 
+        self.add_argument(
+            "--force",
+            action="store_true",
+            help="Dump the pull requests even if they haven't changed since the last dump",
+        )
+
+        self.add_argument_batch()
+
     def run(self, args):
+        import threading
         from osc import gitea_api
         from osc.output import tty
 
         self.print_gitea_settings()
 
-        skipped = []
-        pull_request_ids = args.id
+        skipped = {}
+        unchanged = []
+        lock = threading.Lock()
+
+        # the same pull request must not be dumped to the same directory concurrently
+        pull_request_ids = list(dict.fromkeys(args.id))
 
-        for pr_id in pull_request_ids:
-            owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
+        def dump(owner, repo, number):
             pr_obj = gitea_api.PullRequest.get(self.gitea_conn, owner, repo, number)
 
             if pr_obj.state != "open":
-                skipped.append(f"{owner}/{repo}#{number}")
-                continue
+                with lock:
+                    skipped[f"{owner}/{repo}#{number}"] = True
+                return
 
             path = args.subdir_fmt.format(
                 owner=owner,
@@ -73,6 +89,11 @@ class PullRequestDumpCommand(osc.commandline_git.GitObsCommand):
             # sanitize path for os.path.join()
             path = path.strip("/")
 
+            if not args.force and self.is_dump_up_to_date(path, pr_obj):
+                with lock:
+                    unchanged.append(f"{owner}/{repo}#{number}")
+                return
+
             def write_status(value: str):
                 os.makedirs(path, exist_ok=True)
                 with open(os.path.join(path, "STATUS"), "w", encoding="utf-8") as f:
@@ -86,12 +107,56 @@ class PullRequestDumpCommand(osc.commandline_git.GitObsCommand):
                 raise
             write_status("SUCCESS")
 
+        self.run_batch(args, pull_request_ids, dump)
+
+        if unchanged:
+            print(f"Skipped pull requests that haven't changed since the last dump: {len(unchanged)}", file=sys.stderr)
+
         if skipped:
-            print(f"{tty.colorize('WARNING', 'yellow,bold')}: Skipped pull requests that were no longer open: {' '.join(skipped)}", file=sys.stderr)
+            # keep the order of the specified pull requests
+            skipped_ids = [f"{owner}/{repo}#{number}" for owner, repo, number in map(gitea_api.PullRequest.split_id, pull_request_ids)]
+            skipped_ids = [i for i in skipped_ids if i in skipped]
+            print(f"{tty.colorize('WARNING', 'yellow,bold')}: Skipped pull requests that were no longer open: {' '.join(skipped_ids)}", file=sys.stderr)
             return 11
 
         return 0
 
+    def is_dump_up_to_date(self, path: str, pr_obj) -> bool:
+        """
+        Determine if a dump of the pull request in ``path`` is complete and matches the current state of the pull request.
+        """
+        import json
+
+        try:
+            with open(os.path.join(path, "STATUS"), encoding="utf-8") as f:
+                if f.read().strip() != "SUCCESS":
+                    return False
+            with open(os.path.join(path, "metadata", "pr.json"), encoding="utf-8") as f:
+                pr_data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            # no or broken local metadata, we can't skip the dump
+            return False
+
+        # dumps created by older versions borrow objects from a mirror that may have been pruned since
+        for checkout in ("base", "head"):
+            alternates_path = os.path.join(path, checkout, ".git", "objects", "info", "alternates")
+            try:
+                with open(alternates_path, encoding="utf-8") as f:
+                    alternates = [i.strip() for i in f if i.strip() and not i.startswith("#")]
+            except FileNotFoundError:
+                continue
+            # relative paths are relative to the objects directory
+            objects_dir = os.path.dirname(os.path.dirname(alternates_path))
+            if not all(os.path.isdir(os.path.join(objects_dir, i)) for i in alternates):
+                return False
+
+        # ``updated_at`` doesn't change on all updates of the branches, compare the commits too
+        return (
+            pr_data.get("updated_at") == pr_obj.updated_at
+            and (pr_data.get("head") or {}).get("sha") == pr_obj.head_commit
+            and pr_data.get("merge_base") == pr_obj.merge_base
+        )
+
     def dump_pr(self, owner: str, repo: str, number: str, *, pr_obj, path):
         import json
         import shutil
@@ -103,15 +168,6 @@ class PullRequestDumpCommand(osc.commandline_git.GitObsCommand):
         from osc.util.xml import ET
 
         metadata_dir = os.path.join(path, "metadata")
-        try:
-            with open(os.path.join(metadata_dir, "pr.json")) as f:
-                pr_data = json.load(f)
-                if pr_data["updated_at"] == pr_obj.updated_at:
-                    # no update, skip the dump
-                    return
-        except FileNotFoundError:
-            # no local metadata cached, we can't skip the dump
-            pass
 
         review_obj_list = pr_obj.get_reviews(self.gitea_conn)
 
@@ -248,15 +304,36 @@ class PullRequestDumpCommand(osc.commandline_git.GitObsCommand):
             # the list doesn't come from Gitea API but is post-processed for our overall sanity
             json.dump(xml_history_list, f, indent=4, sort_keys=True)
 
+        mirror = self.git_mirror
+
         base_dir = os.path.join(path, "base")
         # we must use the `merge_base` instead of `head_commit`, because the latter changes after merging the PR and the `base` directory would contain incorrect data
-        gitea_api.Repo.clone_or_update(self.gitea_conn, owner, repo, branch=pr_obj.base_branch, commit=pr_obj.merge_base, directory=base_dir)
+        gitea_api.Repo.clone_or_update(
+            self.gitea_conn,
+            owner,
+            repo,
+            branch=pr_obj.base_branch,
+            commit=pr_obj.merge_base,
+            directory=base_dir,
+            mirror=mirror,
+            # the dumps are kept for a long time, they must not depend on the mirror that can be pruned
+            dissociate=True,
+        )
         git = gitea_api.Git(base_dir)
         git.clean()
 
         head_dir = os.path.join(path, "head")
         gitea_api.Repo.clone_or_update(
-            self.gitea_conn, owner, repo, pr_number=pr_obj.number, commit=pr_obj.head_commit, directory=head_dir, reference=base_dir
+            self.gitea_conn,
+            owner,
+            repo,
+            pr_number=pr_obj.number,
+            commit=pr_obj.head_commit,
+            directory=head_dir,
+            # the mirror contains the objects of the base too
+            reference=None if mirror else base_dir,
+            mirror=mirror,
+            dissociate=True,
         )
         git = gitea_api.Git(head_dir)
         git.clean()
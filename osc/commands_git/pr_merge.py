@@ -20,21 +20,19 @@ class PullRequestMergeCommand(osc.commandline_git.GitObsCommand):
             action="store_true",
             help="Merge immediately, don't wait until all checks succeed.",
         )
+        self.add_argument_batch()
 
     def run(self, args):
         from osc import gitea_api
 
         self.print_gitea_settings()
 
-        pull_request_ids = args.id
-
-        for pr_index, pr_id in enumerate(pull_request_ids):
+        def merge(owner, repo, number):
             if args.now:
-                print(f"Merging {pr_id}...")
+                print(f"Merging {owner}/{repo}#{number}...")
             else:
-                print(f"Scheduling auto merge of {pr_id}...")
+                print(f"Scheduling auto merge of {owner}/{repo}#{number}...")
 
-            owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
             gitea_api.PullRequest.merge(
                 self.gitea_conn,
                 owner,
@@ -42,3 +40,5 @@ class PullRequestMergeCommand(osc.commandline_git.GitObsCommand):
                 number,
                 merge_when_checks_succeed=not args.now,
             )
+
+        self.run_batch(args, args.id, merge)
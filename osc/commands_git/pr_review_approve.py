@@ -28,6 +28,7 @@ class PullRequestReviewApproveCommand(osc.commandline_git.GitObsCommand):
             "--reviewer",
             help="Review on behalf of the specified reviewer that is associated to group review bot",
         )
+        self.add_argument_batch()
 
     def run(self, args):
         from osc import gitea_api
@@ -43,12 +44,8 @@ class PullRequestReviewApproveCommand(osc.commandline_git.GitObsCommand):
             except gitea_api.UserDoesNotExist as e:
                 self.parser.error(f"Invalid reviewer: {e}")
 
-        pull_request_ids = args.id
-
-        for pr_index, pr_id in enumerate(pull_request_ids):
-            self.print_gitea_settings()
-
-            print(f"Approving {pr_id} ...")
-
-            owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
+        def approve(owner, repo, number):
+            print(f"Approving {owner}/{repo}#{number} ...")
             gitea_api.PullRequest.approve_review(self.gitea_conn, owner, repo, number, msg=args.message, commit=args.commit, reviewer=args.reviewer)
+
+        self.run_batch(args, args.id, approve)
@@ -1,7 +1,13 @@
+import concurrent.futures
 import os
 import subprocess
 import sys
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import Generator
+from typing import List
 from typing import Optional
 
 import osc.commandline_git
@@ -37,6 +43,80 @@ CLOSE_TEMPLATE = """
 """
 
 
+class PrefetchCancelled(Exception):
+    pass
+
+
+class PrefetchedPullRequest:
+    """
+    Data of a pull request fetched ahead of the review.
+    """
+
+    def __init__(self, pr_id: str, pr_obj: "PullRequest"):
+        self.pr_id = pr_id
+        self.pr_obj = pr_obj
+        self.timeline: Optional[List["IssueTimelineEntry"]] = None
+        self.patch: Optional[bytes] = None
+
+
+class Prefetcher:
+    """
+    Run ``func(item)`` for the items following the one that is currently processed in background threads.
+
+    Only results of the current item and the next ``depth`` items are kept in memory,
+    results of the items that were already processed are dropped.
+    """
+
+    def __init__(self, func: Callable[[Any], Any], items: List[Any], *, depth: int, jobs: int = 2):
+        self.func = func
+        self.items = items
+        self.depth = max(0, depth)
+        self.jobs = jobs
+        self.cancelled = threading.Event()
+        self._futures: Dict[int, concurrent.futures.Future] = {}
+        self._executor = None
+
+    def _submit(self, index: int):
+        if index in self._futures or index >= len(self.items):
+            return
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="osc-prefetch")
+        self._futures[index] = self._executor.submit(self.func, self.items[index])
+
+    def get(self, index: int) -> Any:
+        """
+        Return the result for the item on ``index`` and start prefetching the following items.
+        Exceptions raised by ``func`` are re-raised.
+        """
+        if self.cancelled.is_set():
+            raise PrefetchCancelled()
+
+        # drop the results we're not going to need anymore
+        for i in [i for i in self._futures if i < index]:
+            self._futures.pop(i).cancel()
+
+        if self.depth == 0:
+            return self.func(self.items[index])
+
+        for i in range(index, index + self.depth + 1):
+            self._submit(i)
+
+        return self._futures[index].result()
+
+    def close(self):
+        """
+        Cancel pending prefetches and stop the background threads.
+        The running prefetches are expected to check ``cancelled`` and stop as soon as possible.
+        """
+        self.cancelled.set()
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
 class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
     """
     Interactive review of pull requests
@@ -64,10 +144,16 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
             "--reviewer",
             help="Review on behalf of the specified reviewer that is associated to group review bot",
         )
+        self.add_argument(
+            "--prefetch",
+            metavar="N",
+            type=int,
+            default=3,
+            help="Fetch pull request details, patches and git objects of the next N pull requests in background (default: 3, 0 disables prefetching)",
+        )
 
     def run(self, args):
         from osc import gitea_api
-        from osc.output import get_user_input
 
         if args.reviewer:
             try:
@@ -86,6 +172,26 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
             pull_request_ids = [pr_obj.id for pr_obj in pr_obj_list]
             del pr_obj_list
 
+        prefetcher = Prefetcher(
+            lambda pr_id: self.prefetch(pr_id, cancelled=prefetcher.cancelled),
+            pull_request_ids,
+            depth=args.prefetch,
+        )
+        try:
+            return_code, skipped_drafts = self.review(args, pull_request_ids, prefetcher)
+        finally:
+            prefetcher.close()
+
+        if skipped_drafts:
+            print(file=sys.stderr)
+            print(f"Skipped drafts: {skipped_drafts}", file=sys.stderr)
+
+        sys.exit(return_code)
+
+    def review(self, args, pull_request_ids: List[str], prefetcher: Prefetcher):
+        from osc import gitea_api
+        from osc.output import get_user_input
+
         skipped_drafts = 0
         return_code = 0
 
@@ -93,15 +199,30 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
             self.print_gitea_settings()
 
             owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
-            pr_obj = gitea_api.PullRequest.get(self.gitea_conn, owner, repo, number)
+            try:
+                pr_data = prefetcher.get(pr_index)
+            except PrefetchCancelled:
+                raise
+            except Exception:
+                # the output of the background git commands is muted, repeat the work in foreground to get the errors displayed
+                pr_data = self.prefetch(pr_id, quiet=False)
+            pr_obj = pr_data.pr_obj
 
             if pr_obj.draft:
                 # we don't want to review drafts, they will change
                 skipped_drafts += 1
                 continue
 
-            self.clone_git(owner, repo, number, subdir="base")
-            self.view(owner, repo, number, pr_index=pr_index, pr_count=len(pull_request_ids), pr_obj=pr_obj)
+            self.view(
+                owner,
+                repo,
+                number,
+                pr_index=pr_index,
+                pr_count=len(pull_request_ids),
+                pr_obj=pr_obj,
+                timeline=pr_data.timeline,
+                patch=pr_data.patch,
+            )
 
             while True:
                 # TODO: print at least some context because the PR details disappear after closing less
@@ -146,11 +267,37 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
                 else:
                     raise RuntimeError(f"Unhandled reply: {reply}")
 
-        if skipped_drafts:
-            print(file=sys.stderr)
-            print(f"Skipped drafts: {skipped_drafts}", file=sys.stderr)
+        return return_code, skipped_drafts
 
-        sys.exit(return_code)
+    def prefetch(self, pr_id: str, *, quiet: bool = True, cancelled: Optional[threading.Event] = None) -> PrefetchedPullRequest:
+        """
+        Fetch everything that is needed for reviewing the pull request.
+        This runs in background threads, the git output is muted unless ``quiet`` is set to ``False``.
+        """
+        from osc import gitea_api
+
+        def check_cancelled():
+            if cancelled is not None and cancelled.is_set():
+                raise PrefetchCancelled()
+
+        owner, repo, number = gitea_api.PullRequest.split_id(pr_id)
+        pr_obj = gitea_api.PullRequest.get(self.gitea_conn, owner, repo, number)
+        result = PrefetchedPullRequest(pr_id, pr_obj)
+
+        if pr_obj.draft:
+            return result
+
+        check_cancelled()
+        result.timeline = gitea_api.IssueTimelineEntry.list(self.gitea_conn, owner, repo, number)
+        check_cancelled()
+        result.patch = gitea_api.PullRequest.get_patch(self.gitea_conn, owner, repo, number)
+        check_cancelled()
+        try:
+            # the git commands are terminated on cancelling, exiting the program doesn't wait for them
+            self.clone_git(owner, repo, number, subdir="base", quiet=quiet, cancelled=cancelled)
+        except gitea_api.GitCommandCancelled:
+            raise PrefetchCancelled() from None
+        return result
 
     def approve(self, owner: str, repo: str, number: int, *, commit: str, reviewer: Optional[str] = None, schedule_merge: bool = False):
         from osc import gitea_api
@@ -205,21 +352,41 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
         path = os.path.expanduser(path)
         return path
 
-    def clone_git(self, owner: str, repo: str, number: int, *, subdir: Optional[str] = None):
+    def clone_git(
+        self,
+        owner: str,
+        repo: str,
+        number: int,
+        *,
+        subdir: Optional[str] = None,
+        quiet: bool = False,
+        cancelled: Optional[threading.Event] = None,
+    ):
+        """
+        Clone or fetch the repo and fetch the pull request.
+
+        :param cancelled: Run the git commands in background, without access to the terminal,
+                          and terminate them once the event is set.
+        """
         from osc import gitea_api
 
         repo_obj = gitea_api.Repo.get(self.gitea_conn, owner, repo)
         clone_url = repo_obj.ssh_url
 
-        # TODO: it might be good to have a central cache for the git repos to speed cloning up
         path = self.get_git_repo_path(owner, repo, number, subdir=subdir)
-        git = gitea_api.Git(path)
+        git = gitea_api.Git(path, cancelled=cancelled)
         if os.path.isdir(path):
-            git.fetch()
+            git.fetch(mute_stderr=quiet)
         else:
+            mirror = self.git_mirror
+            reference = None
+            config = None
+            if mirror:
+                reference = mirror.update(self.gitea_conn, owner, repo, cancelled=cancelled)
+                config = mirror.get_clone_config()
             os.makedirs(path, exist_ok=True)
-            git.clone(clone_url, directory=path, quiet=False)
-        git.fetch_pull_request(number, force=True)
+            git.clone(clone_url, directory=path, reference=reference, config=config, quiet=quiet, mute_stderr=quiet)
+        git.fetch_pull_request(number, force=True, mute_stderr=quiet)
 
     def view(
         self,
@@ -230,6 +397,8 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
         pr_index: int,
         pr_count: int,
         pr_obj: Optional["PullRequest"] = None,
+        timeline: Optional[List["IssueTimelineEntry"]] = None,
+        patch: Optional[bytes] = None,
     ):
         from osc import gitea_api
         from osc.core import highlight_diff
@@ -256,7 +425,8 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
             proc.stdin.write(b"\n")
 
             # timeline
-            timeline = gitea_api.IssueTimelineEntry.list(self.gitea_conn, owner, repo, number)
+            if timeline is None:
+                timeline = gitea_api.IssueTimelineEntry.list(self.gitea_conn, owner, repo, number)
             timeline_lines = []
             timeline_lines.append(tty.colorize("Timeline:", "bold"))
             for entry in timeline:
@@ -275,7 +445,8 @@ class PullRequestReviewInteractiveCommand(osc.commandline_git.GitObsCommand):
 
             # patch
             proc.stdin.write(tty.colorize("Patch:\n", "bold").encode("utf-8"))
-            patch = gitea_api.PullRequest.get_patch(self.gitea_conn, owner, repo, number)
+            if patch is None:
+                patch = gitea_api.PullRequest.get_patch(self.gitea_conn, owner, repo, number)
             patch = sanitize_text(patch)
             patch = highlight_diff(patch)
             proc.stdin.write(patch)
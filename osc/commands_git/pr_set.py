@@ -1,5 +1,3 @@
-import sys
-
 import osc.commandline_git
 
 
@@ -30,41 +28,25 @@ class PullRequestSetCommand(osc.commandline_git.GitObsCommand):
             action=osc.commandline_git.BooleanAction,
             help="Users with write access to the base branch can also push to the pull request's head branch",
         )
+        self.add_argument_batch()
 
     def run(self, args):
         from osc import gitea_api
-        from osc.core import highlight_diff
-        from osc.output import tty
 
         self.print_gitea_settings()
 
-        num_entries = 0
-        failed_entries = []
-        for owner, repo, pull in args.owner_repo_pull:
-            try:
-                pr_obj = gitea_api.PullRequest.set(
-                    self.gitea_conn,
-                    owner,
-                    repo,
-                    int(pull),
-                    title=args.title,
-                    description=args.description,
-                    allow_maintainer_edit=args.allow_maintainer_edit,
-                )
-                num_entries += 1
-            except gitea_api.GiteaException as e:
-                if e.status == 404:
-                    failed_entries.append(f"{owner}/{repo}#{pull}")
-                    continue
-                raise
-
+        def set_pull_request(owner, repo, number):
+            pr_obj = gitea_api.PullRequest.set(
+                self.gitea_conn,
+                owner,
+                repo,
+                number,
+                title=args.title,
+                description=args.description,
+                allow_maintainer_edit=args.allow_maintainer_edit,
+            )
             print(pr_obj.to_human_readable_string())
             print()
 
-        print(f"Total modified entries: {num_entries}", file=sys.stderr)
-        if failed_entries:
-            print(
-                f"{tty.colorize('ERROR', 'red,bold')}: Couldn't change the following pull requests: {', '.join(failed_entries)}",
-                file=sys.stderr,
-            )
-            sys.exit(1)
+        pr_ids = [f"{owner}/{repo}#{pull}" for owner, repo, pull in args.owner_repo_pull]
+        self.run_batch(args, pr_ids, set_pull_request)
@@ -0,0 +1,19 @@
+import osc.commandline_git
+
+
+class RepoMirrorCommand(osc.commandline_git.GitObsCommand):
+    """
+    Manage local mirrors of git repos
+
+    The mirrors are enabled by setting 'git_mirror_dir' in the 'general' section
+    or in a login entry of the git-obs config file.
+    """
+
+    name = "mirror"
+    parent = "RepoCommand"
+
+    def init_arguments(self):
+        pass
+
+    def run(self, args):
+        self.parser.print_help()
@@ -0,0 +1,43 @@
+import sys
+
+import osc.commandline_git
+
+
+class RepoMirrorPruneCommand(osc.commandline_git.GitObsCommand):
+    """
+    Remove mirrors that haven't been used recently and git lfs objects that none of the remaining mirrors reference
+
+    The clones created by 'git-obs pr dump' don't borrow objects from the mirrors, pruning doesn't affect them.
+
+    IMPORTANT: Clones created from a removed mirror lose access to the objects borrowed from it.
+    Run 'git repack -a -d' in the clones you want to keep to make them independent before pruning.
+    """
+
+    name = "prune"
+    parent = "RepoMirrorCommand"
+
+    def init_arguments(self):
+        self.add_argument(
+            "--max-age",
+            metavar="DAYS",
+            type=float,
+            default=30,
+            help="Remove mirrors that haven't been updated in the specified number of days. Default: 30",
+        )
+        self.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the paths that would be removed",
+        )
+
+    def run(self, args):
+        mirror = self.git_mirror
+        if mirror is None:
+            self.parser.error("Mirrors are not enabled, please set 'git_mirror_dir' in the git-obs config")
+
+        removed = mirror.prune(args.max_age * 24 * 60 * 60, dry_run=args.dry_run)
+        for path in removed:
+            print(path)
+
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"{action} {len(removed)} paths from {mirror.path}", file=sys.stderr)
@@ -246,6 +246,7 @@ class StagingGroupCommand(osc.commandline_git.GitObsCommand):
                         directory=os.path.join(temp_dir, f"{fork_owner}_{fork_repo}"),
                         add_remotes=False,
                         cache_directory=cache_dir,
+                        mirror=self.git_mirror,
                         ssh_private_key_path=self.gitea_conn.login.ssh_key,
                         ssh_strict_host_key_checking=not(args.no_ssh_strict_host_key_checking),
                     )
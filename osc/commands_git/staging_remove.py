@@ -44,9 +44,11 @@ class StagingRemoveCommand(osc.commandline_git.GitObsCommand):
 
         self.print_gitea_settings()
 
+        mirror = self.git_mirror
+
         with TemporaryDirectory(prefix="git-obs-staging_", dir=".", delete=not args.keep_temp_dir) as temp_dir:
             # get pull request data from gitea
-            target = gitea_api.StagingPullRequestWrapper(self.gitea_conn, target_owner, target_repo, target_number, topdir=temp_dir)
+            target = gitea_api.StagingPullRequestWrapper(self.gitea_conn, target_owner, target_repo, target_number, topdir=temp_dir, mirror=mirror)
 
             # check if the specified references match actual references in the project pull request
             refs = target.pr_obj.parse_pr_references()
@@ -62,7 +64,7 @@ class StagingRemoveCommand(osc.commandline_git.GitObsCommand):
             # get pull request data from gitea
             pr_map = {}
             for owner, repo, number in args.pr_list:
-                pr = gitea_api.StagingPullRequestWrapper(self.gitea_conn, owner, repo, number, topdir=temp_dir)
+                pr = gitea_api.StagingPullRequestWrapper(self.gitea_conn, owner, repo, number, topdir=temp_dir, mirror=mirror)
                 pr_map[(owner.lower(), repo.lower(), number)] = pr
 
             # clone the git repos, cache submodule data
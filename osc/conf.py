@@ -405,6 +405,81 @@ class HostOptions(OscOptions):
         ),
     )  # type: ignore[assignment]
 
+    package_cache_size: int = Field(
+        default=FromParent("package_cache_size"),
+        description=textwrap.dedent(
+            """
+            Size budget of the package cache (``packagecachedir``) of the apiurl in MiB.
+            After each ``osc build`` and on ``osc cache gc``, stale preinstall images
+            and the least recently used packages are removed until the cache fits into the budget.
+            The value ``0`` disables the limit.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    http_cache: bool = Field(
+        default=False,
+        description=textwrap.dedent(
+            """
+            Cache responses to GET requests in ``http_cache_dir``.
+            Cached responses are revalidated with the ``If-None-Match`` and ``If-Modified-Since`` headers
+            and the server sends the response body only if it has changed.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    http_cache_ttl: int = Field(
+        default=0,
+        description=textwrap.dedent(
+            """
+            Number of seconds a cached response is used without asking the server whether it has changed.
+            The value ``0`` revalidates the cached responses on every request.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    http_cache_size: int = Field(
+        default=100,
+        description=textwrap.dedent(
+            """
+            Maximal size of the cached responses in MiB.
+            The least recently used responses are removed when the cache grows bigger.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    http_pool_maxsize: int = Field(
+        default=FromParent("http_pool_maxsize"),
+        description=textwrap.dedent(
+            """
+            Number of connections to the apiurl that are kept open for reuse.
+            Threads sending requests at the same time need a connection each,
+            connections above the limit are closed after their request finishes.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    http_pool_block: bool = Field(
+        default=FromParent("http_pool_block"),
+        description=textwrap.dedent(
+            """
+            Never open more than ``http_pool_maxsize`` connections to the apiurl.
+            Threads wait for a free connection instead of opening a new one.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    http_pool_idle_timeout: int = Field(
+        default=FromParent("http_pool_idle_timeout"),
+        description=textwrap.dedent(
+            """
+            Number of seconds an unused connection is kept open for reuse.
+            Set it slightly below the keep-alive timeout of the server to avoid reusing connections
+            the server has already closed. The value ``0`` disables the timeout.
+            """
+        ),
+    )  # type: ignore[assignment]
+
     disable_hdrmd5_check: bool = Field(
         default=FromParent("disable_hdrmd5_check"),
         description=textwrap.dedent(
@@ -672,6 +747,21 @@ class Options(OscOptions):
         ),
     )  # type: ignore[assignment]
 
+    http_pool_maxsize: int = Field(
+        default=4,
+        description=HostOptions.__fields__["http_pool_maxsize"].description,
+    )  # type: ignore[assignment]
+
+    http_pool_block: bool = Field(
+        default=False,
+        description=HostOptions.__fields__["http_pool_block"].description,
+    )  # type: ignore[assignment]
+
+    http_pool_idle_timeout: int = Field(
+        default=0,
+        description=HostOptions.__fields__["http_pool_idle_timeout"].description,
+    )  # type: ignore[assignment]
+
     cookiejar: str = Field(
         default=os.path.join(xdg.XDG_STATE_HOME, "osc", "cookiejar"),
         description=textwrap.dedent(
@@ -681,6 +771,16 @@ class Options(OscOptions):
         ),
     )  # type: ignore[assignment]
 
+    http_cache_dir: str = Field(
+        default=os.path.join(xdg.XDG_CACHE_HOME, "osc", "http"),
+        description=textwrap.dedent(
+            """
+            Path to a directory with cached HTTP responses.
+            The cache is enabled per apiurl with the ``http_cache`` option.
+            """
+        ),
+    )  # type: ignore[assignment]
+
     section_scm: str = Field(
         default="SCM options",
         exclude=True,
@@ -773,6 +873,37 @@ class Options(OscOptions):
         ),
     )  # type: ignore[assignment]
 
+    upload_jobs: int = Field(
+        default=1,
+        description=textwrap.dedent(
+            """
+            The number of parallel uploads of source files during commit.
+            The value ``1`` uploads the files one after another.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    source_cache_dir: str = Field(
+        default="",
+        description=textwrap.dedent(
+            """
+            The directory of a cache of source files shared by all working copies.
+            Files with the same md5 digest are downloaded only once and then hardlinked,
+            reflinked or copied into the working copies. The cache is disabled if empty.
+            """
+        ),
+    )  # type: ignore[assignment]
+
+    source_cache_size: int = Field(
+        default=2048,
+        description=textwrap.dedent(
+            """
+            Maximal size of the source cache in MiB.
+            The least recently used files are removed from the cache when it grows bigger.
+            """
+        ),
+    )  # type: ignore[assignment]
+
     do_package_tracking: bool = Field(
         default=True,
         description=textwrap.dedent(
@@ -843,6 +974,23 @@ class Options(OscOptions):
         ini_key="packagecachedir",
     )  # type: ignore[assignment]
 
+    package_cache_size: int = Field(
+        default=0,
+        description=HostOptions.__fields__["package_cache_size"].description,
+    )  # type: ignore[assignment]
+
+    download_jobs: int = Field(
+        default=1,
+        description=textwrap.dedent(
+            """
+            The number of parallel downloads of packages used for build.
+            The value ``1`` downloads the packages one after another.
+
+            This is only the default that can be overridden with ``osc build --download-jobs <VALUE>``.
+            """
+        ),
+    )  # type: ignore[assignment]
+
     no_verify: bool = Field(
         default=False,
         description=textwrap.dedent(
@@ -861,6 +1009,17 @@ class Options(OscOptions):
         ),
     )  # type: ignore[assignment]
 
+    verify_jobs: int = Field(
+        default=0,
+        description=textwrap.dedent(
+            """
+            The number of processes verifying signatures of packages used for build
+            with the built-in signature verification.
+            The value ``0`` uses the number of CPUs, ``1`` verifies the packages one after another.
+            """
+        ),
+    )  # type: ignore[assignment]
+
     disable_hdrmd5_check: bool = Field(
         default=False,
         description=HostOptions.__fields__["disable_hdrmd5_check"].description,
@@ -10,6 +10,7 @@ import subprocess
 import ssl
 import sys
 import tempfile
+import threading
 import time
 import warnings
 
@@ -27,6 +28,7 @@ from . import conf
 from . import oscerr
 from . import oscssl
 from . import output
+from .http_cache import HttpCache
 from .util.helper import decode_it
 
 
@@ -110,6 +112,58 @@ def enable_http_debug(config):
     http.client.print = new_print
 
 
+class ConnectionPoolMixin:
+    """
+    Close connections that were idle for more than ``idle_timeout`` seconds
+    instead of reusing them and count how many times they were reopened.
+
+    The number of requests and opened connections are counted
+    by urllib3 in ``num_requests`` and ``num_connections``.
+    """
+
+    # set after the pool is created, urllib3 pool managers don't accept unknown pool arguments
+    idle_timeout = 0
+    num_expired = 0
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        last_used = getattr(conn, "osc_last_used", None)
+        if self.idle_timeout and last_used is not None and time.monotonic() - last_used > self.idle_timeout:
+            # the connection gets reopened on the next request
+            conn.close()
+            self.num_expired += 1
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.osc_last_used = time.monotonic()
+        return super()._put_conn(conn)
+
+
+class HTTPConnectionPool(ConnectionPoolMixin, urllib3.HTTPConnectionPool):
+    pass
+
+
+class HTTPSConnectionPool(ConnectionPoolMixin, urllib3.HTTPSConnectionPool):
+    pass
+
+
+POOL_CLASSES_BY_SCHEME = {
+    "http": HTTPConnectionPool,
+    "https": HTTPSConnectionPool,
+}
+
+
+def get_pool_stats(pool):
+    """
+    Return a human readable summary of connection reuse in the pool.
+    """
+    num_requests = getattr(pool, "num_requests", 0)
+    num_opened = getattr(pool, "num_connections", 0) + getattr(pool, "num_expired", 0)
+    num_reused = max(num_requests - num_opened, 0)
+    return f"{num_requests} requests, {num_opened} connections opened, {num_reused} reused"
+
+
 def get_proxy_manager(env):
     proxy_url = os.environ.get(env.upper(), None) or os.environ.get(env.lower(), None)
 
@@ -135,6 +189,7 @@ def get_proxy_manager(env):
         proxy_headers["Proxy-Authorization"] = f"Basic {proxy_basic_auth:s}"
 
     manager = urllib3.ProxyManager(proxy_url, proxy_headers=proxy_headers)
+    manager.pool_classes_by_scheme = POOL_CLASSES_BY_SCHEME
     return manager
 
 
@@ -143,6 +198,15 @@ def get_proxy_manager(env):
 # (incl. trusted keys for example).
 CONNECTION_POOLS = {}
 
+# Minimal number of connections a pool in `CONNECTION_POOLS` keeps open for reuse,
+# the `http_pool_maxsize` option of the apiurl applies if it is bigger.
+# Raise it with `set_pool_maxsize()` before issuing requests from several threads.
+POOL_MAXSIZE = 1
+
+# Locks that let only one thread re-authenticate after a session cookie has expired.
+REAUTH_LOCKS = {}
+REAUTH_LOCKS_LOCK = threading.Lock()
+
 
 # Pool manager for requests outside apiurls.
 POOL_MANAGER = urllib3.PoolManager()
@@ -156,6 +220,31 @@ HTTP_PROXY_MANAGER = get_proxy_manager("HTTP_PROXY")
 HTTPS_PROXY_MANAGER = get_proxy_manager("HTTPS_PROXY")
 
 
+def set_pool_maxsize(maxsize: int):
+    """
+    Make the connection pools keep at least ``maxsize`` connections open,
+    so that ``maxsize`` threads issuing requests at the same time can reuse them.
+
+    Existing pools that are smaller get closed and are created again on the next request.
+    Call this function before starting the threads.
+    """
+    global POOL_MAXSIZE
+    if maxsize <= POOL_MAXSIZE:
+        return
+    POOL_MAXSIZE = maxsize
+    for apiurl, pool in list(CONNECTION_POOLS.items()):
+        queue = getattr(pool, "pool", None)
+        if queue is not None and queue.maxsize >= maxsize:
+            continue
+        CONNECTION_POOLS.pop(apiurl)
+        pool.close()
+
+
+def get_reauth_lock(apiurl):
+    with REAUTH_LOCKS_LOCK:
+        return REAUTH_LOCKS.setdefault(apiurl, threading.Lock())
+
+
 def http_request_wrap_file(func):
     """
     Turn file path into a file object and close it automatically
@@ -188,6 +277,7 @@ def http_request(method: str, url: str, headers=None, data=None, file=None):
     * Retries (http_retries in oscrc)
     * Requests outside apiurl (incl. proxy support)
     * Connection debugging (-H/--http-debug, --http-full-debug)
+    * Conditional GET requests answered from an on-disk cache ([apiurl]/http_cache=1 in oscrc)
 
     :param method: HTTP request method (such as GET, POST, PUT, DELETE).
     :param url: The URL to perform the request on.
@@ -249,10 +339,32 @@ def http_request(method: str, url: str, headers=None, data=None, file=None):
         new_headers.update(headers)
         headers = new_headers
 
+    cache = None
+    cache_entry = None
+    if method == "GET" and not data and "If-None-Match" not in headers and "If-Modified-Since" not in headers:
+        cache = HttpCache.from_config(apiurl)
+    if cache is not None:
+        cache_key = HttpCache.get_key(url, options["user"], headers)
+        cache_entry = cache.get(cache_key)
+        if cache_entry is not None:
+            if cache.is_fresh(cache_entry):
+                try:
+                    response = cache_entry.to_response()
+                except OSError:
+                    pass
+                else:
+                    if int(conf.config['http_debug']):
+                        http.client.print(40 * '-')
+                        http.client.print(method, url, "(served from the http cache)")
+                    return response
+            cache_entry.add_validators(headers)
+
     global CONNECTION_POOLS
     pool = CONNECTION_POOLS.get(apiurl, None)
     if not pool:
         pool_kwargs = {}
+        pool_kwargs["maxsize"] = max(POOL_MAXSIZE, int(options["http_pool_maxsize"]))
+        pool_kwargs["block"] = bool(options["http_pool_block"])
 
         # urllib3.Retry() argument 'method_whitelist' got renamed to 'allowed_methods'
         sig = inspect.signature(urllib3.Retry)
@@ -314,9 +426,11 @@ def http_request(method: str, url: str, headers=None, data=None, file=None):
             )
         elif purl.scheme == "https":
             # direct connection
-            pool = urllib3.HTTPSConnectionPool(host=purl.host, port=purl.port, **pool_kwargs)
+            pool = HTTPSConnectionPool(host=purl.host, port=purl.port, **pool_kwargs)
         else:
-            pool = urllib3.HTTPConnectionPool(host=purl.host, port=purl.port, **pool_kwargs)
+            pool = HTTPConnectionPool(host=purl.host, port=purl.port, **pool_kwargs)
+
+        pool.idle_timeout = int(options["http_pool_idle_timeout"])
 
         if purl.scheme == "https":
             # inject ssl context instance into pool so we can use it later
@@ -325,7 +439,8 @@ def http_request(method: str, url: str, headers=None, data=None, file=None):
             # inject trusted cert store instance into pool so we can use it later
             pool.trusted_cert_store = oscssl.TrustedCertStore(ssl_context, purl.host, purl.port)
 
-        CONNECTION_POOLS[apiurl] = pool
+        # another thread might have created the pool in the meantime
+        pool = CONNECTION_POOLS.setdefault(apiurl, pool)
 
     auth_handlers = [
         CookieJarAuthHandler(apiurl, os.path.expanduser(conf.config["cookiejar"])),
@@ -431,18 +546,58 @@ def http_request(method: str, url: str, headers=None, data=None, file=None):
 
     if response.status == 401:
         # session cookie has expired, re-authenticate
+        # only one thread re-authenticates at a time, the others wait and reuse the new session cookie
+        with get_reauth_lock(apiurl):
+            sent_cookie = headers.get("Cookie", None)
+            new_headers = None
+            if sent_cookie:
+                # another thread might have re-authenticated in the meantime
+                new_headers = urllib3.response.HTTPHeaderDict(headers)
+                new_headers.discard("Cookie")
+                auth_handlers[0].set_request_headers(url, new_headers)
+                if new_headers.get("Cookie", sent_cookie) == sent_cookie:
+                    new_headers = None
+            if new_headers is not None:
+                headers = new_headers
+            else:
+                for handler in auth_handlers:
+                    success = handler.set_request_headers_after_401(url, headers, response)
+                    if success:
+                        break
+
+            # return the connection to the pool before sending the request again,
+            # a blocking pool with a single connection would wait forever otherwise
+            response.drain_conn()
+            response.release_conn()
+
+            if hasattr(data, 'seek'):
+                data.seek(0)
+            with debug_timer():
+                response = pool.urlopen(
+                    method, urlopen_url, body=data, headers=headers,
+                    preload_content=False, assert_same_host=assert_same_host
+                )
+
+            # save the new session cookie before the waiting threads continue
+            for handler in auth_handlers:
+                handler.process_response(url, headers, response)
+    else:
+        # we want to save a session cookie before an exception is raised on failed requests
         for handler in auth_handlers:
-            success = handler.set_request_headers_after_401(url, headers, response)
-            if success:
-                break
-        if hasattr(data, 'seek'):
-            data.seek(0)
-        with debug_timer():
-            response = pool.urlopen(method, urlopen_url, body=data, headers=headers, preload_content=False)
+            handler.process_response(url, headers, response)
 
-    # we want to save a session cookie before an exception is raised on failed requests
-    for handler in auth_handlers:
-        handler.process_response(url, headers, response)
+    if int(conf.config['http_debug']):
+        http.client.print(f"Connection pool {purl.host}: {get_pool_stats(pool)}")
+
+    if cache is not None:
+        if response.status == 304 and cache_entry is not None:
+            # not modified, serve the cached body
+            response.drain_conn()
+            response.release_conn()
+            cache.touch(cache_entry)
+            return cache_entry.to_response()
+        if response.status == 200:
+            response = cache.store(cache_key, url, response)
 
     if response.status / 100 != 2:
         raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, response)
@@ -528,6 +683,8 @@ class AuthHandlerBase:
 class CookieJarAuthHandler(AuthHandlerBase):
     # Shared among instances, instantiate on first use, key equals to cookiejar path.
     COOKIEJARS = {}
+    # Serializes loading and saving the cookie jars in concurrent requests.
+    COOKIEJARS_LOCK = threading.RLock()
 
     def __init__(self, apiurl, cookiejar_path):
         super().__init__(apiurl)
@@ -544,6 +701,10 @@ class CookieJarAuthHandler(AuthHandlerBase):
 
     @property
     def _cookiejar(self):
+        with self.COOKIEJARS_LOCK:
+            return self._get_cookiejar()
+
+    def _get_cookiejar(self):
         jar = self.COOKIEJARS.get(self.cookiejar_path, None)
         if not jar:
             try:
@@ -589,8 +750,9 @@ class CookieJarAuthHandler(AuthHandlerBase):
 
     def process_response(self, url, request_headers, response):
         if response.headers.get_all("set-cookie", None):
-            self._cookiejar.extract_cookies(response, MockRequest(url, response.headers))
-            self._cookiejar.save()
+            with self.COOKIEJARS_LOCK:
+                self._cookiejar.extract_cookies(response, MockRequest(url, response.headers))
+                self._cookiejar.save()
         self._unlock()
 
 
@@ -0,0 +1,155 @@
+"""
+Asynchronous access to the OBS API for asyncio based tools.
+
+The requests are sent by the synchronous ``http_request()`` that runs in a pool of worker threads.
+That way they share the connection pools, the authentication handlers
+(session cookies, ssh signatures, basic auth), the retry policy and the trusted SSL certificates
+with the rest of osc while the event loop is never blocked by network I/O.
+
+Example::
+
+    async def main():
+        urls = [makeurl(apiurl, ["source", project, "_meta"]) for project in projects]
+        responses = await asyncio.gather(*[http_GET_async(url) for url in urls])
+"""
+
+
+import asyncio
+import concurrent.futures
+import io
+import threading
+import urllib.error
+
+from . import connection
+
+
+# Number of requests the default client sends at the same time.
+DEFAULT_JOBS = 16
+
+
+class AsyncResponse:
+    """
+    A response whose body has already been read in a worker thread.
+    """
+
+    def __init__(self, status: int, reason: str, headers, data: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+
+    def read(self) -> bytes:
+        return self.data
+
+
+def _request(method, url, headers, data):
+    try:
+        response = connection.http_request(method, url, headers=headers, data=data)
+    except urllib.error.HTTPError as e:
+        # read the error body here so the connection returns to the pool
+        # and the caller doesn't block the event loop by reading it
+        raise urllib.error.HTTPError(e.url, e.code, e.msg, e.hdrs, io.BytesIO(e.read())) from None
+    try:
+        body = response.read()
+    finally:
+        response.release_conn()
+    return AsyncResponse(response.status, response.reason, response.headers, body)
+
+
+class AsyncClient:
+    """
+    Run OBS API requests from coroutines, at most ``jobs`` of them at the same time.
+    """
+
+    def __init__(self, jobs: int = DEFAULT_JOBS):
+        self.jobs = jobs
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # keep a connection open for each worker
+                connection.set_pool_maxsize(self.jobs)
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.jobs, thread_name_prefix="osc-async"
+                )
+            return self._executor
+
+    async def run(self, func, *args):
+        """
+        Run a blocking function that talks to OBS, such as ``osc._private.api.get``, in a worker thread.
+        """
+        # asyncio.get_running_loop() is not available on python 3.6
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def request(self, method: str, url: str, headers=None, data=None) -> AsyncResponse:
+        """
+        Send a HTTP request, see ``osc.connection.http_request()``.
+
+        Raises ``urllib.error.HTTPError`` on responses other than 2xx just like the synchronous function.
+        """
+        return await self.run(_request, method, url, headers, data)
+
+    def close(self):
+        """
+        Wait for the running requests to finish and stop the worker threads.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    async def aclose(self):
+        """
+        Like ``close()``, but wait for the requests in another thread so the event loop keeps running.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+# The client used by the module level functions, instantiate on first use.
+CLIENT = None
+CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> AsyncClient:
+    global CLIENT
+    with CLIENT_LOCK:
+        if CLIENT is None:
+            CLIENT = AsyncClient()
+        return CLIENT
+
+
+async def http_request_async(method: str, url: str, headers=None, data=None) -> AsyncResponse:
+    """
+    Send a HTTP request using the default client, see ``AsyncClient.request()``.
+    """
+    return await get_client().request(method, url, headers=headers, data=data)
+
+
+# pylint: disable=C0103,C0116
+async def http_GET_async(*args, **kwargs):
+    return await http_request_async("GET", *args, **kwargs)
+
+
+# pylint: disable=C0103,C0116
+async def http_POST_async(*args, **kwargs):
+    return await http_request_async("POST", *args, **kwargs)
+
+
+# pylint: disable=C0103,C0116
+async def http_PUT_async(*args, **kwargs):
+    return await http_request_async("PUT", *args, **kwargs)
+
+
+# pylint: disable=C0103,C0116
+async def http_DELETE_async(*args, **kwargs):
+    return await http_request_async("DELETE", *args, **kwargs)
@@ -10,7 +10,6 @@ import difflib
 import errno
 import fnmatch
 import glob
-import hashlib
 import io
 import locale
 import os
@@ -88,6 +87,7 @@ from .util import xdg
 from .util.helper import decode_list, decode_it, raw_input, _html_escape
 from .util.xml import xml_fromstring
 from .util.xml import xml_indent_compat as xmlindent
+from .util.xml import xml_iterchildren
 from .util.xml import xml_parse
 
 
@@ -2472,10 +2472,10 @@ def get_request_collection(
 
     u = makeurl(apiurl, ['request'], query)
     f = http_GET(u)
-    res = xml_parse(f).getroot()
 
     requests = []
-    for root in res.findall('request'):
+    # process the requests while they're being downloaded, the collections can be huge
+    for root in xml_iterchildren(f, "request"):
         r = Request()
         r.read(root)
 
@@ -2811,8 +2811,29 @@ def get_source_file(
     progress_obj=None,
     mtime=None,
     meta=False,
+    md5=None,
 ):
+    """
+    Download a source file.
+
+    :param md5: The md5 digest of the file as listed in the package's ``_files``.
+                If specified and the ``source_cache_dir`` option is set, the file is taken
+                from the source cache rather than downloaded and downloaded files are added to the cache.
+    """
+    from .obs_scm.source_cache import SourceCache
+
     targetfilename = targetfilename or filename
+
+    cache = SourceCache.from_config() if md5 else None
+    if cache is not None:
+        # files in the store are replaced but never modified in place, they can share the inode with the cache
+        target_dir = os.path.dirname(os.path.abspath(targetfilename))
+        hardlink = target_dir.endswith(os.path.join(store, "sources"))
+        if cache.get(md5, targetfilename, hardlink=hardlink):
+            if mtime:
+                utime(targetfilename, (-1, mtime))
+            return
+
     query = {}
     if meta:
         query['meta'] = 1
@@ -2825,6 +2846,9 @@ def get_source_file(
     )
     download(u, targetfilename, progress_obj, mtime)
 
+    if cache is not None:
+        cache.put(md5, targetfilename, hardlink=hardlink)
+
 
 def get_binary_file(
     apiurl: str,
@@ -2860,35 +2884,15 @@ def get_binary_file(
 
 
 def dgst(file):
+    from .util.digest import file_digests
 
-    # if not os.path.exists(file):
-    # return None
-
-    global BUFSIZE
-    s = hashlib.md5()
-    f = open(file, 'rb')
-    while True:
-        buf = f.read(BUFSIZE)
-        if not buf:
-            break
-        s.update(buf)
-    f.close()
-    return s.hexdigest()
+    return file_digests(file, ["md5"])["md5"]
 
 
 def sha256_dgst(file):
+    from .util.digest import file_digests
 
-    global BUFSIZE
-
-    f = open(file, 'rb')
-    s = hashlib.sha256()
-    while True:
-        buf = f.read(BUFSIZE)
-        if not buf:
-            break
-        s.update(buf)
-    f.close()
-    return s.hexdigest()
+    return file_digests(file, ["sha256"])["sha256"]
 
 
 def binary(data: bytes):
@@ -3311,8 +3315,9 @@ def checkout_package(
         # add package to <prj>/.obs/_packages
         if not prj_obj:
             prj_obj = Project(prj_dir)
-        prj_obj.set_state(package, ' ')
-        prj_obj.write_packages()
+        with prj_obj.packages_lock:
+            prj_obj.set_state(package, ' ')
+            prj_obj.write_packages()
 
         return
 
@@ -3338,8 +3343,9 @@ def checkout_package(
         # check if we can re-use an existing project object
         if prj_obj is None:
             prj_obj = Project(prj_dir)
-        prj_obj.set_state(p.name, ' ')
-        prj_obj.write_packages()
+        with prj_obj.packages_lock:
+            prj_obj.set_state(p.name, ' ')
+            prj_obj.write_packages()
     p.update(revision, server_service_files, size_limit)
     if service_files:
         print('Running all source services local')
@@ -4461,24 +4467,24 @@ def get_prj_results(
 
     r = []
 
-    f = show_prj_results_meta(apiurl, prj)
-    root = xml_fromstring(b''.join(f))
+    # the same query as show_prj_results_meta() does, but the response is parsed incrementally
+    u = makeurl(apiurl, ['build', prj, '_result'])
+    f = http_GET(u)
 
     if name_filter is not None:
         name_filter = re.compile(name_filter)
 
-    pacs = []
+    pacs = set()
     # sequence of (repo,arch) tuples
     targets = []
     # {package: {(repo,arch): status}}
     status = {}
-    if root.find('result') is None:
-        return []
-    for results in root.findall('result'):
-        for node in results.findall('status'):
-            pacs.append(node.get('package'))
-    pacs = sorted(list(set(pacs)))
-    for node in root.findall('result'):
+    found = False
+    # the results of big projects are huge, process them while they're being downloaded
+    for node in xml_iterchildren(f, "result"):
+        found = True
+        for pacnode in node.findall('status'):
+            pacs.add(pacnode.get('package'))
         # filter architecture and repository
         if arch and node.get('arch') not in arch:
             continue
@@ -4497,6 +4503,9 @@ def get_prj_results(
             if pac not in status:
                 status[pac] = {}
             status[pac][tg] = pacnode.get('code')
+    if not found:
+        return []
+    pacs = sorted(pacs)
     targets.sort()
 
     # filter option
@@ -5300,7 +5309,8 @@ def search(apiurl: str, queries=None, **kwargs):
         query['match'] = xpath
         u = makeurl(apiurl, path, query)
         f = http_GET(u)
-        res[urlpath] = xml_parse(f).getroot()
+        # search results can be huge, don't keep a copy of the raw response in memory
+        res[urlpath] = xml_parse(f, stream=True).getroot()
     return res
 
 
@@ -4,13 +4,18 @@
 # either version 2, or (at your option) any later version.
 
 
+import contextlib
 import glob
+import hashlib
+import io
 import os
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from urllib.request import HTTPError
 
 from . import checker as osc_checker
@@ -19,20 +24,25 @@ from . import oscerr
 from .core import makeurl, dgst
 from .grabber import OscFileGrabber, OscMirrorGroup
 from .meter import create_text_meter
+from .pkgcache import PackageCacheIndex
 from .util import packagequery, cpio
+from .util.parallel import capture_thread_stdout
 from .util.helper import decode_it
 
 
 class Fetcher:
     def __init__(self, cachedir='/tmp', urllist=None,
                  http_debug=False, cookiejar=None, offline=False,
-                 enable_cpio=True, modules=None, download_api_only=False):
+                 enable_cpio=True, modules=None, download_api_only=False,
+                 download_jobs=1):
         # set up progress bar callback
         self.progress_obj = None
         if sys.stdout.isatty():
             self.progress_obj = create_text_meter(use_pb_fallback=False)
 
         self.cachedir = cachedir
+        # header data of the cached packages, saves reading the headers on every build
+        self.header_index = PackageCacheIndex(cachedir)
         # generic download URL lists
         self.urllist = urllist or []
         self.modules = modules or []
@@ -41,12 +51,16 @@ class Fetcher:
         self.cpio = {}
         self.enable_cpio = enable_cpio
         self.download_api_only = download_api_only
+        self.download_jobs = max(1, int(download_jobs or 1))
+        # guards self.cpio which is populated from the download workers
+        self.cpio_lock = threading.Lock()
 
         self.gr = OscFileGrabber(progress_obj=self.progress_obj)
 
     def __add_cpio(self, pac):
         prpap = f'{pac.project}/{pac.repository}/{pac.repoarch}/{pac.repopackage}'
-        self.cpio.setdefault(prpap, {})[pac.repofilename] = pac
+        with self.cpio_lock:
+            self.cpio.setdefault(prpap, {})[pac.repofilename] = pac
 
     def __download_cpio_archive(self, apiurl, project, repo, arch, package, **pkgs):
         if not pkgs:
@@ -59,18 +73,17 @@ class Fetcher:
             url = makeurl(apiurl, ['build', project, repo, arch, package], query=query)
             sys.stdout.write("preparing download ...\r")
             sys.stdout.flush()
-            with tempfile.NamedTemporaryFile(prefix='osc_build_cpio') as tmparchive:
-                self.gr.urlgrab(url, filename=tmparchive.name,
-                                text=f'fetching packages for \'{project}\'')
-                archive = cpio.CpioRead(tmparchive.name)
-                archive.read()
+            with self.gr.urlopen(url, text=f'fetching packages for \'{project}\'') as stream:
+                # the members are extracted directly from the response,
+                # there is no temporary copy of the whole archive
+                archive = cpio.CpioStreamRead(stream, name=url)
                 for hdr in archive:
                     # XXX: we won't have an .errors file because we're using
                     # getbinarylist instead of the public/... route
                     # (which is routed to getbinaries)
                     # getbinaries does not support kiwi builds
                     if hdr.filename == b'.errors':
-                        archive.copyin_file(hdr.filename)
+                        archive.copyin_file(hdr)
                         raise oscerr.APIError('CPIO archive is incomplete '
                                               '(see .errors file)')
                     if package == '_repository':
@@ -85,14 +98,15 @@ class Fetcher:
                         # this is a kiwi product
                         pac = pkgs[decode_it(hdr.filename)]
 
-                    # Extract a single file from the cpio archive
+                    # Extract a single file from the cpio archive to the package cache;
+                    # the temporary file lives next to the final one so it gets only renamed
                     fd = None
                     tmpfile = None
                     try:
-                        fd, tmpfile = tempfile.mkstemp(prefix='osc_build_file')
-                        archive.copyin_file(hdr.filename,
-                                            decode_it(os.path.dirname(tmpfile)),
-                                            decode_it(os.path.basename(tmpfile)))
+                        fd, tmpfile = tempfile.mkstemp(prefix='.osc_build_file', dir=pac.localdir)
+                        archive.copyin_file(hdr,
+                                            os.path.dirname(tmpfile),
+                                            os.path.basename(tmpfile))
                         self.move_package(tmpfile, pac.localdir, pac)
                     finally:
                         if fd is not None:
@@ -126,11 +140,11 @@ class Fetcher:
             project, repo, arch, package = prpap.split('/', 3)
             self.__download_cpio_archive(apiurl, project, repo, arch, package, **pkgs)
 
-    def fetch(self, pac, prefix=''):
+    def fetch(self, pac, prefix='', grabber=None):
         # for use by the failure callback
         self.curpac = pac
 
-        mg = OscMirrorGroup(self.gr, pac.urllist)
+        mg = OscMirrorGroup(grabber or self.gr, pac.urllist)
 
         if self.http_debug:
             print(f'\nURLs to try for package \'{pac}\':', file=sys.stderr)
@@ -160,8 +174,86 @@ class Fetcher:
             if os.path.exists(tmpfile.name):
                 os.unlink(tmpfile.name)
 
+    def __fetch_missing(self, pac, apiurl, prefix='', grabber=None):
+        self.dirSetup(pac)
+        self.fetch(pac, prefix=prefix, grabber=grabber)
+
+        if not os.path.isfile(pac.fullfilename):
+            # if the file wasn't downloaded and cannot be found on disk,
+            # mark it for downloading from the API
+            self.__add_cpio(pac)
+            return
+
+        hdrmd5 = self.header_index.get_hdrmd5(pac.fullfilename)
+        if hdrmd5 != pac.hdrmd5:
+            if conf.config["api_host_options"][apiurl]["disable_hdrmd5_check"]:
+                print(f"Warning: Ignoring a hdrmd5 mismatch for {pac.fullfilename}: {hdrmd5} (actual) != {pac.hdrmd5} (expected)")
+            else:
+                print(f"The file will be redownloaded from the API due to a hdrmd5 mismatch for {pac.fullfilename}: {hdrmd5} (actual) != {pac.hdrmd5} (expected)")
+                os.unlink(pac.fullfilename)
+                self.header_index.remove(pac.fullfilename)
+                self.__add_cpio(pac)
+
+    def __fetch_parallel(self, pacs, apiurl):
+        """
+        Download ``pacs`` from the mirrors using a pool of ``self.download_jobs`` threads.
+
+        The per-file progress bars are replaced with a single meter that counts finished downloads,
+        the messages printed by the workers are held back until the meter ends.
+        Packages that are not available on any mirror are queued for the cpio download from the API
+        exactly as in the serial mode.
+        """
+        needed = len(pacs)
+        # abort the running downloads on ctrl-c instead of waiting for them
+        cancel_event = threading.Event()
+        # the per-file progress_obj is not thread-safe, the workers download silently
+        grabber = OscFileGrabber(cancel_event=cancel_event)
+        meter = None
+        if self.progress_obj:
+            meter = create_text_meter(use_pb_fallback=False)
+            meter.start(f'fetching {needed} packages ({self.download_jobs} jobs)', needed)
+
+        outputs = [""] * needed
+
+        with capture_thread_stdout() as stdout:
+
+            def fetch_missing(num, pac):
+                buf = io.StringIO()
+                stdout.thread_buffer = buf
+                try:
+                    self.__fetch_missing(pac, apiurl, grabber=grabber)
+                finally:
+                    stdout.thread_buffer = None
+                    outputs[num] = buf.getvalue()
+
+            try:
+                with ThreadPoolExecutor(max_workers=self.download_jobs) as executor:
+                    futures = {executor.submit(fetch_missing, num, pac): num for num, pac in enumerate(pacs)}
+                    try:
+                        for done, future in enumerate(as_completed(futures), 1):
+                            future.result()
+                            if meter:
+                                meter.update(done)
+                            else:
+                                num = futures[future]
+                                print('%d/%d (%s) %s' % (done, needed, pacs[num].project, pacs[num].filename))
+                                sys.stdout.write(outputs[num])
+                                outputs[num] = ""
+                    except BaseException:
+                        # don't start any new downloads and abort the running ones
+                        cancel_event.set()
+                        for future in futures:
+                            future.cancel()
+                        raise
+                if meter:
+                    meter.end()
+            finally:
+                for output in outputs:
+                    sys.stdout.write(output)
+
     def move_package(self, tmpfile, destdir, pac_obj=None):
         canonname = None
+        pkgq = None
         if pac_obj and (pac_obj.name.startswith('container:') or pac_obj.binary in ('updateinfo.xml', '_modulemd.yaml')):
             canonname = pac_obj.canonname
         if canonname is None:
@@ -182,16 +274,17 @@ class Fetcher:
             pac_obj.fullfilename = fullfilename
         shutil.move(tmpfile, fullfilename)
         os.chmod(fullfilename, 0o644)
+        self.header_index.add_query(fullfilename, canonname, pkgq)
 
     def dirSetup(self, pac):
         dir = os.path.join(self.cachedir, pac.localdir)
-        if not os.path.exists(dir):
-            try:
-                os.makedirs(dir, mode=0o755)
-            except OSError as e:
-                print('packagecachedir is not writable for you?', file=sys.stderr)
-                print(e, file=sys.stderr)
-                sys.exit(1)
+        try:
+            # the parallel download workers may create the same directory concurrently
+            os.makedirs(dir, mode=0o755, exist_ok=True)
+        except OSError as e:
+            print('packagecachedir is not writable for you?', file=sys.stderr)
+            print(e, file=sys.stderr)
+            sys.exit(1)
 
     def _build_urllist(self, buildinfo, pac):
         if self.download_api_only:
@@ -226,7 +319,7 @@ class Fetcher:
                         if hdrmd5 != i.hdrmd5:
                             cached_is_valid = False
                     elif i.pacsuffix == 'rpm':
-                        hdrmd5 = packagequery.PackageQuery.queryhdrmd5(i.fullfilename)
+                        hdrmd5 = self.header_index.get_hdrmd5(i.fullfilename)
                         if hdrmd5 != i.hdrmd5:
                             if conf.config["api_host_options"][apiurl]["disable_hdrmd5_check"]:
                                 print(f"Warning: Ignoring a hdrmd5 mismatch for {i.fullfilename}: {hdrmd5} (actual) != {i.hdrmd5} (expected)")
@@ -238,52 +331,42 @@ class Fetcher:
                     cached += 1
                 else:
                     os.unlink(i.fullfilename)
+                    self.header_index.remove(i.fullfilename)
 
         miss = 0
         needed = all - cached
         if all:
             miss = 100.0 * needed / all
         print("%.1f%% cache miss. %d/%d dependencies cached.\n" % (miss, cached, all))
-        done = 1
-        for i in buildinfo.deps:
-            if not os.path.exists(i.fullfilename):
-                if self.offline:
-                    raise oscerr.OscIOError(None,
-                                            'Missing \'%s\' in cache: '
-                                            '--offline not possible.' %
-                                            i.fullfilename)
-                self.dirSetup(i)
-                try:
+        missing = [i for i in buildinfo.deps if not os.path.exists(i.fullfilename)]
+        if missing and self.offline:
+            raise oscerr.OscIOError(None,
+                                    'Missing \'%s\' in cache: '
+                                    '--offline not possible.' %
+                                    missing[0].fullfilename)
+
+        try:
+            if self.download_jobs > 1 and len(missing) > 1:
+                self.__fetch_parallel(missing, apiurl)
+            else:
+                for done, i in enumerate(missing, 1):
                     # if there isn't a progress bar, there is no output at all
                     prefix = ''
                     if not self.progress_obj:
                         print('%d/%d (%s) %s' % (done, needed, i.project, i.filename))
                     else:
                         prefix = '[%d/%d] ' % (done, needed)
-                    self.fetch(i, prefix=prefix)
-
-                    if not os.path.isfile(i.fullfilename):
-                        # if the file wasn't downloaded and cannot be found on disk,
-                        # mark it for downloading from the API
-                        self.__add_cpio(i)
-                    else:
-                        hdrmd5 = packagequery.PackageQuery.queryhdrmd5(i.fullfilename)
-                        if hdrmd5 != i.hdrmd5:
-                            if conf.config["api_host_options"][apiurl]["disable_hdrmd5_check"]:
-                                print(f"Warning: Ignoring a hdrmd5 mismatch for {i.fullfilename}: {hdrmd5} (actual) != {i.hdrmd5} (expected)")
-                            else:
-                                print(f"The file will be redownloaded from the API due to a hdrmd5 mismatch for {i.fullfilename}: {hdrmd5} (actual) != {i.hdrmd5} (expected)")
-                                os.unlink(i.fullfilename)
-                                self.__add_cpio(i)
-
-                except KeyboardInterrupt:
-                    print('Cancelled by user (ctrl-c)')
-                    print('Exiting.')
-                    sys.exit(0)
-                done += 1
+                    self.__fetch_missing(i, apiurl, prefix=prefix)
+        except KeyboardInterrupt:
+            print('Cancelled by user (ctrl-c)')
+            print('Exiting.')
+            sys.exit(0)
 
         self.__fetch_cpio(buildinfo.apiurl)
 
+        # record the use of the packages for the garbage collection of the cache
+        self.header_index.touch([i.fullfilename for i in buildinfo.deps if os.path.exists(i.fullfilename)])
+
         prjs = list(buildinfo.projects.keys())
         for prj in prjs:
             dest = os.path.join(self.cachedir, prj)
@@ -395,9 +478,56 @@ def verify_pacs_old(pac_list):
             sys.exit(1)
 
 
-def verify_pacs(bi):
+# don't start processes for verifying just a few packages
+VERIFY_MIN_PACS_PER_JOB = 50
+
+
+def get_keys_id(keys):
+    """
+    Return a digest of the contents of the key files.
+    Signatures verified with the same keys don't have to be verified again.
+    """
+    h = hashlib.sha256()
+    for path in sorted(keys):
+        with open(path, "rb") as f:
+            h.update(f.read())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _verify_pacs_chunk(keys, pac_list, quiet=False):
+    """
+    Verify signatures of ``pac_list`` in a new temporary rpmdb with the imported ``keys``.
+    Return a list of ``(pkg, error)`` tuples for the packages that failed the verification.
+
+    It runs in worker processes, the messages about keys that couldn't be imported are printed only if ``quiet`` is not set.
+    """
+    result = []
+    with contextlib.redirect_stdout(io.StringIO() if quiet else sys.stdout):
+        checker = osc_checker.Checker()
+        try:
+            checker.readkeys(keys)
+        except:
+            checker.cleanup()
+            raise
+    try:
+        for pkg in pac_list:
+            try:
+                checker.check(pkg)
+            except Exception as e:
+                result.append((pkg, str(e)))
+    finally:
+        checker.cleanup()
+    return result
+
+
+def verify_pacs(bi, index=None, jobs=None):
     """Take a list of rpm filenames and verify their signatures.
 
+       The packages are split among ``jobs`` processes, each of them verifies the packages with its own rpmdb.
+       Packages recorded in the ``index`` (a ``PackageCacheIndex``) as verified with the same keys
+       and with the same hdrmd5 as read from the files are skipped.
+
        In case of failure, exit.
        """
 
@@ -413,24 +543,52 @@ def verify_pacs(bi):
 
     print("using keys from", ', '.join(bi.prjkeys))
 
-    failed = False
-    checker = osc_checker.Checker()
-    try:
-        checker.readkeys(bi.keys)
+    # the checker ignores anything but rpms
+    pac_list = [i for i in pac_list if i.endswith(".rpm")]
+
+    keys_id = get_keys_id(bi.keys)
+    hdrmd5s = {}
+    if index is not None:
+        unverified = []
         for pkg in pac_list:
-            try:
-                checker.check(pkg)
-            except Exception as e:
-                failed = True
-                print(pkg, ':', e)
-    except:
-        checker.cleanup()
-        raise
+            # read the header from the file, the headers cached in the index are validated
+            # only by the size and the mtime of the files which is not enough for skipping the verification
+            hdrmd5 = packagequery.PackageQuery.queryhdrmd5(pkg)
+            if hdrmd5 and index.is_verified(pkg, hdrmd5, keys_id):
+                continue
+            hdrmd5s[pkg] = hdrmd5
+            unverified.append(pkg)
+        if len(unverified) < len(pac_list):
+            print(f"skipping {len(pac_list) - len(unverified)} packages verified in previous builds")
+        pac_list = unverified
+
+    if not pac_list:
+        return
+
+    if jobs is None:
+        jobs = conf.config["verify_jobs"] or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(pac_list) // VERIFY_MIN_PACS_PER_JOB))
+
+    if jobs == 1:
+        failed = _verify_pacs_chunk(bi.keys, pac_list)
+    else:
+        failed = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_verify_pacs_chunk, bi.keys, pac_list[i::jobs], i > 0) for i in range(jobs)]
+            for future in futures:
+                failed.extend(future.result())
+        # report the failures in the order of the packages
+        order = {pkg: num for num, pkg in enumerate(pac_list)}
+        failed.sort(key=lambda i: order[i[0]])
+
+    for pkg, e in failed:
+        print(pkg, ':', e)
+
+    if index is not None:
+        failed_pkgs = {pkg for pkg, _ in failed}
+        index.add_verified([(pkg, hdrmd5s[pkg]) for pkg in pac_list if pkg not in failed_pkgs and hdrmd5s[pkg]], keys_id)
 
     if failed:
-        checker.cleanup()
         sys.exit(1)
 
-    checker.cleanup()
-
 # vim: sw=4 et
@@ -5,6 +5,7 @@ from .exceptions import BranchDoesNotExist
 from .exceptions import BranchExists
 from .exceptions import ForkExists
 from .exceptions import GiteaException
+from .exceptions import GitCommandCancelled
 from .exceptions import GitObsRuntimeError
 from .exceptions import RepoExists
 from .exceptions import UserDoesNotExist
@@ -15,10 +16,12 @@ from .conf import Login
 from .fork import Fork
 from .git import Git
 from .git_diff_generator import GitDiffGenerator
+from .http_cache import GiteaHttpCache
 from .issue import Issue
 from .issue_timeline_entry import IssueTimelineEntry
 from .json import json_dumps
 from .maintainership import Maintainership
+from .mirror import GitMirror
 from .pr import PullRequest
 from .pr_review import PullRequestReview
 from .repo import Repo
@@ -310,6 +310,56 @@ class Config:
 
         return login
 
+    def get_http_cache_options(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return options of the http cache for login ``name`` as a dictionary
+        with ``http_cache`` (bool), ``http_cache_ttl`` (seconds) and ``http_cache_size`` (MiB) keys.
+
+        The values from the ``general`` section can be overridden in the login entries.
+        """
+        data = self._read()
+
+        result = {
+            "http_cache": False,
+            "http_cache_ttl": 0,
+            "http_cache_size": 100,
+        }
+
+        entries = [data.get("general", None) or {}]
+        entries += [i for i in data.get("logins", []) if name is not None and i.get("name", None) == name]
+
+        for entry in entries:
+            for key in result:
+                if key in entry:
+                    result[key] = entry[key]
+
+        result["http_cache"] = bool(result["http_cache"])
+        result["http_cache_ttl"] = int(result["http_cache_ttl"])
+        result["http_cache_size"] = int(result["http_cache_size"])
+        return result
+
+    def get_git_mirror_dir(self, name: Optional[str] = None) -> Optional[str]:
+        """
+        Return path to the directory with git mirrors for login ``name``
+        or ``None`` if the ``git_mirror_dir`` option is not set.
+
+        The value from the ``general`` section can be overridden in the login entries.
+        """
+        data = self._read()
+
+        result = None
+
+        entries = [data.get("general", None) or {}]
+        entries += [i for i in data.get("logins", []) if name is not None and i.get("name", None) == name]
+
+        for entry in entries:
+            if "git_mirror_dir" in entry:
+                result = entry["git_mirror_dir"]
+
+        if not result:
+            return None
+        return os.path.abspath(os.path.expanduser(result))
+
     def git_obs_repo_init_template(self, name: Optional[str] = None) -> str:
         data = self._read()
 
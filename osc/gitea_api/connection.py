@@ -1,11 +1,15 @@
+import concurrent.futures
 import copy
 import http.client
 import json
+import queue
 import re
+import threading
 import time
 import urllib.parse
 from typing import Dict
 from typing import Generator
+from typing import List
 from typing import Optional
 
 import urllib3
@@ -13,6 +17,7 @@ import urllib3.exceptions
 import urllib3.response
 
 from .conf import Login
+from .http_cache import GiteaHttpCache
 from .http_signer import HttpSigner
 
 RE_HTTP_HEADER_LINK = re.compile('<(?P<url>.*?)>; rel="(?P<rel>.*?)",?')
@@ -47,18 +52,28 @@ class GiteaHTTPResponse:
 
 
 class Connection:
-    def __init__(self, login: Login, alternative_port: Optional[int] = None):
+    def __init__(
+        self,
+        login: Login,
+        alternative_port: Optional[int] = None,
+        cache: Optional[GiteaHttpCache] = None,
+        pool_size: int = 4,
+    ):
         """
         :param login: ``Login`` object with Gitea url and credentials.
         :param alternative_port: Use an alternative port for the connection. This is needed for testing when gitea runs on a random port.
+        :param cache: Cache of GET responses, see ``GiteaHttpCache.from_login()``.
+        :param pool_size: Maximal number of keep-alive connections, it limits the number of concurrent requests.
+            The connections are opened on demand, sequential requests use only one of them.
         """
         self.login = login
+        self.cache = cache
 
         parsed_url = urllib.parse.urlparse(self.login.url, scheme="https")
         if parsed_url.scheme == "http":
-            ConnectionClass = urllib3.connection.HTTPConnection
+            self._connection_class = urllib3.connection.HTTPConnection
         elif parsed_url.scheme == "https":
-            ConnectionClass = urllib3.connection.HTTPSConnection
+            self._connection_class = urllib3.connection.HTTPSConnection
         else:
             raise ValueError(f"Unsupported scheme in Gitea url '{self.login.url}'")
 
@@ -67,28 +82,84 @@ class Connection:
         assert self.host is not None
         self.port = alternative_port if alternative_port else parsed_url.port
 
-        conn_kwargs = {}
+        # a pool of idle connections; the most recently used one is reused first to keep the others closed
+        self.pool_size = max(pool_size, 1)
+        self._pool: "queue.LifoQueue[urllib3.connection.HTTPConnection]" = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._num_connections = 0
 
-        if urllib3.__version__.startswith("1."):
-            # workaround for urllib3 v1: TypeError: 'object' object cannot be interpreted as an integer
-            conn_kwargs["timeout"] = 60
+        # the first connection is created immediately and remains available as ``conn`` for backwards compatibility
+        self.conn = self._new_conn()
+        self._pool.put(self.conn)
+
+        # the signer reads the ssh key only once and is shared by concurrent requests
+        self._http_signer = HttpSigner(self.login)
 
-        self.conn = ConnectionClass(host=self.host, port=self.port, **conn_kwargs)
+        # number of pages fetched at the same time in ``request_all_pages()``
+        self.page_jobs = 4
 
         # retries; variables are named according to urllib3
         self.retry_count = 3
         self.retry_backoff_factor = 2
+        # maximal number of seconds to wait according to the Retry-After header
+        self.retry_after_max = 120
         self.retry_status_forcelist = (
+            429,  # Too Many Requests
             500,  # Internal Server Error
             502,  # Bad Gateway
             503,  # Service Unavailable
             504,  # Gateway Timeout
         )
 
-        if urllib3.__version__.startswith("1.") and hasattr(self.conn, "set_cert"):
+    def _new_conn(self):
+        conn_kwargs = {}
+
+        if urllib3.__version__.startswith("1."):
+            # workaround for urllib3 v1: TypeError: 'object' object cannot be interpreted as an integer
+            conn_kwargs["timeout"] = 60
+
+        conn = self._connection_class(host=self.host, port=self.port, **conn_kwargs)
+
+        if urllib3.__version__.startswith("1.") and hasattr(conn, "set_cert"):
             # needed to avoid: AttributeError: 'HTTPSConnection' object has no attribute 'assert_hostname'. Did you mean: 'server_hostname'?
             # urllib3 2.x triggers a FutureWarning, the method will be removed in v3
-            self.conn.set_cert()
+            conn.set_cert()
+
+        self._num_connections += 1
+        return conn
+
+    def _get_conn(self):
+        """
+        Take an idle connection from the pool, open a new one if the pool is not full
+        or wait until another thread returns its connection.
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            if self._num_connections < self.pool_size:
+                return self._new_conn()
+
+        return self._pool.get()
+
+    def _put_conn(self, conn):
+        self._pool.put(conn)
+
+    def close(self):
+        """
+        Close all idle connections. They are reopened automatically on the next request.
+        """
+        idle = []
+        while True:
+            try:
+                idle.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in idle:
+            conn.close()
+            self._pool.put(conn)
 
     def makeurl(self, *path: str, query: Optional[dict] = None):
         """
@@ -131,10 +202,28 @@ class Connection:
         headers = {
             "Content-Type": "application/json",
         }
+
+        cache_key = None
+        cache_entry = None
+        cached_response = None
+        if self.cache is not None and method.upper() == "GET":
+            cache_key = GiteaHttpCache.get_key(f"{self.login.url}{url}", self.login.user, headers)
+            cache_entry = self.cache.get(cache_key)
+            if cache_entry is not None:
+                try:
+                    # read the body now, it could be evicted by another process before the server responds
+                    cached_response = GiteaHTTPResponse(cache_entry.to_response())
+                except OSError:
+                    cache_entry = None
+            if cache_entry is not None:
+                if self.cache.is_fresh(cache_entry):
+                    return cached_response
+                cache_entry.add_validators(headers)
+
         ssh_auth = bool(self.login.ssh_key_agent_pub)
         if ssh_auth:
             try:
-                headers.update(HttpSigner(self.login).get_signed_header(method, url))
+                headers.update(self._http_signer.get_signed_header(method, url))
             except Exception as e:
                 raise RuntimeError(f"Failed to sign the request using SSH credentials: {e}")
         elif self.login.token:
@@ -151,38 +240,60 @@ class Connection:
                 json_data = {}
             body = json.dumps(json_data)
 
-        for retry in range(1 + self.retry_count):
-            # 1 regular request + ``self.retry_count`` retries
-            try:
-                self.conn.request(method, url, body, headers)
-                response = self.conn.getresponse()
-
-                if response.status not in self.retry_status_forcelist:
-                    # we are happy with the response status -> use the response
-                    break
-
-                if retry >= self.retry_count:
-                    # we have reached maximum number of retries -> use the response
-                    break
-
-            except (urllib3.exceptions.HTTPError, ConnectionResetError):
-                if retry >= self.retry_count:
-                    raise
-
-            # {backoff factor} * (2 ** ({number of previous retries}))
-            time.sleep(self.retry_backoff_factor * (2 ** retry))
-            self.conn.close()
-
-        if isinstance(response, http.client.HTTPResponse):
-            response = GiteaHTTPResponse(urllib3.response.HTTPResponse.from_httplib(response))
-        else:
-            response = GiteaHTTPResponse(response)
+        conn = self._get_conn()
+        try:
+            for retry in range(1 + self.retry_count):
+                # 1 regular request + ``self.retry_count`` retries
+                retry_after = None
+                try:
+                    conn.request(method, url, body, headers)
+                    response = conn.getresponse()
+
+                    if response.status not in self.retry_status_forcelist:
+                        # we are happy with the response status -> use the response
+                        break
+
+                    if retry >= self.retry_count:
+                        # we have reached maximum number of retries -> use the response
+                        break
+
+                    retry_after = self._get_retry_after(response)
+
+                except (urllib3.exceptions.HTTPError, ConnectionResetError):
+                    if retry >= self.retry_count:
+                        conn.close()
+                        raise
+
+                if retry_after is not None:
+                    # the server is rate limiting us and tells us how long to wait
+                    time.sleep(retry_after)
+                else:
+                    # {backoff factor} * (2 ** ({number of previous retries}))
+                    time.sleep(self.retry_backoff_factor * (2 ** retry))
+                conn.close()
+
+            # the body must be read before the connection can be used by another request
+            if isinstance(response, http.client.HTTPResponse):
+                response = GiteaHTTPResponse(urllib3.response.HTTPResponse.from_httplib(response))
+            else:
+                response = GiteaHTTPResponse(response)
+        finally:
+            self._put_conn(conn)
 
         if not hasattr(response, "status"):
             from .exceptions import GiteaException  # pylint: disable=import-outside-toplevel,cyclic-import
 
             raise GiteaException(response)
 
+        if cache_key is not None:
+            if response.status == 304 and cache_entry is not None:
+                # not modified, serve the cached body
+                self.cache.touch(cache_entry)
+                response = cached_response
+            elif response.status == 200 and len(response.data) <= self.cache.max_size // 8:
+                if self.cache.ttl or "ETag" in response.headers or "Last-Modified" in response.headers:
+                    self.cache.store_data(cache_key, url, response.headers, response.data)
+
         if response.status // 100 != 2:
             from .exceptions import response_to_exception
 
@@ -190,18 +301,49 @@ class Connection:
 
         return response
 
+    def _get_retry_after(self, response) -> Optional[float]:
+        """
+        Return the number of seconds from the ``Retry-After`` header of a ``429 Too Many Requests`` response.
+        """
+        if response.status != 429:
+            return None
+        try:
+            value = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            # missing header or a http date, use the exponential backoff
+            return None
+        return min(max(value, 0), self.retry_after_max)
+
     def request_all_pages(
-        self, method, url, json_data: Optional[dict] = None, *, context: Optional[dict] = None
+        self,
+        method,
+        url,
+        json_data: Optional[dict] = None,
+        *,
+        context: Optional[dict] = None,
+        jobs: Optional[int] = None,
     ) -> Generator[GiteaHTTPResponse, None, None]:
         """
         Make a request and yield ``GiteaHTTPResponse`` instances for each page.
         Arguments are forwarded to the underlying ``request()`` call.
+
+        If the first page of a GET request reports the total number of items in the ``X-Total-Count`` header,
+        the remaining pages are fetched concurrently, ``jobs`` at a time and at most ``pool_size`` at a time.
+        The pages are yielded in order as soon as they arrive.
+
+        :param jobs: Number of pages fetched at the same time, defaults to ``page_jobs``.
         """
+        response = self.request(method, url, json_data=json_data, context=context)
+        yield response
 
-        while True:
-            response = self.request(method, url, json_data=json_data, context=context)
-            yield response
+        jobs = self.page_jobs if jobs is None else jobs
+        page_urls = self._get_page_urls(response) if method.upper() == "GET" and jobs > 1 else []
+
+        if page_urls:
+            for response in self._request_pages(page_urls, jobs, context=context):
+                yield response
 
+        while True:
             if "link" not in response.headers:
                 break
 
@@ -210,3 +352,55 @@ class Connection:
                 url = links["next"]
             else:
                 break
+
+            # more items might have been added while fetching the pages concurrently
+            response = self.request(method, url, json_data=json_data, context=context)
+            yield response
+
+    def _get_page_urls(self, response: GiteaHTTPResponse) -> List[str]:
+        """
+        Compute urls of all pages following the ``response`` from the ``X-Total-Count`` header and the ``next`` link.
+        """
+        if "link" not in response.headers or "x-total-count" not in response.headers:
+            return []
+
+        links = parse_http_header_link(response.headers["link"])
+        if "next" not in links:
+            return []
+
+        url = urllib.parse.urlsplit(links["next"])
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            total = int(response.headers["x-total-count"])
+            limit = int(query["limit"][0])
+            next_page = int(query["page"][0])
+        except (KeyError, ValueError):
+            return []
+        if limit <= 0:
+            return []
+
+        result = []
+        last_page = (total + limit - 1) // limit
+        for page in range(next_page, last_page + 1):
+            query["page"] = [str(page)]
+            result.append(urllib.parse.urlunsplit(url._replace(query=urllib.parse.urlencode(query, doseq=True))))
+        return result
+
+    def _request_pages(self, urls: List[str], jobs: int, *, context: Optional[dict] = None) -> Generator[GiteaHTTPResponse, None, None]:
+        """
+        GET ``urls`` concurrently and yield the responses in the order of ``urls``.
+        """
+        def get_page(url):
+            return self.request("GET", url, context=context)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+        futures = []
+        try:
+            futures += [executor.submit(get_page, url) for url in urls]
+            for future in futures:
+                yield future.result()
+        finally:
+            # the caller might have stopped reading the pages or a request has failed
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
@@ -81,6 +81,10 @@ class GitObsRuntimeError(oscerr.OscBaseError):
     pass
 
 
+class GitCommandCancelled(GitObsRuntimeError):
+    pass
+
+
 class MovedPermanently(GiteaException):
     RESPONSE_STATUS = 301
     RESPONSE_MESSAGE_RE = [
@@ -1,7 +1,9 @@
 import os
 import re
+import signal
 import subprocess
 import sys
+import threading
 import urllib
 from typing import Dict
 from typing import Iterator
@@ -12,6 +14,69 @@ from typing import Tuple
 from . import exceptions
 
 
+def get_background_env(env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Return environment for git commands running in background
+    that makes git and ssh fail instead of prompting for credentials or confirming host keys.
+    """
+    env = dict(os.environ if env is None else env)
+    env["GIT_TERMINAL_PROMPT"] = "0"
+
+    ssh_command = env.get("GIT_SSH_COMMAND")
+    if not ssh_command:
+        # GIT_SSH_COMMAND takes precedence over core.sshCommand, we must not lose the configured command
+        proc = subprocess.run(["git", "config", "--get", "core.sshCommand"], stdout=subprocess.PIPE, encoding="utf-8", check=False)
+        ssh_command = proc.stdout.strip() or "ssh"
+    env["GIT_SSH_COMMAND"] = f"{ssh_command} -o BatchMode=yes"
+    return env
+
+
+def run_background_command(
+    cmd: List[str],
+    *,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    cancelled: Optional[threading.Event] = None,
+) -> str:
+    """
+    Run a git command in background, return its stripped stdout.
+
+    The command runs in a new session without access to the terminal and with stderr muted,
+    so it never interferes with the foreground program.
+    It is terminated together with its children (ssh, git-lfs) as soon as ``cancelled`` is set.
+
+    :raises GitCommandCancelled: The command was terminated because ``cancelled`` was set.
+    :raises subprocess.CalledProcessError: The command has failed.
+    """
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env=get_background_env(env),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+        start_new_session=True,
+    ) as proc:
+        while True:
+            try:
+                stdout, _ = proc.communicate(timeout=None if cancelled is None else 0.1)
+                break
+            except subprocess.TimeoutExpired:
+                if not cancelled.is_set():
+                    continue
+                try:
+                    os.killpg(proc.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+                proc.communicate()
+                raise exceptions.GitCommandCancelled(f"Command was cancelled: {' '.join(cmd)}")
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout)
+    return stdout.strip()
+
+
 class SshParseResult(urllib.parse.ParseResult):
     """
     Class to distinguish parsed SSH URLs
@@ -130,8 +195,13 @@ class Git:
 
         return is_bare, git_dir, top_dir
 
-    def __init__(self, workdir):
+    def __init__(self, workdir, *, cancelled: Optional[threading.Event] = None):
+        """
+        :param cancelled: Run the git commands in background with ``run_background_command()``
+                          and terminate them once the event is set.
+        """
         self.abspath = os.path.abspath(workdir)
+        self.cancelled = cancelled
         self.is_bare = None
         self.git_dir = None
         self.topdir = None
@@ -142,6 +212,8 @@ class Git:
 
     def _run_git(self, args: List[str], use_topdir: bool = False, mute_stderr: bool = False) -> str:
         cwd = self.topdir if use_topdir else self.abspath
+        if self.cancelled is not None:
+            return run_background_command(["git"] + args, cwd=cwd, cancelled=self.cancelled)
         # HACK: having 2 nearly identical commands is stupid, but it muted a mypy error
         if mute_stderr:
             return subprocess.check_output(["git"] + args, encoding="utf-8", cwd=cwd, stderr=subprocess.DEVNULL).strip()
@@ -161,18 +233,22 @@ class Git:
         directory: Optional[str] = None,
         reference: Optional[str] = None,
         reference_if_able: Optional[str] = None,
-        quiet: bool = True
+        quiet: bool = True,
+        mute_stderr: bool = False,
+        config: Optional[Dict[str, str]] = None,
     ):
         cmd = ["clone", url]
         if directory:
             cmd += [directory]
+        for key, value in (config or {}).items():
+            cmd += ["-c", f"{key}={value}"]
         if reference:
             cmd += ["--reference", reference]
         if reference_if_able:
             cmd += ["--reference-if-able", reference_if_able]
         if quiet:
             cmd += ["-q"]
-        self._run_git(cmd)
+        self._run_git(cmd, mute_stderr=mute_stderr)
 
     # BRANCHES
 
@@ -289,6 +365,7 @@ class Git:
         commit: Optional[str] = None,
         depth: Optional[int] = None,
         force: bool = False,
+        mute_stderr: bool = False,
     ):
         """
         Fetch pull/$pull_number/head to pull/$pull_number branch
@@ -310,7 +387,7 @@ class Git:
                 "--force",
                 "--update-head-ok",
             ]
-        self._run_git(cmd)
+        self._run_git(cmd, mute_stderr=mute_stderr)
         return target_branch
 
     @property
@@ -382,12 +459,12 @@ class Git:
 
         return result
 
-    def fetch(self, name: Optional[str] = None):
+    def fetch(self, name: Optional[str] = None, *, mute_stderr: bool = False):
         if name:
             cmd = ["fetch", name]
         else:
             cmd = ["fetch", "--all"]
-        self._run_git(cmd)
+        self._run_git(cmd, mute_stderr=mute_stderr)
 
     @staticmethod
     def split_owner_repo(path: str) -> Tuple[str, str]:
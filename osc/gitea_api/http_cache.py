@@ -0,0 +1,32 @@
+import os
+import urllib.parse
+from typing import Optional
+
+from osc.http_cache import HttpCache
+from osc.util import xdg
+
+from .conf import Config
+from .conf import Login
+
+
+class GiteaHttpCache(HttpCache):
+    """
+    On-disk cache of responses to GET requests to the Gitea API of a single login.
+    """
+
+    # the pagination headers are needed to serve listings from the cache
+    stored_headers = HttpCache.stored_headers + ("Link", "X-Total-Count", "X-HasMore")
+
+    @classmethod
+    def from_login(cls, config: Config, login: Login) -> Optional["GiteaHttpCache"]:
+        """
+        Return the cache for the ``login`` or ``None`` if the cache is disabled in the git-obs config.
+        """
+        options = config.get_http_cache_options(login.name)
+        if not options["http_cache"]:
+            return None
+
+        # every user gets a separate cache, the responses depend on their permissions
+        netloc = urllib.parse.urlsplit(login.url).netloc.replace(":", "_")
+        path = os.path.join(os.path.expanduser(xdg.XDG_CACHE_HOME), "git-obs", "http", netloc, login.user)
+        return cls(path, options["http_cache_ttl"], options["http_cache_size"] * 1024**2)
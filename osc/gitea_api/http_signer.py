@@ -2,11 +2,29 @@ import base64
 import datetime
 import hashlib
 import os
+import threading
 
 
 class HttpSigner:
     def __init__(self, login_obj):
         self.login_obj = login_obj
+        self._signer = None
+        # the ssh-agent connection is not thread-safe
+        self._lock = threading.Lock()
+
+    def _get_signer(self):
+        """
+        Return a signing function and algorithm name.
+        The key is read from the file or the ssh-agent only once per ``HttpSigner`` instance.
+        """
+        if self._signer is None:
+            if self.login_obj.ssh_agent:
+                self._signer = self._get_signer_from_agent()
+            elif self.login_obj.ssh_key:
+                self._signer = self._get_signer_from_file()
+            else:
+                raise ValueError("No SSH authentication method configured for this login entry.")
+        return self._signer
 
     def _get_signer_from_file(self):
         """
@@ -154,13 +172,6 @@ class HttpSigner:
         Sign the request data using the configured authentication method (SSH key or agent).
         Returns a tuple of (signature, algorithm_name).
         """
-        if self.login_obj.ssh_agent:
-            sign_func, algorithm_name = self._get_signer_from_agent()
-        elif self.login_obj.ssh_key:
-            sign_func, algorithm_name = self._get_signer_from_file()
-        else:
-            raise ValueError("No SSH authentication method configured for this login entry.")
-
         # Timestamps
         now = datetime.datetime.now(datetime.timezone.utc)
         created = int(now.timestamp())
@@ -183,11 +194,14 @@ class HttpSigner:
             f"(expires): {expires}"
         )
 
-        try:
-            signature_bytes = sign_func(signing_string.encode("utf-8"))
-            signature_b64 = base64.b64encode(signature_bytes).decode("utf-8")
-        except Exception as e:
-            raise RuntimeError(f"Failed to sign data: {e}")
+        with self._lock:
+            sign_func, algorithm_name = self._get_signer()
+            try:
+                signature_bytes = sign_func(signing_string.encode("utf-8"))
+            except Exception as e:
+                raise RuntimeError(f"Failed to sign data: {e}")
+
+        signature_b64 = base64.b64encode(signature_bytes).decode("utf-8")
 
         headers_list = "(request-target) (created) (expires)"
 
@@ -0,0 +1,245 @@
+import contextlib
+import fcntl
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+import urllib.parse
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+
+from .conf import Config
+from .conf import Login
+from .connection import Connection
+
+
+class GitMirror:
+    """
+    Bare mirrors of git repos and a shared git lfs object storage.
+
+    The clones borrow objects from the mirrors via git alternates
+    and store git lfs objects in the shared storage, so only the changes since the last update get downloaded.
+
+    Directory layout::
+
+        <path>/<owner>/<repo>.git       - bare mirror of the repo
+        <path>/<owner>/<repo>.git.lock  - lock file held while the mirror is being updated
+        <path>/lfs                      - git lfs objects shared by all clones
+    """
+
+    # a file in the mirror directory whose mtime records the last successful update
+    STAMP_FILE = "osc-mirror-updated"
+
+    # git lfs pointer files are smaller than 1024 bytes by the specification
+    LFS_POINTER_MAX_SIZE = 1024
+    LFS_POINTER_RE = re.compile(rb"^version https://git-lfs\.github\.com/spec/v1\noid sha256:([0-9a-f]{64})\n", re.M)
+
+    def __init__(self, path: str, *, use_http: bool = False):
+        self.path = os.path.abspath(path)
+        self.use_http = use_http
+
+    @classmethod
+    def from_login(cls, config: Config, login: Login) -> Optional["GitMirror"]:
+        """
+        Return the mirror for the ``login`` or ``None`` if ``git_mirror_dir`` is not set in the git-obs config.
+        """
+        path = config.get_git_mirror_dir(login.name)
+        if not path:
+            return None
+
+        # the repos are identical for all users of the same Gitea instance
+        netloc = urllib.parse.urlsplit(login.url).netloc.replace(":", "_")
+        return cls(os.path.join(path, netloc), use_http=bool(login.git_uses_http))
+
+    @property
+    def lfs_storage(self) -> str:
+        return os.path.join(self.path, "lfs")
+
+    def get_path(self, owner: str, repo: str) -> str:
+        # Gitea is case insensitive
+        return os.path.join(self.path, owner.lower(), f"{repo.lower()}.git")
+
+    def get_clone_config(self) -> Dict[str, str]:
+        """
+        Return git config that makes a clone use the shared git lfs object storage.
+        Pass it to ``git clone -c <key>=<value>`` so it applies already to the initial checkout.
+        """
+        return {"lfs.storage": self.lfs_storage}
+
+    @contextlib.contextmanager
+    def lock(self, owner: str, repo: str, *, blocking: bool = True) -> Iterator[bool]:
+        """
+        Lock the mirror for exclusive use, yield ``False`` if ``blocking`` is disabled and the mirror is already locked.
+        The lock is held by an open file description, so it works across both processes and threads.
+        """
+        lock_path = self.get_path(owner, repo) + ".lock"
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        # the lock file is never removed, removing it would allow 2 processes to lock different inodes
+        with open(lock_path, "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_last_update(self, owner: str, repo: str) -> Optional[float]:
+        try:
+            return os.stat(os.path.join(self.get_path(owner, repo), self.STAMP_FILE)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def update(
+        self,
+        conn: Connection,
+        owner: str,
+        repo: str,
+        *,
+        env: Optional[Dict[str, str]] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> str:
+        """
+        Create or fetch the mirror of the repo, return path to it.
+
+        :param conn: Gitea ``Connection`` instance.
+        :param owner: Owner of the repo.
+        :param repo: Name of the repo.
+        :param env: Environment of the git commands, for example with ``GIT_SSH_COMMAND`` set.
+        :param cancelled: Run the git commands in background and terminate them once the event is set,
+                          see ``run_background_command()``.
+        """
+        from .git import run_background_command
+        from .repo import Repo
+
+        def run(cmd, env=None):
+            if cancelled is not None:
+                run_background_command(cmd, env=env, cancelled=cancelled)
+            else:
+                subprocess.run(cmd, env=env, check=True)
+
+        path = self.get_path(owner, repo)
+        start = time.time()
+
+        with self.lock(owner, repo):
+            last_update = self.get_last_update(owner, repo)
+            if last_update is not None and last_update >= start:
+                # updated by another process or thread while we were waiting for the lock
+                return path
+
+            if os.path.isdir(path):
+                cmd = ["git", "-C", path, "fetch", "--prune", "--quiet", "origin"]
+                run(cmd, env=env)
+            else:
+                repo_obj = Repo.get(conn, owner, repo)
+                clone_url = repo_obj.clone_url if self.use_http else repo_obj.ssh_url
+
+                # clone to a temporary directory first to never leave an incomplete mirror behind
+                tmp_path = path + ".tmp"
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                cmd = ["git", "clone", "--mirror", "--quiet", clone_url, tmp_path]
+                run(cmd, env=env)
+
+                # the clones borrow objects from the mirror, git gc must never remove them
+                cmd = ["git", "-C", tmp_path, "config", "gc.pruneExpire", "never"]
+                run(cmd)
+                os.rename(tmp_path, path)
+
+            with open(os.path.join(path, self.STAMP_FILE), "w"):
+                pass
+
+        return path
+
+    def get_lfs_oids(self, owner: str, repo: str) -> Set[str]:
+        """
+        Return oids of the git lfs objects referenced by any object in the mirror.
+        The pointer files are read directly from git, git lfs is not required.
+        """
+        path = self.get_path(owner, repo)
+
+        cmd = ["git", "-C", path, "cat-file", "--batch-all-objects", "--batch-check=%(objectname) %(objecttype) %(objectsize)"]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, check=True)
+        blobs = []
+        for line in proc.stdout.splitlines():
+            objectname, objecttype, objectsize = line.split(b" ")
+            if objecttype == b"blob" and int(objectsize) < self.LFS_POINTER_MAX_SIZE:
+                blobs.append(objectname)
+
+        if not blobs:
+            return set()
+
+        cmd = ["git", "-C", path, "cat-file", "--batch"]
+        proc = subprocess.run(cmd, input=b"\n".join(blobs) + b"\n", stdout=subprocess.PIPE, check=True)
+        return {i.decode("ascii") for i in self.LFS_POINTER_RE.findall(proc.stdout)}
+
+    def prune(self, max_age: float, *, dry_run: bool = False) -> List[str]:
+        """
+        Remove mirrors that haven't been updated in ``max_age`` seconds
+        and git lfs objects that are older than ``max_age`` seconds and not referenced by any remaining mirror.
+        Mirrors that are currently locked are skipped.
+        Return list of the removed paths.
+
+        The git lfs objects are selected by the references because git lfs doesn't update their mtime on use.
+
+        IMPORTANT: Clones created from a removed mirror lose access to the borrowed objects.
+        """
+        result = []
+        threshold = time.time() - max_age
+
+        if not os.path.isdir(self.path):
+            return result
+
+        remaining = []
+
+        for owner in sorted(os.listdir(self.path)):
+            owner_path = os.path.join(self.path, owner)
+            if owner == "lfs" or not os.path.isdir(owner_path):
+                continue
+            for name in sorted(os.listdir(owner_path)):
+                if not name.endswith(".git"):
+                    continue
+                repo = name[:-4]
+                last_update = self.get_last_update(owner, repo)
+                if last_update is not None and last_update >= threshold:
+                    remaining.append((owner, repo))
+                    continue
+                with self.lock(owner, repo, blocking=False) as locked:
+                    if not locked:
+                        remaining.append((owner, repo))
+                        continue
+                    path = self.get_path(owner, repo)
+                    if not dry_run:
+                        shutil.rmtree(path)
+                    result.append(path)
+
+        if not os.path.isdir(self.lfs_storage):
+            return result
+
+        lfs_oids = set()
+        for owner, repo in remaining:
+            lfs_oids.update(self.get_lfs_oids(owner, repo))
+
+        objects_dir = os.path.join(self.lfs_storage, "objects")
+        for root, dirs, files in os.walk(self.lfs_storage):
+            for fn in files:
+                path = os.path.join(root, fn)
+                if root.startswith(objects_dir + os.sep) and fn in lfs_oids:
+                    continue
+                try:
+                    # the age protects objects of clones that are running right now
+                    if os.stat(path).st_mtime >= threshold:
+                        continue
+                    if not dry_run:
+                        os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                result.append(path)
+
+        return result
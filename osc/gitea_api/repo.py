@@ -2,13 +2,14 @@ import functools
 import os
 import re
 import subprocess
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from typing import Optional
 from typing import Tuple
 
 from .common import GiteaModel
 from .connection import Connection
 from .connection import GiteaHTTPResponse
+from .mirror import GitMirror
 from .user import User
 
 
@@ -108,6 +109,8 @@ class Repo(GiteaModel):
         sparse: Optional[List[str]] = None,
         ssh_private_key_path: Optional[str] = None,
         ssh_strict_host_key_checking: bool = True,
+        mirror: Optional["GitMirror"] = None,
+        dissociate: bool = False,
     ) -> str:
         """
         Clone a repository using 'git clone' command, return absolute path to it.
@@ -123,6 +126,10 @@ class Repo(GiteaModel):
         :param reference: Reuse objects from the specified local repository, error out if the repository doesn't exist.
         :param reference_if_able: Reuse objects from the specified local repository, only print warning if the repository doesn't exist.
         :param sparse: checkout only files matching the specified patterns.
+        :param mirror: Update the repo in the ``GitMirror`` and borrow objects from it via git alternates.
+                       It is ignored if ``reference`` or ``reference_if_able`` is specified.
+        :param dissociate: Copy the objects from the ``mirror`` instead of borrowing them.
+                           Use it for long-lived clones that must survive pruning the mirror.
         """
         import shlex
 
@@ -131,7 +138,10 @@ class Repo(GiteaModel):
         # it's perfectly fine to use os.path.join() here because git can take an absolute path
         directory_abspath = os.path.join(cwd, directory)
 
-        if cache_directory and not reference_if_able:
+        if mirror and (reference or reference_if_able):
+            mirror = None
+
+        if cache_directory and not reference_if_able and not mirror:
             cache_directory = os.path.join(cache_directory, conn.login.name, owner, repo)
             cls.clone_or_update(conn, owner, repo, directory=cache_directory)
             reference_if_able = cache_directory
@@ -180,6 +190,9 @@ class Repo(GiteaModel):
                 env["GIT_SSH_COMMAND"] = "ssh"
             env["GIT_SSH_COMMAND"] += f" {' '.join(ssh_args)}"
 
+        if mirror:
+            reference = mirror.update(conn, owner, repo, env=env)
+
         # clone
         cmd = ["git", "clone", clone_url, directory]
 
@@ -192,9 +205,15 @@ class Repo(GiteaModel):
         if reference_if_able:
             cmd += ["--reference-if-able", reference_if_able]
 
-        if reference or reference_if_able:
+        if mirror and not dissociate:
+            # unlike with the other references, we keep borrowing the objects from the mirror via alternates
+            for key, value in mirror.get_clone_config().items():
+                cmd += ["-c", f"{key}={value}"]
+        elif reference or reference_if_able:
             # we want to make the newly cloned repo to be independent, this stops borrowing the objects
             cmd += ["--dissociate"]
+
+        if reference or reference_if_able:
             # workaround for https://lore.kernel.org/git/6ae85515-9373-4c9e-90d2-5e4176590c5b@suse.com/T/#u
             cmd += ["-c", "core.commitGraph=false"]
 
@@ -272,6 +291,8 @@ class Repo(GiteaModel):
         depth: Optional[int] = None,
         remote: Optional[str] = None,
         ssh_private_key_path: Optional[str] = None,
+        mirror: Optional["GitMirror"] = None,
+        dissociate: bool = False,
     ):
         from osc import gitea_api
 
@@ -288,6 +309,8 @@ class Repo(GiteaModel):
                 reference_if_able=reference_if_able,
                 depth=depth,
                 ssh_private_key_path=ssh_private_key_path,
+                mirror=mirror,
+                dissociate=dissociate,
             )
 
         git = gitea_api.Git(directory)
@@ -320,6 +343,21 @@ class Repo(GiteaModel):
         else:
             git.fetch()
 
+    @classmethod
+    def iter_org_repos(cls, conn: Connection, owner: str) -> Iterator["Repo"]:
+        """
+        Yield repos owned by an organization as soon as their page arrives.
+
+        :param conn: Gitea ``Connection`` instance.
+        """
+        q = {
+            "limit": 50,
+        }
+        url = conn.makeurl("orgs", owner, "repos", query=q)
+        for response in conn.request_all_pages("GET", url):
+            for i in response.json():
+                yield cls(i, response=response)
+
     @classmethod
     def list_org_repos(cls, conn: Connection, owner: str) -> List["Repo"]:
         """
@@ -327,11 +365,7 @@ class Repo(GiteaModel):
 
         :param conn: Gitea ``Connection`` instance.
         """
-        url = conn.makeurl("orgs", owner, "repos")
-        obj_list = []
-        for response in conn.request_all_pages("GET", url):
-            obj_list.extend([cls(i, response=response) for i in response.json()])
-        return obj_list
+        return list(cls.iter_org_repos(conn, owner))
 
     @classmethod
     def list_my_repos(cls, conn: Connection) -> List["Repo"]:
@@ -7,7 +7,7 @@ class StagingPullRequestWrapper:
     INPROGRESS_LABEL = "staging/In Progress"
     ONHOLD_LABEL = "staging/On Hold"
     
-    def __init__(self, conn, owner: str, repo: str, number: int, *, topdir: str, cache_directory: Optional[str] = None):
+    def __init__(self, conn, owner: str, repo: str, number: int, *, topdir: str, cache_directory: Optional[str] = None, mirror: Optional["GitMirror"] = None):
         from . import PullRequest
 
         self.conn = conn
@@ -16,6 +16,7 @@ class StagingPullRequestWrapper:
         self.number = number
         self._topdir = topdir
         self._cache_directory = cache_directory
+        self._mirror = mirror
 
         self.pr_obj = PullRequest.get(conn, owner, repo, number)
         self.git = None
@@ -39,6 +40,7 @@ class StagingPullRequestWrapper:
             directory=path,
             cache_directory=self._cache_directory,
             ssh_private_key_path=self.conn.login.ssh_key,
+            mirror=self._mirror,
         )
         self.git = Git(path)
 
@@ -46,7 +48,7 @@ class StagingPullRequestWrapper:
         self.submodules_by_owner_repo = dict([((i["owner"].lower(), i["repo"].lower()), i) for i in submodules.values()])
 
         for pkg_owner, pkg_repo, pkg_number in self.pr_obj.parse_pr_references():
-            pkg_pr_obj = self.__class__(self.conn, pkg_owner, pkg_repo, pkg_number, topdir=self._topdir)
+            pkg_pr_obj = self.__class__(self.conn, pkg_owner, pkg_repo, pkg_number, topdir=self._topdir, mirror=self._mirror)
             self.package_pr_map[(pkg_owner.lower(), pkg_repo.lower(), pkg_number)] = pkg_pr_obj
             # FIXME: doesn't work when the commits are padded with zeros
             # assert self.submodules_by_owner_repo[(pkg_owner.lower(), pkg_repo.lower())]["commit"] == pkg_pr_obj.pr_obj.head_commit
@@ -65,6 +67,7 @@ class StagingPullRequestWrapper:
             directory=path,
             cache_directory=self._cache_directory,
             ssh_private_key_path=self.conn.login.ssh_key,
+            mirror=self._mirror,
         )
         self.base_git = Git(path)
 
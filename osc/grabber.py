@@ -4,6 +4,7 @@
 # either version 2, or (at your option) any later version.
 
 
+import io
 import os
 from urllib.request import HTTPError
 from urllib.parse import urlparse
@@ -19,9 +20,56 @@ except ImportError:
 from .core import streamfile
 
 
+class _StreamReader(io.RawIOBase):
+    """
+    Turn an iterable of bytes chunks (such as ``streamfile()``) into a readable file object.
+    """
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._buf = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            self._buf = next(self._chunks, None)
+            if self._buf is None:
+                self._buf = b""
+                return 0
+        size = min(len(b), len(self._buf))
+        b[:size] = self._buf[:size]
+        self._buf = self._buf[size:]
+        return size
+
+    def close(self):
+        if hasattr(self._chunks, "close"):
+            self._chunks.close()
+        super().close()
+
+
+class GrabCancelled(Exception):
+    """
+    The download was aborted because the ``cancel_event`` of the grabber was set.
+    """
+
+
 class OscFileGrabber:
-    def __init__(self, progress_obj=None):
+    def __init__(self, progress_obj=None, cancel_event=None):
+        """
+        :param cancel_event: A ``threading.Event`` that aborts running ``urlgrab()`` calls with ``GrabCancelled`` when set.
+        """
         self.progress_obj = progress_obj
+        self.cancel_event = cancel_event
+
+    def urlopen(self, url, text=None):
+        """
+        Return a file object streaming the contents of ``url`` without storing it on disk.
+        """
+        chunks = streamfile(url, progress_obj=self.progress_obj, text=text)
+        return io.BufferedReader(_StreamReader(chunks))
 
     def urlgrab(self, url, filename=None, text=None):
         if filename is None:
@@ -30,6 +78,8 @@ class OscFileGrabber:
         with open(filename, 'wb') as f:
             for i in streamfile(url, progress_obj=self.progress_obj,
                                 text=text):
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise GrabCancelled(url)
                 f.write(i)
 
 
@@ -0,0 +1,223 @@
+"""
+On-disk cache of responses to GET requests to the OBS API.
+
+A cached response is revalidated with ``If-None-Match`` and ``If-Modified-Since`` headers
+and a ``304 Not Modified`` response is answered from the disk.
+Within the optional TTL, cached responses are returned without contacting the server at all.
+
+The cache is enabled per apiurl with the ``http_cache`` host option.
+"""
+
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Optional
+
+import urllib3.response
+
+from .util.dircache import SizeBoundedDirCache
+
+
+# headers that are stored together with the response body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class HttpCacheEntry:
+    def __init__(self, path: str, meta: dict, data: Optional[bytes] = None):
+        self.path = path
+        self.meta = meta
+        self._data = data
+
+    @property
+    def stored_at(self) -> float:
+        return self.meta["stored_at"]
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.meta["headers"].get("ETag", None)
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.meta["headers"].get("Last-Modified", None)
+
+    def add_validators(self, headers):
+        """
+        Add conditional request headers to ``headers``.
+        """
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+    def to_response(self) -> urllib3.response.HTTPResponse:
+        data = self._data
+        if data is None:
+            with open(self.path + ".body", "rb") as f:
+                data = f.read()
+        headers = urllib3.response.HTTPHeaderDict(self.meta["headers"])
+        headers["Content-Length"] = str(len(data))
+        return urllib3.response.HTTPResponse(
+            body=io.BytesIO(data),
+            headers=headers,
+            status=200,
+            reason="OK",
+            preload_content=False,
+            decode_content=False,
+        )
+
+
+class HttpCache(SizeBoundedDirCache):
+    """
+    Cache of GET responses of a single apiurl.
+
+    Each response is stored in a ``<key>.body`` file with a ``<key>.json`` file holding the metadata,
+    whose mtime records the last use of the response.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    # headers that are stored together with the response body
+    stored_headers = STORED_HEADERS
+
+    def __init__(self, path: str, ttl: int, max_size: int):
+        """
+        :param path: Path to the cache directory.
+        :param ttl: Number of seconds a cached response is used without revalidation.
+        :param max_size: Maximal size of the cache in bytes.
+        """
+        super().__init__(path, max_size)
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, apiurl: str) -> Optional["HttpCache"]:
+        """
+        Return the cache of ``apiurl`` or ``None`` if the cache is disabled for the apiurl.
+        """
+        from . import conf
+
+        options = conf.config["api_host_options"][apiurl]
+        if not options["http_cache"]:
+            return None
+
+        netloc = urllib.parse.urlsplit(apiurl).netloc.replace(":", "_")
+        path = os.path.join(os.path.expanduser(conf.config["http_cache_dir"]), netloc)
+        ttl = int(options["http_cache_ttl"])
+        max_size = int(options["http_cache_size"]) * 1024**2
+
+        with cls._instances_lock:
+            key = (path, ttl, max_size)
+            if key not in cls._instances:
+                cls._instances[key] = cls(path, ttl, max_size)
+            return cls._instances[key]
+
+    @staticmethod
+    def get_key(url: str, user: Optional[str], headers) -> str:
+        """
+        Compute the cache key from the request URL, the user and the ``Accept`` header.
+        """
+        data = "\0".join([url, user or "", headers.get("Accept", "")])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def get(self, key: str) -> Optional[HttpCacheEntry]:
+        path = self._get_path(key)
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isfile(path + ".body"):
+            return None
+        return HttpCacheEntry(path, meta)
+
+    def is_fresh(self, entry: HttpCacheEntry) -> bool:
+        """
+        Whether the entry can be used without revalidation.
+        """
+        return self.ttl > 0 and time.time() - entry.stored_at < self.ttl
+
+    def touch(self, entry: HttpCacheEntry):
+        """
+        Mark the entry as revalidated.
+        """
+        entry.meta["stored_at"] = time.time()
+        try:
+            self._write(entry.path + ".json", json.dumps(entry.meta).encode("utf-8"))
+        except OSError:
+            pass
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        # the responses may contain private data, the files are readable only by the owner
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.rename(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def store(self, key: str, url: str, response: urllib3.response.HTTPResponse) -> urllib3.response.HTTPResponse:
+        """
+        Store a ``200 OK`` response and return a response that replaces it for the caller.
+
+        Responses without validators (unless a TTL is configured),
+        without Content-Length or too big for the cache are not stored
+        and the original response is returned.
+        """
+        if not self.ttl and "ETag" not in response.headers and "Last-Modified" not in response.headers:
+            return response
+
+        try:
+            content_length = int(response.headers.get("Content-Length", ""))
+        except ValueError:
+            return response
+        # a single response must not evict too much of the cache
+        if content_length > self.max_size // 8:
+            return response
+
+        data = response.read()
+        response.release_conn()
+        return self.store_data(key, url, response.headers, data).to_response()
+
+    def store_data(self, key: str, url: str, headers, data: bytes) -> HttpCacheEntry:
+        """
+        Store a response body that has already been read together with the ``stored_headers`` from ``headers``.
+        The returned entry is valid even if writing to the cache failed.
+        """
+        headers = {i: headers[i] for i in self.stored_headers if i in headers}
+        meta = {"url": url, "stored_at": time.time(), "headers": headers}
+        path = self._get_path(key)
+        try:
+            self._write(path + ".body", data)
+            self._write(path + ".json", json.dumps(meta).encode("utf-8"))
+        except OSError:
+            # the cache is only an optimization, a read-only or full cache dir must not break anything
+            return HttpCacheEntry(path, meta, data=data)
+
+        self._add_size(len(data))
+        return HttpCacheEntry(path, meta, data=data)
+
+    def _get_entry(self, topdir, fn):
+        if not fn.endswith(".body"):
+            return None
+        path = os.path.join(topdir, fn[:-5])
+        try:
+            size = os.path.getsize(path + ".body")
+            last_used = os.path.getmtime(path + ".json")
+        except OSError:
+            return None
+        return (last_used, size, path)
+
+    def _get_entry_files(self, path):
+        return [path + ".json", path + ".body"]
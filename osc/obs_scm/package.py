@@ -5,17 +5,20 @@ import shutil
 import os
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import total_ordering, wraps
 from typing import Optional
 
 from .. import conf
 from .. import oscerr
+from ..meter import create_text_meter
 from ..util.xml import ET
 from ..util.xml import xml_fromstring
 from ..util.xml import xml_parse
 from .file import File
 from .linkinfo import Linkinfo
 from .serviceinfo import Serviceinfo
+from .stat_cache import StatCache
 from .store import __store_version__
 from .store import Store
 from .store import check_store_version
@@ -76,7 +79,7 @@ class Package:
     REQ_STOREFILES = ('_project', '_package', '_apiurl', '_files', '_osclib_version')
     OPT_STOREFILES = ('_to_be_added', '_to_be_deleted', '_in_conflict', '_in_update',
                       '_in_commit', '_meta', '_meta_mode', '_frozenlink', '_pulled', '_linkrepair',
-                      '_size_limit', '_commit_msg', '_last_buildroot')
+                      '_size_limit', '_commit_msg', '_last_buildroot', '_stat_cache')
 
     def __init__(self, workingdir, progress_obj=None, size_limit=None, wc_check=True):
         from .. import store as osc_store
@@ -95,6 +98,7 @@ class Package:
         self.store = osc_store.get_store(self.dir, check=wc_check)
         self.store.assert_is_package()
         self.storedir = os.path.join(self.absdir, store)
+        self.stat_cache = StatCache(self.store)
         self.progress_obj = progress_obj
         self.size_limit = size_limit
         self.scm_url = self.store.scmurl
@@ -259,7 +263,7 @@ class Package:
                 # if get_source_file fails we're screwed up...
                 get_source_file(self.apiurl, self.prjname, self.name, f.name,
                                 targetfilename=self.store.sources_get_path(f.name), revision=self.rev,
-                                mtime=f.mtime)
+                                mtime=f.mtime, md5=f.md5)
                 repaired = True
 
         for fname in store:
@@ -449,6 +453,47 @@ class Package:
         if n in self.to_be_added:
             self.to_be_added.remove(n)
 
+    @fail_if_git()
+    def __put_source_files(self, filenames, tdir, jobs=1):
+        """
+        Upload source files.
+
+        A single meter counting the uploaded files is displayed on a terminal, a dot is printed for each file otherwise.
+        Failed uploads are retried in the http transport.
+        """
+        meter = None
+        if sys.stdout.isatty():
+            meter = create_text_meter(use_pb_fallback=False)
+            print()
+            meter.start(f"uploading {len(filenames)} files", len(filenames))
+
+        def report(done):
+            if meter:
+                meter.update(done)
+            else:
+                sys.stdout.write('.')
+                sys.stdout.flush()
+
+        if jobs <= 1 or len(filenames) <= 1:
+            for done, filename in enumerate(filenames, 1):
+                self.put_source_file(filename, tdir)
+                report(done)
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(self.put_source_file, filename, tdir) for filename in filenames]
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        future.result()
+                        report(done)
+                except BaseException:
+                    # don't start any new uploads, the running ones are awaited on leaving the executor
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        if meter:
+            meter.end()
+
     @fail_if_git()
     def __commit_update_store(self, tdir):
         """move files from transaction directory into the store"""
@@ -516,10 +561,14 @@ class Package:
                                     local_filelist, msg, **query)
 
     @fail_if_git()
-    def commit(self, msg='', verbose=False, skip_local_service_run=False, can_branch=False, force=False):
+    def commit(self, msg='', verbose=False, skip_local_service_run=False, can_branch=False, force=False, jobs=None):
+        """
+        Commit the working copy changes.
+
+        :param jobs: Number of source files uploaded in parallel, defaults to the ``upload_jobs`` config option.
+        """
         from ..core import ET_ENCODING
         from ..core import branch_pkg
-        from ..core import dgst
         from ..core import getTransActPath
         from ..core import http_GET
         from ..core import makeurl
@@ -527,6 +576,9 @@ class Package:
         from ..core import sha256_dgst
         from ..core import statfrmt
 
+        if jobs is None:
+            jobs = conf.config["upload_jobs"]
+
         # commit only if the upstream revision is the same as the working copy's
         upstream_rev = self.latest_rev()
         if self.rev != upstream_rev:
@@ -572,8 +624,8 @@ class Package:
                 return 1
             elif filename in self.todo:
                 if st in ('A', 'R', 'M'):
-                    todo_send[filename] = dgst(os.path.join(self.absdir, filename))
-                    sha256sums[filename] = sha256_dgst(os.path.join(self.absdir, filename))
+                    todo_send[filename], sha256sums[filename] = self.stat_cache.get_digests(
+                        filename, os.path.join(self.absdir, filename), sha256=True)
                     real_send.append(filename)
                     print(statfrmt('Sending', os.path.join(pathn, filename)))
                 elif st in (' ', '!', 'S'):
@@ -609,6 +661,8 @@ class Package:
                 storefile = self.store.sources_get_path(filename)
                 sha256sums[filename] = sha256_dgst(storefile)
 
+        self.save_stat_cache()
+
         if not force and not real_send and not todo_delete and not self.islinkrepair() and not self.ispulled():
             print(f'nothing to do for package {self.name}')
             return 1
@@ -641,11 +695,7 @@ class Package:
             shutil.rmtree(tdir, ignore_errors=True)
             os.mkdir(tdir)
             while send and tries:
-                for filename in send[:]:
-                    sys.stdout.write('.')
-                    sys.stdout.flush()
-                    self.put_source_file(filename, tdir)
-                    send.remove(filename)
+                self.__put_source_files(send, tdir, jobs)
                 tries -= 1
                 sfilelist = self.__send_commitlog(msg, filelist)
                 send = self.commit_get_missing(sfilelist)
@@ -745,7 +795,7 @@ class Package:
 
         if not md5 or md5 != storefilename_md5:
             get_source_file(self.apiurl, self.prjname, self.name, n, targetfilename=storefilename,
-                            revision=revision, progress_obj=self.progress_obj, mtime=mtime, meta=self.meta)
+                            revision=revision, progress_obj=self.progress_obj, mtime=mtime, meta=self.meta, md5=md5)
 
         shutil.copyfile(storefilename, filename)
         if mtime:
@@ -756,6 +806,15 @@ class Package:
             except FileNotFoundError:
                 pass
 
+    @staticmethod
+    def __replace_store_file(src, storefilename):
+        # the store file may be hardlinked with the source cache, replace it instead of writing into it
+        try:
+            os.unlink(storefilename)
+        except FileNotFoundError:
+            pass
+        shutil.copyfile(src, storefilename)
+
     @fail_if_git()
     def mergefile(self, n, revision, mtime=None):
         from ..core import binary_file
@@ -779,7 +838,7 @@ class Package:
         if binary_file(myfilename) or binary_file(upfilename):
             # don't try merging
             shutil.copyfile(upfilename, filename)
-            shutil.copyfile(upfilename, storefilename)
+            self.__replace_store_file(upfilename, storefilename)
             try:
                 os.unlink(origfile)
             except FileNotFoundError:
@@ -799,7 +858,7 @@ class Package:
             #   conflicts were found, and 2 means trouble."
             if ret == 0:
                 # merge was successful... clean up
-                shutil.copyfile(upfilename, storefilename)
+                self.__replace_store_file(upfilename, storefilename)
                 try:
                     os.unlink(upfilename)
                 except FileNotFoundError:
@@ -815,7 +874,7 @@ class Package:
                 return 'G'
             elif ret == 1:
                 # unsuccessful merge
-                shutil.copyfile(upfilename, storefilename)
+                self.__replace_store_file(upfilename, storefilename)
                 try:
                     os.unlink(origfile)
                 except FileNotFoundError:
@@ -1068,8 +1127,15 @@ class Package:
             st = self.status(fname)
             if st not in exclude_states:
                 res.append((st, fname))
+        self.save_stat_cache()
         return res
 
+    def save_stat_cache(self):
+        """
+        Store the cached digests of the tracked files in ``.osc/_stat_cache``.
+        """
+        self.stat_cache.save(self.filenamelist + self.to_be_added)
+
     @fail_if_git()
     def status(self, n):
         """
@@ -1090,8 +1156,6 @@ class Package:
               -       x            x        '!'
               -       -            -        NOT DEFINED
         """
-        from ..core import dgst
-
         known_by_meta = False
         exists = False
         exists_in_store = False
@@ -1117,9 +1181,9 @@ class Package:
             filemeta = self.findfilebyname(n)
             state = ' '
             if conf.config['status_mtime_heuristic']:
-                if os.path.getmtime(localfile) != filemeta.mtime and dgst(localfile) != filemeta.md5:
+                if os.path.getmtime(localfile) != filemeta.mtime and self.stat_cache.get_md5(n, localfile) != filemeta.md5:
                     state = 'M'
-            elif dgst(localfile) != filemeta.md5:
+            elif self.stat_cache.get_md5(n, localfile) != filemeta.md5:
                 state = 'M'
         elif n in self.to_be_added and not exists:
             state = '!'
@@ -1275,6 +1339,8 @@ class Package:
         for f in deleted:
             yield diff_add_delete(f, False, revision)
 
+        self.save_stat_cache()
+
     @fail_if_git()
     def merge(self, otherpac):
         for todo_entry in otherpac.todo:
@@ -1527,7 +1593,7 @@ rev: %s
                     # the user has no chance to continue without removing the file manually
                     raise oscerr.PackageInternalError(self.prjname, self.name,
                                                       '\'%s\' is not known by meta but exists in \'_in_update\' dir')
-                elif os.path.isfile(wcfile) and dgst(wcfile) != origfile_md5:
+                elif os.path.isfile(wcfile) and self.stat_cache.get_md5(broken_file[0], wcfile) != origfile_md5:
                     (fd, tmpfile) = tempfile.mkstemp(dir=self.absdir, prefix=broken_file[0] + '.')
                     os.close(fd)
                     os.rename(wcfile, tmpfile)
@@ -1577,6 +1643,7 @@ rev: %s
         if not service_files:
             services = []
         self.__update(kept, added, deleted, services, fm, root.get('rev'))
+        self.save_stat_cache()
         try:
             os.unlink(os.path.join(self.storedir, '_in_update', '_files'))
         except FileNotFoundError:
@@ -1636,7 +1703,7 @@ rev: %s
             elif state == 'C':
                 get_source_file(self.apiurl, self.prjname, self.name, f.name,
                                 targetfilename=self.store.sources_get_path(f.name), revision=rev,
-                                progress_obj=self.progress_obj, mtime=f.mtime, meta=self.meta)
+                                progress_obj=self.progress_obj, mtime=f.mtime, meta=self.meta, md5=f.md5)
                 print(f'skipping \'{f.name}\' (this is due to conflicts)')
             elif state == 'D' and self.findfilebyname(f.name).md5 != f.md5:
                 # XXX: in the worst case we might end up with f.name being
@@ -1661,7 +1728,7 @@ rev: %s
         for f in services:
             get_source_file(self.apiurl, self.prjname, self.name, f.name,
                             targetfilename=os.path.join(self.absdir, f.name), revision=rev,
-                            progress_obj=self.progress_obj, mtime=f.mtime, meta=self.meta)
+                            progress_obj=self.progress_obj, mtime=f.mtime, meta=self.meta, md5=f.md5)
             print(statfrmt('A', os.path.join(pathn, f.name)))
         store_write_string(self.absdir, '_files', fm)
         if not self.meta:
@@ -1,5 +1,7 @@
 import fnmatch
+import functools
 import os
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -90,6 +92,8 @@ class Project:
         self.absdir = os.path.abspath(dir)
         self.store = Store(dir, check=wc_check)
         self.progress_obj = progress_obj
+        # serializes changes of the package list from concurrent checkouts
+        self.packages_lock = threading.RLock()
 
         self.name = store_read_project(self.dir)
         self.scm_url = self.store.scmurl
@@ -165,10 +169,17 @@ class Project:
 
         return repaired
 
-    def checkout_missing_pacs(self, sinfos, expand_link=False, unexpand_link=False):
+    def checkout_missing_pacs(self, sinfos, expand_link=False, unexpand_link=False, jobs=1):
+        """
+        Check out packages that are available upstream but missing in the working copy.
+
+        :param jobs: Number of packages that are checked out concurrently.
+        """
+        from ..connection import set_pool_maxsize
         from ..core import checkout_package
         from ..core import getTransActPath
 
+        pacs = []
         for pac in self.pacs_missing:
             if conf.config['do_package_tracking'] and pac in self.pacs_unvers:
                 # pac is not under version control but a local file/dir exists
@@ -188,11 +199,48 @@ class Project:
                     print(f"Skipping {pac} (link to package {linked.get('package')})")
                     continue
 
+            pacs.append(pac)
+
+        def checkout(pac, progress_obj):
             print(f'checking out new package {pac}')
             checkout_package(self.apiurl, self.name, pac,
                              pathname=getTransActPath(os.path.join(self.dir, pac)),
                              prj_obj=self, prj_dir=self.dir,
-                             expand_link=expand_link or not unexpand_link, progress_obj=self.progress_obj)
+                             expand_link=expand_link or not unexpand_link, progress_obj=progress_obj)
+            return True
+
+        if jobs <= 1 or len(pacs) <= 1:
+            for pac in pacs:
+                checkout(pac, self.progress_obj)
+            return
+
+        set_pool_maxsize(jobs)
+        # progress bars of concurrent downloads would overwrite each other
+        tasks = [(pac, functools.partial(checkout, pac, None)) for pac in pacs]
+        self.run_checkout_tasks(tasks, jobs)
+
+    def run_checkout_tasks(self, tasks, jobs):
+        """
+        Run package checkouts concurrently, print their outputs in order and a summary at the end.
+
+        A failed checkout doesn't stop the remaining ones, the failures are reported
+        once all tasks finish.
+
+        :param tasks: Pairs of package name and a callable that checks the package out.
+                      The callable returns ``False`` if it skipped the package.
+        :param jobs: Maximal number of checkouts running at the same time.
+        """
+        from ..util.parallel import run_tasks_and_report
+
+        results = run_tasks_and_report(tasks, jobs, error_prefix="Failed to check out ")
+        failed = [i for i in results if not i.ok]
+        checked_out = len([i for i in results if i.ok and i.result is not False])
+
+        print()
+        print(f"{len(tasks)} packages processed: {checked_out} checked out, {len(tasks) - checked_out - len(failed)} skipped, {len(failed)} failed")
+        if failed:
+            msg = "failed to check out packages: " + ", ".join(i.name for i in failed)
+            raise oscerr.ProjectError(self.name, msg)
 
     def status(self, pac: str):
         exists = os.path.exists(os.path.join(self.absdir, pac))
@@ -362,12 +410,91 @@ class Project:
         else:
             print('unsupported state')
 
-    def update(self, pacs=(), expand_link=False, unexpand_link=False, service_files=False):
+    def _update_package(self, pac, state, sinfos, expand_link=False, unexpand_link=False, service_files=False, progress_obj=None):
+        """
+        Update a single package with state ' ' or 'D' during the project update.
+        """
+        from ..core import Package
+        from ..core import show_upstream_xsrcmd5
+
+        p = Package(os.path.join(self.dir, pac), progress_obj=progress_obj)
+
+        if state == 'D':
+            # pac exists (the non-existent pac case was handled in the first if block)
+            needs_update = p.update_needed(sinfos[p.name])
+            if needs_update:
+                p.update()
+            return needs_update
+
+        # do a simple update
+        rev = None
+        needs_update = True
+        if p.scm_url is not None:
+            # git managed.
+            print("Skipping git managed package ", pac)
+            return False
+        elif expand_link and p.islink() and not p.isexpanded():
+            if p.haslinkerror():
+                try:
+                    rev = show_upstream_xsrcmd5(p.apiurl, p.prjname, p.name, revision=p.rev)
+                except:
+                    rev = show_upstream_xsrcmd5(p.apiurl, p.prjname, p.name, revision=p.rev, linkrev="base")
+                    p.mark_frozen()
+            else:
+                rev = p.linkinfo.xsrcmd5
+            print('Expanding to rev', rev)
+        elif unexpand_link and p.islink() and p.isexpanded():
+            rev = p.linkinfo.lsrcmd5
+            print('Unexpanding to rev', rev)
+        elif p.islink() and p.isexpanded():
+            needs_update = p.update_needed(sinfos[p.name])
+            if needs_update:
+                rev = p.latest_rev()
+        elif p.hasserviceinfo() and p.serviceinfo.isexpanded() and not service_files:
+            # FIXME: currently, do_update does not propagate the --server-side-source-service-files
+            # option to this method. Consequence: an expanded service is always unexpanded during
+            # an update (TODO: discuss if this is a reasonable behavior (at least this the default
+            # behavior for a while))
+            needs_update = True
+        else:
+            needs_update = p.update_needed(sinfos[p.name])
+        print(f'Updating {p.name}')
+        if needs_update:
+            p.update(rev, service_files)
+        else:
+            print(f'At revision {p.rev}.')
+        if unexpand_link:
+            p.unmark_frozen()
+        return needs_update
+
+    def _run_update_tasks(self, tasks, jobs):
+        """
+        Run package updates concurrently, print their outputs in order and a summary at the end.
+        """
+        from ..util.parallel import run_tasks_and_report
+
+        results = run_tasks_and_report(tasks, jobs, error_prefix="Failed to update ")
+        failed = [i for i in results if not i.ok]
+        updated = len([i for i in results if i.ok and i.result])
+
+        print()
+        print(f"{len(tasks)} packages processed: {updated} updated, {len(tasks) - updated - len(failed)} up to date, {len(failed)} failed")
+        if failed:
+            msg = "failed to update packages: " + ", ".join(i.name for i in failed)
+            raise oscerr.ProjectError(self.name, msg)
+
+    def update(self, pacs=(), expand_link=False, unexpand_link=False, service_files=False, jobs=1):
+        """
+        Update the project working copy.
+
+        :param jobs: Number of packages that are updated or checked out concurrently.
+                     Applies only to updating the complete project.
+        """
+        from ..connection import set_pool_maxsize
         from ..core import Package
         from ..core import checkout_package
         from ..core import get_project_sourceinfo
         from ..core import getTransActPath
-        from ..core import show_upstream_xsrcmd5
 
         if pacs:
             for pac in pacs:
@@ -395,6 +522,7 @@ class Project:
                     self.pac_root.remove(self.get_package_node(pac))
                     self.pacs_have.remove(pac)
 
+                update_tasks = []
                 for pac in self.pacs_have:
                     state = self.get_state(pac)
                     if pac in self.pacs_broken:
@@ -402,52 +530,14 @@ class Project:
                             checkout_package(self.apiurl, self.name, pac,
                                              pathname=getTransActPath(os.path.join(self.dir, pac)), prj_obj=self,
                                              prj_dir=self.dir, expand_link=not unexpand_link, progress_obj=self.progress_obj)
-                    elif state == ' ':
-                        # do a simple update
-                        p = Package(os.path.join(self.dir, pac), progress_obj=self.progress_obj)
-                        rev = None
-                        needs_update = True
-                        if p.scm_url is not None:
-                            # git managed.
-                            print("Skipping git managed package ", pac)
-                            continue
-                        elif expand_link and p.islink() and not p.isexpanded():
-                            if p.haslinkerror():
-                                try:
-                                    rev = show_upstream_xsrcmd5(p.apiurl, p.prjname, p.name, revision=p.rev)
-                                except:
-                                    rev = show_upstream_xsrcmd5(p.apiurl, p.prjname, p.name, revision=p.rev, linkrev="base")
-                                    p.mark_frozen()
-                            else:
-                                rev = p.linkinfo.xsrcmd5
-                            print('Expanding to rev', rev)
-                        elif unexpand_link and p.islink() and p.isexpanded():
-                            rev = p.linkinfo.lsrcmd5
-                            print('Unexpanding to rev', rev)
-                        elif p.islink() and p.isexpanded():
-                            needs_update = p.update_needed(sinfos[p.name])
-                            if needs_update:
-                                rev = p.latest_rev()
-                        elif p.hasserviceinfo() and p.serviceinfo.isexpanded() and not service_files:
-                            # FIXME: currently, do_update does not propagate the --server-side-source-service-files
-                            # option to this method. Consequence: an expanded service is always unexpanded during
-                            # an update (TODO: discuss if this is a reasonable behavior (at least this the default
-                            # behavior for a while))
-                            needs_update = True
-                        else:
-                            needs_update = p.update_needed(sinfos[p.name])
-                        print(f'Updating {p.name}')
-                        if needs_update:
-                            p.update(rev, service_files)
+                    elif state in (' ', 'D'):
+                        task = functools.partial(self._update_package, pac, state, sinfos, expand_link, unexpand_link, service_files)
+                        if jobs > 1:
+                            # updating a package touches only its own working copy, run them concurrently later;
+                            # the tasks get no progress_obj because the progress bars would interfere with each other
+                            update_tasks.append((pac, task))
                         else:
-                            print(f'At revision {p.rev}.')
-                        if unexpand_link:
-                            p.unmark_frozen()
-                    elif state == 'D':
-                        # pac exists (the non-existent pac case was handled in the first if block)
-                        p = Package(os.path.join(self.dir, pac), progress_obj=self.progress_obj)
-                        if p.update_needed(sinfos[p.name]):
-                            p.update()
+                            task(progress_obj=self.progress_obj)
                     elif state == 'A' and pac in self.pacs_available:
                         # file/dir called pac already exists and is under version control
                         msg = f'can\'t add package \'{pac}\': Object already exists'
@@ -458,7 +548,11 @@ class Project:
                     else:
                         print(f'unexpected state.. package \'{pac}\'')
 
-                self.checkout_missing_pacs(sinfos, expand_link, unexpand_link)
+                if update_tasks:
+                    set_pool_maxsize(jobs)
+                    self._run_update_tasks(update_tasks, jobs)
+
+                self.checkout_missing_pacs(sinfos, expand_link, unexpand_link, jobs=jobs)
             finally:
                 self.write_packages()
 
@@ -0,0 +1,193 @@
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from ..util.dircache import SizeBoundedDirCache
+
+
+# ioctl that makes a file share the data blocks of another file (copy-on-write), see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
+
+def reflink(src: str, dst: str):
+    """
+    Create ``dst`` as a copy-on-write clone of ``src``.
+
+    :raises OSError: If the file system doesn't support reflinks.
+    """
+    import fcntl
+
+    with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+        try:
+            fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+        except OSError:
+            f_dst.close()
+            os.unlink(dst)
+            raise
+
+
+class SourceCache(SizeBoundedDirCache):
+    """
+    Content-addressed cache of source files shared by all working copies.
+
+    The files are stored under their md5 digests as reported by OBS,
+    an identical file from any project or package is therefore downloaded only once.
+    Each file is accompanied by a ``<md5>.used`` stamp file whose mtime records the last use
+    of the file; the least recently used files are removed once the cache exceeds its size limit.
+
+    Files are handed out as hardlinks when the target is a store file that osc never modifies in place,
+    as reflinks if the file system supports them and as plain copies otherwise.
+    """
+
+    USED_SUFFIX = ".used"
+
+    # files used less than MIN_AGE seconds ago are never evicted,
+    # another thread or process may be about to link them
+    MIN_AGE = 60
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> Optional["SourceCache"]:
+        """
+        Return the cache configured with the ``source_cache_dir`` and ``source_cache_size`` options
+        or ``None`` if the cache is disabled.
+        """
+        from .. import conf
+
+        path = conf.config["source_cache_dir"]
+        if not path:
+            return None
+        path = os.path.expanduser(path)
+        max_size = int(conf.config["source_cache_size"]) * 1024**2
+
+        with cls._instances_lock:
+            key = (path, max_size)
+            if key not in cls._instances:
+                cls._instances[key] = cls(path, max_size)
+            return cls._instances[key]
+
+    def get_path(self, md5: str) -> str:
+        if len(md5) != 32 or not all(i in "0123456789abcdef" for i in md5):
+            raise ValueError(f"Invalid md5 digest: {md5}")
+        return os.path.join(self.path, md5[:2], md5)
+
+    def _touch(self, path: str):
+        try:
+            with open(path + self.USED_SUFFIX, "a"):
+                pass
+            os.utime(path + self.USED_SUFFIX)
+        except OSError:
+            pass
+
+    def _materialize(self, src: str, dst: str, hardlink: bool):
+        """
+        Atomically create ``dst`` with the contents of ``src``.
+        """
+        dst_dir = os.path.dirname(os.path.abspath(dst))
+        fd, tmp = tempfile.mkstemp(dir=dst_dir, prefix=os.path.basename(dst), suffix=".osctmp")
+        os.close(fd)
+        os.unlink(tmp)
+        try:
+            done = False
+            if hardlink:
+                try:
+                    os.link(src, tmp)
+                    done = True
+                except OSError:
+                    # cross-device link or the file system doesn't support hardlinks
+                    pass
+            if not done:
+                try:
+                    reflink(src, tmp)
+                    done = True
+                except (OSError, ImportError):
+                    pass
+            if not done:
+                shutil.copyfile(src, tmp)
+                os.chmod(tmp, 0o644)
+            os.rename(tmp, dst)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def get(self, md5: str, target: str, hardlink: bool = False) -> bool:
+        """
+        Create ``target`` from the cached file with the given ``md5`` digest.
+
+        :param hardlink: Whether ``target`` may share the inode with the cached file.
+                         Allow it only for files that are never modified in place.
+        :returns: ``True`` on cache hit, ``False`` if the file is not cached.
+        """
+        from ..util.digest import file_digests
+
+        path = self.get_path(md5)
+        try:
+            # the cached file is shared with other working copies, make sure nobody modified it
+            if file_digests(path)["md5"] != md5:
+                self.remove(md5)
+                return False
+            self._materialize(path, target, hardlink)
+        except FileNotFoundError:
+            return False
+
+        self._touch(path)
+        return True
+
+    def put(self, md5: str, source: str, hardlink: bool = False):
+        """
+        Add file ``source`` to the cache, unless it doesn't match the ``md5`` digest.
+
+        :param hardlink: Whether the cached file may share the inode with ``source``.
+        """
+        from ..util.digest import file_digests
+
+        path = self.get_path(md5)
+        if os.path.isfile(path):
+            self._touch(path)
+            return
+
+        if file_digests(source)["md5"] != md5:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._materialize(source, path, hardlink)
+        except OSError:
+            # the cache is only an optimization, a read-only or full cache dir must not break anything
+            return
+        self._touch(path)
+
+        self._add_size(os.path.getsize(path))
+
+    def remove(self, md5: str):
+        path = self.get_path(md5)
+        for i in (path, path + self.USED_SUFFIX):
+            try:
+                os.unlink(i)
+            except FileNotFoundError:
+                pass
+        self._reset_size()
+
+    def _get_entry(self, topdir, fn):
+        if fn.endswith(self.USED_SUFFIX) or fn.endswith(".osctmp"):
+            return None
+        path = os.path.join(topdir, fn)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        try:
+            last_used = os.stat(path + self.USED_SUFFIX).st_mtime
+        except OSError:
+            last_used = st.st_ctime
+        return (last_used, st.st_size, path)
+
+    def _get_entry_files(self, path):
+        return [path, path + self.USED_SUFFIX]
@@ -0,0 +1,108 @@
+import json
+import os
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+
+class StatCache:
+    """
+    Digests of the working copy files stored in ``.osc/_stat_cache``.
+
+    Similarly to git's index, each entry records the size, mtime and inode of a file
+    together with its digests. The digests are reused as long as the stat data of the file
+    don't change, otherwise they are computed again and the entry is replaced.
+    """
+
+    FILE_NAME = "_stat_cache"
+
+    def __init__(self, store):
+        self.store = store
+        self._entries = None
+        self._dirty = False
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self):
+        try:
+            data = self.store.read_file(self.FILE_NAME)
+        except (OSError, UnicodeDecodeError):
+            return {}
+        if not data:
+            return {}
+        try:
+            entries = json.loads(data)
+        except ValueError:
+            # corrupted cache, start from scratch
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def save(self, names: Optional[Iterable[str]] = None):
+        """
+        Write the cache to the store if it has changed.
+
+        :param names: If specified, drop entries of files that are not listed.
+        """
+        if names is not None and self._entries:
+            names = set(names)
+            for name in list(self._entries):
+                if name not in names:
+                    del self._entries[name]
+                    self._dirty = True
+
+        if not self._dirty:
+            return
+
+        try:
+            self.store.write_file(self.FILE_NAME, json.dumps(self._entries, sort_keys=True))
+        except OSError:
+            # the cache is only an optimization, a read-only working copy must keep working
+            pass
+        self._dirty = False
+
+    def invalidate(self, name: str):
+        if self.entries.pop(name, None) is not None:
+            self._dirty = True
+
+    def get_digests(self, name: str, path: str, sha256: bool = False) -> Tuple[str, Optional[str]]:
+        """
+        Return ``(md5, sha256)`` digests of a working copy file.
+
+        :param name: Name of the file in the working copy, used as the cache key.
+        :param path: Path to the file.
+        :param sha256: Whether the sha256 digest is needed, it is ``None`` otherwise.
+        """
+        from ..util.digest import file_digests
+        from ..util.digest import is_racy
+
+        st = os.stat(path)
+        stat_data = [st.st_size, st.st_mtime_ns, st.st_ino]
+
+        entry = self.entries.get(name, None)
+        if entry and entry[:3] == stat_data:
+            md5_value, sha256_value = entry[3:5]
+            if sha256_value or not sha256:
+                return md5_value, sha256_value
+
+        # compute all needed digests in a single read of the file
+        algorithms = ["md5", "sha256"] if sha256 else ["md5"]
+        digests = file_digests(path, algorithms)
+        md5_value = digests["md5"]
+        sha256_value = digests.get("sha256", None)
+
+        if not is_racy(st):
+            self.entries[name] = stat_data + [md5_value, sha256_value]
+            self._dirty = True
+        else:
+            self.invalidate(name)
+
+        return md5_value, sha256_value
+
+    def get_md5(self, name: str, path: str) -> str:
+        return self.get_digests(name, path)[0]
@@ -0,0 +1,405 @@
+"""
+Persistent index of the packages in the build package cache (``packagecachedir``).
+
+The index stores data read from the package headers, so the packages
+don't have to be opened and parsed on every ``osc build``.
+An entry is valid as long as the size and the mtime of the package don't change.
+
+The index also records when the files were used by a build last time,
+``collect_garbage()`` removes the least recently used files from the cache.
+
+The index records the packages whose signatures were verified,
+so they don't have to be verified again on the next build with the same keys.
+
+Finally, the index stores ``PackageQuerySnapshot`` objects of packages in ``--prefer-pkgs`` directories,
+so the packages don't have to be queried again on the next build.
+"""
+
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from .util.digest import is_racy
+from .util.helper import decode_it
+
+
+try:
+    import sqlite3
+except ImportError:
+    # python built without sqlite support, the index stays disabled
+    sqlite3 = None
+
+
+class HeaderInfo:
+    __slots__ = ("hdrmd5", "canonname", "name", "epoch", "version", "release", "arch")
+
+    def __init__(self, hdrmd5=None, canonname=None, name=None, epoch=None, version=None, release=None, arch=None):
+        self.hdrmd5 = hdrmd5
+        self.canonname = canonname
+        self.name = name
+        self.epoch = epoch
+        self.version = version
+        self.release = release
+        self.arch = arch
+
+    @property
+    def nevra(self) -> Optional[str]:
+        if self.name is None:
+            return None
+        evr = f"{self.version}-{self.release}"
+        if self.epoch:
+            evr = f"{self.epoch}:{evr}"
+        return f"{self.name}-{evr}.{self.arch}"
+
+
+class PackageCacheIndex:
+    """
+    The index is a sqlite database that can be shared by several osc processes.
+    Any database error disables the index for the rest of the process
+    and the package headers are read from the files as if there was no index.
+    """
+
+    FILE_NAME = ".osc_index.sqlite"
+
+    COLUMNS = ("size", "mtime_ns") + HeaderInfo.__slots__
+
+    def __init__(self, cachedir: str):
+        self.cachedir = cachedir
+        self._conn = None
+        self._disabled = sqlite3 is None
+        self._lock = threading.Lock()
+
+    def _get_conn(self):
+        if self._disabled:
+            return None
+        if self._conn is None:
+            try:
+                os.makedirs(self.cachedir, exist_ok=True)
+                conn = sqlite3.connect(os.path.join(self.cachedir, self.FILE_NAME), timeout=10, check_same_thread=False)
+                # the index can be always rebuilt from the files, durability is not needed
+                conn.execute("PRAGMA synchronous = OFF")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS headers ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                    "hdrmd5 TEXT, canonname TEXT, name TEXT, epoch TEXT, version TEXT, release TEXT, arch TEXT)"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS access (path TEXT PRIMARY KEY, last_used REAL, kind TEXT)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS verified ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hdrmd5 TEXT, keys TEXT)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS snapshots (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, query TEXT)"
+                )
+                conn.commit()
+            except (OSError, sqlite3.Error):
+                self._disabled = True
+                return None
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, query, args=(), commit=False, many=False):
+        with self._lock:
+            conn = self._get_conn()
+            if conn is None:
+                return []
+            try:
+                if many:
+                    result = conn.executemany(query, args).fetchall()
+                else:
+                    result = conn.execute(query, args).fetchall()
+                if commit:
+                    conn.commit()
+            except sqlite3.Error:
+                self._disabled = True
+                return []
+            return result
+
+    def _key(self, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.cachedir))
+
+    def _path(self, key):
+        return os.path.normpath(os.path.join(os.path.abspath(self.cachedir), key))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def lookup(self, path: str) -> Optional[HeaderInfo]:
+        """
+        Return the indexed header data of the package or ``None`` if the index has no valid entry for it.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        rows = self._execute(f"SELECT {', '.join(self.COLUMNS)} FROM headers WHERE path = ?", (self._key(path),))
+        if not rows:
+            return None
+        size, mtime_ns, *values = rows[0]
+        if (size, mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return None
+        return HeaderInfo(*values)
+
+    def add(self, path: str, info: HeaderInfo):
+        """
+        Record the header data of the package at ``path``.
+        """
+        st = os.stat(path)
+        values = [getattr(info, i) for i in HeaderInfo.__slots__]
+        self._execute(
+            f"INSERT OR REPLACE INTO headers (path, {', '.join(self.COLUMNS)}) VALUES ({', '.join(['?'] * (len(self.COLUMNS) + 1))})",
+            [self._key(path), st.st_size, st.st_mtime_ns] + values,
+            commit=True,
+        )
+
+    def add_query(self, path: str, canonname: str, pkgq=None):
+        """
+        Record the canonical name and the NEVRA from ``pkgq`` (a ``PackageQueryResult``) of the package at ``path``.
+        """
+        info = HeaderInfo(canonname=canonname)
+        if pkgq is not None:
+            info.name = decode_it(pkgq.name())
+            epoch = pkgq.epoch()
+            info.epoch = decode_it(epoch) if isinstance(epoch, bytes) else str(epoch or "")
+            info.version = decode_it(pkgq.version())
+            info.release = decode_it(pkgq.release())
+            info.arch = decode_it(pkgq.arch())
+        self.add(path, info)
+
+    def remove(self, path: str):
+        self.forget([path])
+
+    def forget(self, paths):
+        """
+        Drop all records of the files at ``paths``.
+        """
+        keys = [(self._key(i),) for i in paths]
+        self._execute("DELETE FROM headers WHERE path = ?", keys, many=True)
+        self._execute("DELETE FROM verified WHERE path = ?", keys, many=True)
+        self._execute("DELETE FROM snapshots WHERE path = ?", keys, many=True)
+        self._execute("DELETE FROM access WHERE path = ?", keys, commit=True, many=True)
+
+    def touch(self, paths, kind: str = "package"):
+        """
+        Record that the files at ``paths`` have just been used.
+
+        :param kind: ``package`` or ``preinstallimage``.
+        """
+        now = time.time()
+        rows = [(self._key(i), now, kind) for i in paths]
+        self._execute("INSERT OR REPLACE INTO access (path, last_used, kind) VALUES (?, ?, ?)", rows, commit=True, many=True)
+
+    def get_access(self):
+        """
+        Return a dictionary that maps absolute paths to ``(last_used, kind)`` tuples.
+        """
+        result = {}
+        for path, last_used, kind in self._execute("SELECT path, last_used, kind FROM access"):
+            result[self._path(path)] = (last_used, kind)
+        return result
+
+    def is_verified(self, path: str, hdrmd5: str, keys: str) -> bool:
+        """
+        Determine if the signature of the package at ``path`` with header ``hdrmd5``
+        was successfully verified with the keys identified by ``keys`` and the file hasn't changed since.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        rows = self._execute("SELECT size, mtime_ns, hdrmd5, keys FROM verified WHERE path = ?", (self._key(path),))
+        if not rows:
+            return False
+        return tuple(rows[0]) == (st.st_size, st.st_mtime_ns, hdrmd5, keys)
+
+    def add_verified(self, packages, keys: str):
+        """
+        Record that the signatures of the packages were successfully verified with the keys identified by ``keys``.
+
+        :param packages: List of ``(path, hdrmd5)`` tuples.
+        """
+        now_ns = int(time.time() * 10**9)
+        rows = []
+        for path, hdrmd5 in packages:
+            st = os.stat(path)
+            if is_racy(st, now_ns):
+                # the file could change without changing the mtime, verify it again next time
+                continue
+            rows.append((self._key(path), st.st_size, st.st_mtime_ns, hdrmd5, keys))
+        self._execute(
+            "INSERT OR REPLACE INTO verified (path, size, mtime_ns, hdrmd5, keys) VALUES (?, ?, ?, ?, ?)",
+            rows,
+            commit=True,
+            many=True,
+        )
+
+    def get_hdrmd5(self, path: str) -> Optional[str]:
+        """
+        Return the hdrmd5 of a rpm, read it from the file only if the index doesn't know it.
+        """
+        from .util.packagequery import PackageQuery
+
+        info = self.lookup(path)
+        if info is not None and info.hdrmd5 is not None:
+            return info.hdrmd5
+
+        hdrmd5 = PackageQuery.queryhdrmd5(path)
+        if hdrmd5 is None:
+            return None
+
+        st = os.stat(path)
+        if not is_racy(st):
+            info = info or HeaderInfo()
+            info.hdrmd5 = hdrmd5
+            self.add(path, info)
+        return hdrmd5
+
+    def get_snapshot(self, path: str):
+        """
+        Return the stored ``PackageQuerySnapshot`` of the package at ``path`` or ``None`` if there's no valid one.
+        """
+        from .util.packagequery import PackageQuerySnapshot
+
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        rows = self._execute("SELECT size, mtime_ns, query FROM snapshots WHERE path = ?", (self._key(path),))
+        if not rows:
+            return None
+        size, mtime_ns, query = rows[0]
+        if (size, mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return None
+        return PackageQuerySnapshot.from_dict(json.loads(query))
+
+    def add_snapshots(self, snapshots):
+        """
+        Store ``PackageQuerySnapshot`` objects of packages.
+
+        :param snapshots: List of ``(path, snapshot)`` tuples.
+        """
+        now_ns = int(time.time() * 10**9)
+        rows = []
+        for path, snapshot in snapshots:
+            st = os.stat(path)
+            if is_racy(st, now_ns):
+                # the file could change without changing the mtime, query it again next time
+                continue
+            rows.append((self._key(path), st.st_size, st.st_mtime_ns, json.dumps(snapshot.to_dict())))
+        self._execute(
+            "INSERT OR REPLACE INTO snapshots (path, size, mtime_ns, query) VALUES (?, ?, ?, ?)",
+            rows,
+            commit=True,
+            many=True,
+        )
+
+    def prune_snapshots(self):
+        """
+        Drop the snapshots of packages that no longer exist.
+        """
+        rows = self._execute("SELECT path FROM snapshots")
+        keys = [(key,) for key, in rows if not os.path.exists(self._path(key))]
+        self._execute("DELETE FROM snapshots WHERE path = ?", keys, commit=True, many=True)
+
+
+class GarbageCollectionResult:
+    def __init__(self):
+        self.removed = []
+        self.freed = 0
+        self.size = 0
+
+
+def collect_garbage(cachedir: str, max_size: int, keep=(), dry_run: bool = False) -> GarbageCollectionResult:
+    """
+    Remove stale preinstall images and the least recently used files from the package cache.
+
+    Only the most recently used preinstall image in each directory is kept.
+    Then the least recently used files are removed until the cache fits into ``max_size``.
+    Files that were never recorded as used are sorted by their mtime.
+
+    :param cachedir: Path to the package cache of an apiurl.
+    :param max_size: Size budget in bytes, ``0`` means no limit.
+    :param keep: Paths of files that must not be removed, such as the dependencies of the current build.
+    :param dry_run: Only compute what would be removed.
+    """
+    result = GarbageCollectionResult()
+    if not os.path.isdir(cachedir):
+        return result
+
+    index = PackageCacheIndex(cachedir)
+    try:
+        access = index.get_access()
+        keep = {os.path.abspath(i) for i in keep}
+
+        files = []
+        for root, dirs, filenames in os.walk(os.path.abspath(cachedir)):
+            for fn in filenames:
+                if fn.startswith(PackageCacheIndex.FILE_NAME) or fn.startswith("_pubkey"):
+                    # the index itself and the signing keys of the projects
+                    continue
+                path = os.path.join(root, fn)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                last_used, kind = access.get(path, (st.st_mtime, None))
+                files.append((last_used, st.st_size, path, kind))
+        files.sort()
+
+        # the newest preinstall image in each directory supersedes the older ones
+        newest_images = {}
+        for last_used, _, path, kind in files:
+            if kind == "preinstallimage":
+                newest_images[os.path.dirname(path)] = path
+
+        remove = []
+        remaining = []
+        for entry in files:
+            last_used, size, path, kind = entry
+            if kind == "preinstallimage" and newest_images[os.path.dirname(path)] != path and path not in keep:
+                remove.append(entry)
+            else:
+                remaining.append(entry)
+
+        size = sum(i[1] for i in remaining)
+        if max_size:
+            for entry in remaining:
+                if size <= max_size:
+                    break
+                if entry[2] in keep:
+                    continue
+                remove.append(entry)
+                size -= entry[1]
+
+        removed = []
+        for _, entry_size, path, _ in remove:
+            if not dry_run:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+            removed.append(path)
+            result.freed += entry_size
+
+        if not dry_run:
+            index.forget(removed)
+            # remove directories that became empty
+            for path in {os.path.dirname(i) for i in removed}:
+                while os.path.abspath(path) != os.path.abspath(cachedir):
+                    try:
+                        os.rmdir(path)
+                    except OSError:
+                        break
+                    path = os.path.dirname(path)
+
+        result.removed = removed
+        result.size = sum(i[1] for i in files) - result.freed
+        return result
+    finally:
+        index.close()
@@ -74,6 +74,18 @@ class CpioHdr:
         return "%s %s %s %s" % (self.filename, self.filesize, self.namesize, self.dataoff)
 
 
+def _set_file_attrs(fn, hdr):
+    """apply mode and ownership from a cpio header to an extracted file"""
+    os.chmod(fn, hdr.mode)
+    uid = hdr.uid
+    if uid != os.geteuid() or os.geteuid() != 1:
+        uid = -1
+    gid = hdr.gid
+    if gid not in os.getgroups() or os.getegid() != -1:
+        gid = -1
+    os.chown(fn, uid, gid)
+
+
 class CpioRead:
     """
     Represents a cpio archive.
@@ -137,14 +149,7 @@ class CpioRead:
 
         with open(fn, 'wb') as f:
             f.write(self.__file.read(hdr.filesize))
-        os.chmod(fn, hdr.mode)
-        uid = hdr.uid
-        if uid != os.geteuid() or os.geteuid() != 1:
-            uid = -1
-        gid = hdr.gid
-        if gid not in os.getgroups() or os.getegid() != -1:
-            gid = -1
-        os.chown(fn, uid, gid)
+        _set_file_attrs(fn, hdr)
 
     def _get_hdr(self, fn):
         for h in self.hdrs:
@@ -215,6 +220,131 @@ class CpioRead:
             self._copyin_file(h, dest, h.filename)
 
 
+class CpioStreamRead:
+    """
+    Reads a cpio archive sequentially from a file object that is not required
+    to be seekable (a HTTP response for example).
+    The members are available only while iterating the archive and the data of
+    each member is copied in chunks of at most ``bufsize`` bytes, so neither
+    the archive nor a member is ever held in memory as a whole.
+    Supported formats are the same as in CpioRead.
+    """
+
+    sfmt = CpioRead.sfmt
+    hdr_fmt = CpioRead.hdr_fmt
+    hdr_len = CpioRead.hdr_len
+
+    def __init__(self, fobj, name=None, bufsize=1024 * 1024):
+        self.fobj = fobj
+        self.name = name or getattr(fobj, 'name', '<stream>')
+        self.bufsize = bufsize
+        self.format = -1
+        # position in the stream, used for the dataoff attribute of the headers
+        self._pos = 0
+        # header of the member whose data can be read at the moment
+        self._current = None
+        # number of unread data bytes of the current member
+        self._remaining = 0
+        # number of padding bytes following the data of the current member
+        self._padding = 0
+
+    def __iter__(self):
+        """
+        Yields headers of the archive members.
+        Data of a member that wasn't copied before advancing to the next one is skipped.
+        """
+        while True:
+            self._skip(self._remaining + self._padding)
+            self._current = None
+            self._remaining = 0
+            self._padding = 0
+
+            data = self._read(self.hdr_len)
+            data = struct.unpack(self.hdr_fmt, data)
+            if data[0] not in self.sfmt.values():
+                raise CpioError(self.name, '\'%s\' is not a supported cpio format' % data[0])
+            self.format = data[0]
+            hdr = CpioHdr(*data)
+            # the file name is stored including the terminating NUL
+            hdr.filename = self._read(hdr.namesize)[:-1]
+            self._skip(self._calc_padding(hdr.namesize + self.hdr_len))
+            if hdr.filename == b'TRAILER!!!':
+                # consume the padding after the trailer so the underlying
+                # stream can verify its length on EOF
+                while self.fobj.read(self.bufsize):
+                    pass
+                return
+            hdr.dataoff = self._pos
+            self._current = hdr
+            self._remaining = hdr.filesize
+            self._padding = self._calc_padding(hdr.filesize)
+            yield hdr
+
+    def _calc_padding(self, off):
+        if self.format == self.sfmt['newascii']:
+            return (4 - (off % 4)) % 4
+        return 0
+
+    def _read(self, size):
+        result = bytearray()
+        while len(result) < size:
+            data = self.fobj.read(size - len(result))
+            if not data:
+                raise CpioError(self.name, 'unexpected end of archive')
+            result += data
+        self._pos += size
+        return bytes(result)
+
+    def _skip(self, size):
+        while size > 0:
+            chunk = min(size, self.bufsize)
+            self._read(chunk)
+            size -= chunk
+
+    def copyfileobj(self, hdr, fobj):
+        """
+        writes data of the member described by hdr to fobj.
+        hdr must be the header that was yielded last by the iterator.
+        """
+        if hdr is not self._current:
+            raise CpioError(hdr.filename, 'data of the member is no longer available in the stream')
+        while self._remaining > 0:
+            data = self._read(min(self._remaining, self.bufsize))
+            self._remaining -= len(data)
+            fobj.write(data)
+
+    def copyin_file(self, hdr, dest=None, new_fn=None):
+        """
+        copies member described by hdr to dest.
+        If dest is None the file will be stored in $PWD/filename. If dest points
+        to a dir the file will be stored in dest/filename. In case new_fn is specified
+        the file will be stored as new_fn.
+        """
+        if isinstance(dest, str):
+            dest = dest.encode("utf-8")
+        if isinstance(new_fn, str):
+            new_fn = new_fn.encode("utf-8")
+
+        if not stat.S_ISREG(stat.S_IFMT(hdr.mode)):
+            msg = '\'%s\' is no regular file - only regular files are supported atm' % hdr.filename
+            raise NotImplementedError(msg)
+
+        fn = new_fn or hdr.filename
+        if fn.startswith(b"/"):
+            raise CpioError(fn, "Extracting files with absolute paths is not supported for security reasons")
+
+        fn = os.path.join(dest or os.getcwdb(), fn)
+
+        dir_path, _ = os.path.split(fn)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        with open(fn, 'wb') as f:
+            self.copyfileobj(hdr, f)
+        _set_file_attrs(fn, hdr)
+        return fn.decode("utf-8")
+
+
 class CpioWrite:
     """cpio archive small files in memory, using new style portable header format"""
 
@@ -0,0 +1,116 @@
+"""
+Compute several digests of a file in a single read.
+
+The results are memoized for the lifetime of the process.
+A memo entry is keyed by the file path and its stat data (size, mtime, ctime, inode),
+so any modification of the file makes the entry unreachable.
+"""
+
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+
+BUFSIZE = 1024 * 1024
+
+# files smaller than this are read with plain read() calls
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Files modified less than RACY_NS nanoseconds ago could be modified again without changing their stat data
+# if the file system has a coarse timestamp granularity.
+RACY_NS = 2 * 10**9
+
+# algorithm names accepted by file_digests() in addition to the hashlib algorithms
+HDRMD5 = "hdrmd5"
+
+_MEMO: Dict[tuple, Dict[str, str]] = {}
+_MEMO_LOCK = threading.Lock()
+
+
+def is_racy(st: os.stat_result, now_ns: Optional[int] = None) -> bool:
+    """
+    Determine if the file with stat data ``st`` was modified too recently
+    for the stat data to identify its contents. Data computed from such a file must not be cached.
+    """
+    if now_ns is None:
+        now_ns = int(time.time() * 10**9)
+    return now_ns - st.st_mtime_ns <= RACY_NS
+
+
+def _update_hashes(path, size, hashes):
+    with open(path, "rb") as f:
+        if size >= MMAP_THRESHOLD:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # mmap is not supported for the file, fall back to read()
+                mm = None
+            if mm is not None:
+                with mm:
+                    view = memoryview(mm)
+                    try:
+                        for offset in range(0, len(mm), BUFSIZE):
+                            chunk = view[offset:offset + BUFSIZE]
+                            for h in hashes:
+                                h.update(chunk)
+                            chunk.release()
+                    finally:
+                        view.release()
+                return
+
+        buf = bytearray(BUFSIZE)
+        view = memoryview(buf)
+        while True:
+            length = f.readinto(buf)
+            if not length:
+                break
+            for h in hashes:
+                h.update(view[:length])
+
+
+def file_digests(path: str, algorithms: Iterable[str] = ("md5",)) -> Dict[str, str]:
+    """
+    Return a dictionary with hex digests of the file ``path``.
+
+    :param path: Path to the file.
+    :param algorithms: Names of the hashlib algorithms such as ``md5`` or ``sha256``.
+                       ``hdrmd5`` stands for the header md5 recorded in a rpm's signature header,
+                       its value is ``None`` for files that are not rpms.
+                       All hashlib digests are computed in a single read of the file.
+    """
+    algorithms = list(algorithms)
+
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+
+    with _MEMO_LOCK:
+        memo = dict(_MEMO.get(key, {}))
+
+    missing = [i for i in algorithms if i not in memo]
+
+    hashes = {i: hashlib.new(i) for i in missing if i != HDRMD5}
+    if hashes:
+        _update_hashes(path, st.st_size, list(hashes.values()))
+        for name, h in hashes.items():
+            memo[name] = h.hexdigest()
+
+    if HDRMD5 in missing:
+        from .packagequery import PackageQuery
+        memo[HDRMD5] = PackageQuery.queryhdrmd5(path)
+
+    if missing and not is_racy(st):
+        with _MEMO_LOCK:
+            _MEMO.setdefault(key, {}).update(memo)
+
+    return {i: memo[i] for i in algorithms}
+
+
+def clear_memo():
+    with _MEMO_LOCK:
+        _MEMO.clear()
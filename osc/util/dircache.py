@@ -0,0 +1,105 @@
+"""
+Base class for on-disk caches that are bounded in size.
+
+The cached entries are stored in ``<path>/<2 chars>/<name>`` directories
+and the least recently used entries are evicted once the cache exceeds its size limit.
+"""
+
+
+import os
+import threading
+import time
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+class SizeBoundedDirCache:
+    """
+    Subclasses implement ``_get_entry()`` and ``_get_entry_files()``
+    to describe how an entry is stored and when it was used last.
+    """
+
+    # entries used less than MIN_AGE seconds ago are never evicted
+    MIN_AGE = 0
+
+    def __init__(self, path: str, max_size: int):
+        """
+        :param path: Path to the cache directory.
+        :param max_size: Maximal size of the cache in bytes.
+        """
+        self.path = path
+        self.max_size = max_size
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _get_entry(self, topdir: str, fn: str) -> Optional[Tuple[float, int, str]]:
+        """
+        Return ``(last_used, size, path)`` of the entry stored in file ``fn`` in ``topdir``
+        or ``None`` if the file is not the main file of an entry.
+        """
+        raise NotImplementedError()
+
+    def _get_entry_files(self, path: str) -> List[str]:
+        """
+        Return paths to all files that belong to the entry at ``path``.
+        """
+        raise NotImplementedError()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """
+        Return a list of ``(last_used, size, path)`` of all cached entries.
+        """
+        result = []
+        if not os.path.isdir(self.path):
+            return result
+        for topdir in os.listdir(self.path):
+            topdir = os.path.join(self.path, topdir)
+            if not os.path.isdir(topdir):
+                continue
+            for fn in os.listdir(topdir):
+                entry = self._get_entry(topdir, fn)
+                if entry is not None:
+                    result.append(entry)
+        return result
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the cached entries in bytes.
+        """
+        if self._size is None:
+            self._size = sum(i[1] for i in self._entries())
+        return self._size
+
+    def _add_size(self, size: int):
+        """
+        Account for a newly stored entry and evict old entries if the cache exceeds ``max_size``.
+        """
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            if self.size > self.max_size:
+                self._evict()
+
+    def _reset_size(self):
+        with self._lock:
+            self._size = None
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache fits into ``max_size``.
+        """
+        entries = sorted(self._entries())
+        size = sum(i[1] for i in entries)
+        now = time.time()
+        for last_used, entry_size, path in entries:
+            if size <= self.max_size or now - last_used < self.MIN_AGE:
+                break
+            for i in self._get_entry_files(path):
+                try:
+                    os.unlink(i)
+                except OSError:
+                    pass
+            size -= entry_size
+        self._size = size
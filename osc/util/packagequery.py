@@ -25,6 +25,14 @@ class PackageQueries(dict):
         self.wanted_architecture = wanted_architecture
         super().__init__()
 
+    @classmethod
+    def matches_architecture(cls, architecture, wanted_architecture):
+        """Returns True if packages of the architecture can be used on the
+        wanted architecture.
+        """
+        return (architecture in [wanted_architecture, 'noarch', 'all', 'any']
+                or wanted_architecture in cls.architectureMap.get(architecture, []))
+
     def add(self, query):
         """Adds package query to dict if it is of the correct architecture and
         is newer (has a greater version) than the currently assigned package.
@@ -38,11 +46,7 @@ class PackageQueries(dict):
             raise ValueError("key '%s' does not match "
                              "package query name '%s'" % (name, query.name()))
 
-        architecture = decode_it(query.arch())
-
-        if (architecture in [self.wanted_architecture, 'noarch', 'all', 'any']
-            or self.wanted_architecture in self.architectureMap.get(architecture,
-                                                                    [])):
+        if self.matches_architecture(decode_it(query.arch()), self.wanted_architecture):
             current_query = self.get(name)
 
             # if current query does not exist or is older than this new query
@@ -171,6 +175,116 @@ class PackageQueryResult:
         return evr
 
 
+class PackageQuerySnapshot(PackageQueryResult):
+    """
+    Plain data of a package query result that is needed for resolving build dependencies.
+    Unlike the query results, the snapshots can be pickled and stored in ``PackageCacheIndex``.
+    """
+
+    FIELDS = (
+        "name", "version", "release", "epoch", "arch",
+        "provides", "requires", "conflicts", "obsoletes", "recommends", "supplements",
+    )
+
+    def __init__(self, query_class, path, **fields):
+        # name of the class that produced the query result; its vercmp() is used for comparing versions
+        self.query_class = query_class
+        self._path = path
+        self.fields = fields
+
+    @classmethod
+    def from_query(cls, query):
+        fields = {name: getattr(query, name)() for name in cls.FIELDS}
+        return cls(type(query).__name__, query.path(), **fields)
+
+    def to_dict(self):
+        return {
+            "query_class": self.query_class,
+            "path": self._path,
+            "fields": {key: _to_json(value) for key, value in self.fields.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = {key: _from_json(value) for key, value in data["fields"].items()}
+        return cls(data["query_class"], data["path"], **fields)
+
+    def name(self):
+        return self.fields["name"]
+
+    def version(self):
+        return self.fields["version"]
+
+    def release(self):
+        return self.fields["release"]
+
+    def epoch(self):
+        return self.fields["epoch"]
+
+    def arch(self):
+        return self.fields["arch"]
+
+    def path(self):
+        return self._path
+
+    def provides(self):
+        return self.fields["provides"]
+
+    def requires(self):
+        return self.fields["requires"]
+
+    def conflicts(self):
+        return self.fields["conflicts"]
+
+    def obsoletes(self):
+        return self.fields["obsoletes"]
+
+    def recommends(self):
+        return self.fields["recommends"]
+
+    def supplements(self):
+        return self.fields["supplements"]
+
+    def vercmp(self, pkgquery):
+        from . import archquery
+        from . import debquery
+        from . import rpmquery
+
+        query_classes = {
+            "ArchQuery": archquery.ArchQuery,
+            "DebQuery": debquery.DebQuery,
+            "RpmQuery": rpmquery.RpmQuery,
+        }
+        return query_classes[self.query_class].vercmp(self, pkgquery)
+
+
+def _to_json(value):
+    # bytes that are not valid utf-8 survive the round trip thanks to surrogateescape
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "surrogateescape")
+    if isinstance(value, (list, tuple)):
+        return [_to_json(i) for i in value]
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, str):
+        return value.encode("utf-8", "surrogateescape")
+    if isinstance(value, list):
+        return [_from_json(i) for i in value]
+    return value
+
+
+def query_snapshot(path):
+    """
+    Query the package at ``path`` and return ``PackageQuerySnapshot`` or ``None`` if the file is not a package.
+    """
+    query = PackageQuery.query(path)
+    if query is None:
+        return None
+    return PackageQuerySnapshot.from_query(query)
+
+
 def cmp(a, b):
     return (a > b) - (a < b)
 
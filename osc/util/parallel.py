@@ -0,0 +1,166 @@
+"""
+Run independent tasks concurrently in a pool of threads.
+
+Output that the tasks print to stdout is captured per task
+and handed over to the caller in the order of the tasks,
+so the outputs of tasks running at the same time never interleave.
+"""
+
+
+import contextlib
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+class TaskResult:
+    def __init__(self, name: str, result: Any = None, exception: Optional[Exception] = None, output: str = ""):
+        self.name = name
+        self.result = result
+        self.exception = exception
+        self.output = output
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+
+class ThreadStdout:
+    """
+    A stdout replacement that writes to a per-thread buffer if one is set
+    and to the original stream otherwise.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    @property
+    def thread_buffer(self) -> Optional[io.StringIO]:
+        return getattr(self._local, "buf", None)
+
+    @thread_buffer.setter
+    def thread_buffer(self, value: Optional[io.StringIO]):
+        self._local.buf = value
+
+    def write(self, data):
+        buf = self.thread_buffer
+        if buf is not None:
+            return buf.write(data)
+        return self._stream.write(data)
+
+    def flush(self):
+        if self.thread_buffer is None:
+            self._stream.flush()
+
+    def isatty(self):
+        if self.thread_buffer is not None:
+            return False
+        return self._stream.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextlib.contextmanager
+def capture_thread_stdout():
+    """
+    Install ``ThreadStdout`` as ``sys.stdout`` for the duration of the context.
+    """
+    if isinstance(sys.stdout, ThreadStdout):
+        # already installed by an outer context
+        yield sys.stdout
+        return
+
+    orig_stdout = sys.stdout
+    sys.stdout = ThreadStdout(orig_stdout)
+    try:
+        yield sys.stdout
+    finally:
+        sys.stdout = orig_stdout
+
+
+def run_tasks(tasks: Iterable[Tuple[str, Callable[[], Any]]], jobs: int) -> Iterator[TaskResult]:
+    """
+    Run ``tasks`` in a pool of ``jobs`` threads and yield their results in the order of ``tasks``.
+
+    :param tasks: Pairs of task name and a callable that takes no arguments.
+    :param jobs: Maximal number of tasks running at the same time.
+
+    Exceptions (subclasses of ``Exception``) raised by the tasks are stored in the results,
+    any other exception (``KeyboardInterrupt``, ``SystemExit``) cancels the tasks that haven't started yet
+    and is re-raised once the running tasks finish.
+    """
+    with capture_thread_stdout() as stdout:
+
+        def run(name, func):
+            buf = io.StringIO()
+            stdout.thread_buffer = buf
+            try:
+                result = func()
+            except Exception as e:  # pylint: disable=broad-except
+                return TaskResult(name, exception=e, output=buf.getvalue())
+            finally:
+                stdout.thread_buffer = None
+            return TaskResult(name, result=result, output=buf.getvalue())
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = [executor.submit(run, name, func) for name, func in tasks]
+            try:
+                for future in futures:
+                    yield future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+def run_tasks_and_report(
+    tasks: Iterable[Tuple[str, Callable[[], Any]]],
+    jobs: int,
+    *,
+    error_prefix: str = "",
+    output=None,
+) -> List[TaskResult]:
+    """
+    Run ``tasks`` with ``run_tasks()``, write their outputs in the order of ``tasks``
+    and report the failed ones on stderr as ``<error_prefix><name>: <exception>``.
+    A failed task doesn't stop the remaining ones.
+
+    With ``jobs <= 1`` the tasks run one by one in the calling thread and their output is not captured,
+    so it appears while the tasks are running.
+
+    :param output: Stream the outputs of the tasks are written to. Default: ``sys.stdout``.
+    :return: Results of all tasks in the order of ``tasks``, the caller prints a summary.
+    """
+    if jobs <= 1:
+        task_results = _run_tasks_inline(tasks, output)
+    else:
+        task_results = run_tasks(tasks, jobs)
+
+    results = []
+    for result in task_results:
+        (output or sys.stdout).write(result.output)
+        if not result.ok:
+            print(f"{error_prefix}{result.name}: {result.exception}", file=sys.stderr)
+        results.append(result)
+    return results
+
+
+def _run_tasks_inline(tasks: Iterable[Tuple[str, Callable[[], Any]]], output=None) -> Iterator[TaskResult]:
+    for name, func in tasks:
+        try:
+            with contextlib.redirect_stdout(output or sys.stdout):
+                result = func()
+        except Exception as e:  # pylint: disable=broad-except
+            yield TaskResult(name, exception=e)
+        else:
+            yield TaskResult(name, result=result)
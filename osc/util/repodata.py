@@ -2,8 +2,15 @@
 information instead of scanning individual rpms."""
 
 
+import bz2
+import contextlib
 import gzip
+import lzma
 import os
+import shutil
+import sqlite3
+import sys
+import tempfile
 from xml.etree import ElementTree as ET
 
 from . import rpmquery
@@ -23,13 +30,46 @@ OPERATOR_BY_FLAGS = {
 }
 
 
-def primaryPath(directory):
-    """Returns path to the primary repository data file.
+def _open_zstd(path):
+    try:
+        # python 3.14+
+        from compression import zstd
+        return zstd.open(path, "rb")
+    except ImportError:
+        pass
+
+    try:
+        import zstandard
+    except ImportError:
+        raise OSError("Reading '%s' requires the 'zstandard' python module" % path) from None
+
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+def open_compressed(path):
+    """Opens a repository data file for reading, decompresses it on the fly.
+
+    :param path: path to the file, the compression is determined from the file name extension
+    :return: binary file object
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".zst"):
+        return _open_zstd(path)
+    return open(path, "rb")
+
+
+def data_path(directory, data_type):
+    """Returns path to the repository data file of the given type.
 
     :param directory: repository directory that contains the repodata subdirectory
-    :return:  path to primary repository data file
+    :param data_type: type of the data as listed in repomd.xml, for example ``primary`` or ``primary_db``
+    :return: path to the repository data file or None if repomd.xml doesn't list it
     :rtype: str
-    :raise IOError: if repomd.xml contains no primary location
     """
     from .xml import xml_parse
 
@@ -38,40 +78,137 @@ def primaryPath(directory):
     root = elementTree.getroot()
 
     for dataElement in root:
-        if dataElement.get("type") == "primary":
+        if dataElement.get("type") == data_type:
             locationElement = dataElement.find(namespace("repo") + "location")
             # even though the repomd.xml file is under repodata, the location a
             # attribute is relative to parent directory (directory).
-            primaryPath = os.path.join(directory, locationElement.get("href"))
-            break
-    else:
-        raise OSError("'%s' contains no primary location" % metaDataPath)
+            return os.path.join(directory, locationElement.get("href"))
 
-    return primaryPath
+    return None
 
 
-def queries(directory):
-    """Returns a list of RepoDataQueries constructed from the repodata under
+def primaryPath(directory):
+    """Returns path to the primary repository data file.
+
+    :param directory: repository directory that contains the repodata subdirectory
+    :return:  path to primary repository data file
+    :rtype: str
+    :raise IOError: if repomd.xml contains no primary location
+    """
+    path = data_path(directory, "primary")
+    if path is None:
+        metaDataPath = os.path.join(directory, "repodata", "repomd.xml")
+        raise OSError("'%s' contains no primary location" % metaDataPath)
+    return path
+
+
+def _format_entry(name, flags, version, release):
+    entry = name
+
+    if flags is not None:
+        operator = OPERATOR_BY_FLAGS[flags]
+        entry += " %s %s" % (operator, version)
+
+        if release is not None:
+            entry += "-%s" % release
+
+    # the same dependencies repeat across the packages, share the strings
+    return sys.intern(entry)
+
+
+def _iter_primary_xml(directory, path, wanted_arch=None):
+    packageTag = namespace("common") + "package"
+    archTag = namespace("common") + "arch"
+
+    with open_compressed(path) as f:
+        root = None
+        for event, element in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = element
+                continue
+            if event != "end" or element.tag != packageTag:
+                continue
+
+            arch = element.findtext(archTag)
+            if wanted_arch is None or packagequery.PackageQueries.matches_architecture(arch, wanted_arch):
+                yield RepoDataQueryResult.from_element(directory, element)
+
+            # drop the processed package elements, the memory usage stays constant
+            root.clear()
+
+
+def _iter_primary_db(directory, path, wanted_arch=None):
+    with contextlib.ExitStack() as stack:
+        if os.path.splitext(path)[1] in (".gz", ".xz", ".bz2", ".zst"):
+            # sqlite can read only uncompressed files
+            tmp = stack.enter_context(tempfile.NamedTemporaryFile(prefix="osc_primary_", suffix=".sqlite"))
+            with open_compressed(path) as f:
+                shutil.copyfileobj(f, tmp)
+            tmp.flush()
+            path = tmp.name
+
+        conn = sqlite3.connect(path)
+        stack.callback(conn.close)
+
+        packages = {}
+        query = "SELECT pkgKey, name, epoch, version, release, arch, location_href, description FROM packages"
+        for row in conn.execute(query):
+            pkgKey, name, epoch, version, release, arch, location, description = row
+            if wanted_arch is not None and not packagequery.PackageQueries.matches_architecture(arch, wanted_arch):
+                continue
+            packages[pkgKey] = (name, epoch, version, release, arch, location, description, {})
+
+        # older createrepo versions don't create tables for the weak dependencies
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for collection in RepoDataQueryResult.DEPENDENCY_COLLECTIONS:
+            if collection not in tables:
+                continue
+            query = "SELECT pkgKey, name, flags, version, release FROM %s" % collection
+            for pkgKey, name, flags, version, release in conn.execute(query):
+                package = packages.get(pkgKey)
+                if package is None:
+                    continue
+                package[-1].setdefault(collection, []).append(_format_entry(name, flags, version, release))
+
+    for pkgKey, package in packages.items():
+        name, epoch, version, release, arch, location, description, deps = package
+        yield RepoDataQueryResult(directory, name, epoch, version, release, arch, location, description, deps)
+
+
+def iter_queries(directory, wanted_arch=None):
+    """Yields RepoDataQueryResult instances constructed from the repodata under
     the directory.
 
+    The primary.xml file is parsed incrementally, so the memory usage doesn't grow
+    with the size of the repository. The primary sqlite database is used only if
+    repomd.xml lists no primary.xml.
+
     :param directory: path to a repository directory (parent directory of repodata directory)
-    :return: list of RepoDataQueryResult instances
+    :param wanted_arch: if specified, only packages usable on the architecture are yielded
     :raise IOError: if repomd.xml contains no primary location
     """
-    from .xml import xml_parse
+    path = data_path(directory, "primary")
+    if path is not None:
+        return _iter_primary_xml(directory, path, wanted_arch)
 
-    path = primaryPath(directory)
+    path = data_path(directory, "primary_db")
+    if path is not None:
+        return _iter_primary_db(directory, path, wanted_arch)
 
-    gunzippedPrimary = gzip.GzipFile(path)
-    elementTree = xml_parse(gunzippedPrimary)
-    root = elementTree.getroot()
+    metaDataPath = os.path.join(directory, "repodata", "repomd.xml")
+    raise OSError("'%s' contains no primary location" % metaDataPath)
 
-    packageQueries = []
-    for packageElement in root:
-        packageQuery = RepoDataQueryResult(directory, packageElement)
-        packageQueries.append(packageQuery)
 
-    return packageQueries
+def queries(directory, wanted_arch=None):
+    """Returns a list of RepoDataQueries constructed from the repodata under
+    the directory.
+
+    :param directory: path to a repository directory (parent directory of repodata directory)
+    :param wanted_arch: if specified, only packages usable on the architecture are returned
+    :return: list of RepoDataQueryResult instances
+    :raise IOError: if repomd.xml contains no primary location
+    """
+    return list(iter_queries(directory, wanted_arch))
 
 
 def _to_bytes_or_None(method):
@@ -95,74 +232,95 @@ def _to_bytes_list(method):
 class RepoDataQueryResult(packagequery.PackageQueryResult):
     """PackageQueryResult that reads in data from the repodata directory files."""
 
-    def __init__(self, directory, element):
-        """Creates a RepoDataQueryResult from the a package Element under a metadata
-        Element in a primary.xml file.
+    DEPENDENCY_COLLECTIONS = (
+        "provides",
+        "requires",
+        "conflicts",
+        "obsoletes",
+        "recommends",
+        "suggests",
+        "supplements",
+        "enhances",
+    )
+
+    def __init__(self, directory, name, epoch, version, release, arch, location, description=None, deps=None):
+        """Creates a RepoDataQueryResult from the package data.
 
         :param directory: repository directory path. Used to convert relative paths to full paths.
-        :param element: package Element
+        :param location: path to the package relative to the repository directory
+        :param deps: dict of dependency collection names and lists of entries such as ``name >= version-release``
         """
         self.__directory = os.path.abspath(directory)
-        self.__element = element
-
-    def __formatElement(self):
-        return self.__element.find(namespace("common") + "format")
-
-    def __parseEntry(self, element):
-        entry = element.get("name")
-        flags = element.get("flags")
-
-        if flags is not None:
-            version = element.get("ver")
-            operator = OPERATOR_BY_FLAGS[flags]
-            entry += " %s %s" % (operator, version)
-
-            release = element.get("rel")
-            if release is not None:
-                entry += "-%s" % release
+        self.__name = name
+        self.__epoch = epoch
+        self.__version = version
+        self.__release = release
+        self.__arch = arch
+        self.__location = location
+        self.__description = description
+        self.__deps = deps or {}
+
+    @classmethod
+    def from_element(cls, directory, element):
+        """Creates a RepoDataQueryResult from the a package Element under a metadata
+        Element in a primary.xml file. The result holds no reference to the element.
 
-        return entry
+        :param directory: repository directory path. Used to convert relative paths to full paths.
+        :param element: package Element
+        """
+        common = namespace("common")
+        rpm = namespace("rpm")
+
+        versionElement = element.find(common + "version")
+        formatElement = element.find(common + "format")
+
+        deps = {}
+        if formatElement is not None:
+            for collection in cls.DEPENDENCY_COLLECTIONS:
+                collectionElement = formatElement.find(rpm + collection)
+                if collectionElement is None:
+                    continue
+                deps[collection] = [
+                    _format_entry(i.get("name"), i.get("flags"), i.get("ver"), i.get("rel"))
+                    for i in collectionElement.findall(rpm + "entry")
+                ]
+
+        return cls(
+            directory,
+            name=element.findtext(common + "name"),
+            epoch=versionElement.get("epoch"),
+            version=versionElement.get("ver"),
+            release=versionElement.get("rel"),
+            arch=element.findtext(common + "arch"),
+            location=element.find(common + "location").get("href"),
+            description=element.findtext(common + "description"),
+            deps=deps,
+        )
 
     def __parseEntryCollection(self, collection):
-        formatElement = self.__formatElement()
-        collectionElement = formatElement.find(namespace("rpm") + collection)
-
-        entries = []
-        if collectionElement is not None:
-            for entryElement in collectionElement.findall(namespace("rpm") + "entry"):
-                entry = self.__parseEntry(entryElement)
-                entries.append(entry)
-
-        return entries
-
-    def __versionElement(self):
-        return self.__element.find(namespace("common") + "version")
+        return self.__deps.get(collection, [])
 
     @_to_bytes_or_None
     def arch(self):
-        return self.__element.findtext(namespace("common") + "arch")
+        return self.__arch
 
     @_to_bytes_or_None
     def description(self):
-        return self.__element.findtext(namespace("common") + "description")
+        return self.__description
 
     def distribution(self):
         return None
 
     @_to_bytes_or_None
     def epoch(self):
-        return self.__versionElement().get("epoch")
+        return self.__epoch
 
     @_to_bytes_or_None
     def name(self):
-        return self.__element.findtext(namespace("common") + "name")
+        return self.__name
 
     def path(self):
-        locationElement = self.__element.find(namespace("common") + "location")
-        relativePath = locationElement.get("href")
-        absolutePath = os.path.join(self.__directory, relativePath)
-
-        return absolutePath
+        return os.path.join(self.__directory, self.__location)
 
     @_to_bytes_list
     def provides(self):
@@ -170,7 +328,7 @@ class RepoDataQueryResult(packagequery.PackageQueryResult):
 
     @_to_bytes_or_None
     def release(self):
-        return self.__versionElement().get("rel")
+        return self.__release
 
     @_to_bytes_list
     def requires(self):
@@ -226,4 +384,4 @@ class RepoDataQueryResult(packagequery.PackageQueryResult):
 
     @_to_bytes_or_None
     def version(self):
-        return self.__versionElement().get("ver")
+        return self.__version
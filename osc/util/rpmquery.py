@@ -22,20 +22,25 @@ class RpmHeaderError(RpmError):
 class RpmHeader:
     """corresponds more or less to the indexEntry_s struct"""
 
-    def __init__(self, offset, length):
+    def __init__(self, offset, length, data=b"", data_offset=0):
         self.offset = offset
         # length of the data section (without length of indexEntries)
         self.length = length
+        # the data section starts at ``data_offset`` in ``data``
+        self.data = data
+        self.data_offset = data_offset
         self.entries = []
+        # maps tag to the first entry with the tag
+        self._index = {}
+        # the entries are decoded on the first access to their data
+        self.decoder = None
 
     def append(self, entry):
         self.entries.append(entry)
+        self._index.setdefault(entry.tag, entry)
 
     def gettag(self, tag):
-        for i in self.entries:
-            if i.tag == tag:
-                return i
-        return None
+        return self._index.get(tag, None)
 
     def __iter__(self):
         yield from self.entries
@@ -47,15 +52,36 @@ class RpmHeader:
 class RpmHeaderEntry:
     """corresponds to the entryInfo_s struct (except the data attribute)"""
 
+    __slots__ = ("tag", "type", "offset", "count", "header", "_data", "_decoded")
+
     # each element represents an int
     ENTRY_SIZE = 16
 
-    def __init__(self, tag, type, offset, count):
+    def __init__(self, tag, type, offset, count, header=None):
         self.tag = tag
         self.type = type
         self.offset = offset
         self.count = count
-        self.data = None
+        self.header = header
+        self._data = None
+        self._decoded = header is None
+
+    @property
+    def data(self):
+        if not self._decoded:
+            self._decoded = True
+            decoder = self.header.decoder
+            if decoder is not None:
+                try:  # this may fail for -debug* packages
+                    self._data = decoder(self)
+                except Exception:
+                    pass
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._decoded = True
+        self._data = value
 
 
 class RpmQuery(packagequery.PackageQuery, packagequery.PackageQueryResult):
@@ -91,6 +117,7 @@ class RpmQuery(packagequery.PackageQuery, packagequery.PackageQueryResult):
 
     def read(self, all_tags=False, self_provides=True, *extra_tags, **extra_kw):
         # self_provides is unused because a rpm always has a self provides
+        # all_tags and extra_tags are unused because the tags are decoded on the first access
         self.__read_lead()
         data = self.__file.read(RpmHeaderEntry.ENTRY_SIZE)
         hdrmgc, reserved, il, dl = struct.unpack('!I3i', data)
@@ -105,21 +132,16 @@ class RpmQuery(packagequery.PackageQuery, packagequery.PackageQueryResult):
             self.__file.read(pad)
             data = self.__file.read(RpmHeaderEntry.ENTRY_SIZE)
         hdrmgc, reserved, il, dl = struct.unpack('!I3i', data)
-        self.header = RpmHeader(pad, dl)
         if self.HEADER_MAGIC != hdrmgc:
             raise RpmHeaderError(self.__path, 'invalid headermagic \'%s\'' % hdrmgc)
-        data = self.__file.read(il * RpmHeaderEntry.ENTRY_SIZE)
-        while len(data) > 0:
-            ei = struct.unpack('!4i', data[:RpmHeaderEntry.ENTRY_SIZE])
-            self.header.append(RpmHeaderEntry(*ei))
-            data = data[RpmHeaderEntry.ENTRY_SIZE:]
-        data = self.__file.read(self.header.length)
-        for i in self.header:
-            if i.tag in self.default_tags + extra_tags or all_tags:
-                try:  # this may fail for -debug* packages
-                    self.__read_data(i, data)
-                except:
-                    pass
+        # read the index and the data in one go, the data section follows the index
+        index_size = il * RpmHeaderEntry.ENTRY_SIZE
+        data = self.__file.read(index_size + dl)
+        self.header = RpmHeader(pad, dl, data, index_size)
+        self.header.decoder = self.__read_data
+        with memoryview(data) as view:
+            for tag, type, offset, count in struct.iter_unpack('!4i', view[:index_size]):
+                self.header.append(RpmHeaderEntry(tag, type, offset, count, self.header))
         return self
 
     def __read_lead(self):
@@ -131,49 +153,59 @@ class RpmQuery(packagequery.PackageQuery, packagequery.PackageQueryResult):
         if sigtype != self.HEADERSIG_TYPE:
             raise RpmError(self.__path, 'invalid header signature \'%s\'' % sigtype)
 
-    def __read_data(self, entry, data):
-        off = entry.offset
+    def __read_data(self, entry):
+        """
+        Return decoded data of the entry.
+        The values are read directly from the header data without copying the rest of the data section.
+        """
+        data = self.header.data
+        start = self.header.data_offset
+        end = start + self.header.length
+        off = start + entry.offset
+        if off < start or off > end:
+            raise RpmHeaderError(self.__path, 'invalid offset \'%d\' (tag: \'%s\')' % (entry.offset, entry.tag))
         if entry.type == 2:
-            entry.data = struct.unpack('!%dc' % entry.count, data[off:off + 1 * entry.count])
-        if entry.type == 3:
-            entry.data = struct.unpack('!%dh' % entry.count, data[off:off + 2 * entry.count])
+            return struct.unpack_from('!%dc' % entry.count, data, off)
+        elif entry.type == 3:
+            return struct.unpack_from('!%dh' % entry.count, data, off)
         elif entry.type == 4:
-            entry.data = struct.unpack('!%di' % entry.count, data[off:off + 4 * entry.count])
+            return struct.unpack_from('!%di' % entry.count, data, off)
+        elif entry.type == 5:
+            return struct.unpack_from('!%dq' % entry.count, data, off)
         elif entry.type == 6:
-            entry.data = unpack_string(data[off:])
+            return self.__read_string(data, off, end)[0]
         elif entry.type == 7:
-            entry.data = data[off:off + entry.count]
+            return data[off:min(off + entry.count, end)]
         elif entry.type == 8 or entry.type == 9:
-            cnt = entry.count
-            entry.data = []
-            while cnt > 0:
-                cnt -= 1
-                s = unpack_string(data[off:])
-                # also skip '\0'
-                off += len(s) + 1
-                entry.data.append(s)
+            strings = []
+            for _ in range(entry.count):
+                s, off = self.__read_string(data, off, end)
+                strings.append(s)
             if entry.type == 8:
-                return
+                return strings
             lang = os.getenv('LANGUAGE') or os.getenv('LC_ALL') \
                 or os.getenv('LC_MESSAGES') or os.getenv('LANG')
             if lang is None:
-                entry.data = entry.data[0]
-                return
+                return strings[0]
             # get private i18n table
             table = self.header.gettag(100)
             # just care about the country code
             lang = lang.split('_', 1)[0]
-            cnt = 0
-            for i in table.data:
-                if cnt > len(entry.data) - 1:
-                    break
-                if i == lang:
-                    entry.data = entry.data[cnt]
-                    return
-                cnt += 1
-            entry.data = entry.data[0]
-        else:
-            raise RpmHeaderError(self.__path, 'unsupported tag type \'%d\' (tag: \'%s\'' % (entry.type, entry.tag))
+            for i, table_lang in enumerate(table.data[:len(strings)]):
+                if table_lang == lang:
+                    return strings[i]
+            return strings[0]
+        raise RpmHeaderError(self.__path, 'unsupported tag type \'%d\' (tag: \'%s\'' % (entry.type, entry.tag))
+
+    @staticmethod
+    def __read_string(data, off, end):
+        """
+        Return a '\\0' terminated string starting at ``off`` and the offset that follows it.
+        """
+        idx = data.find(b'\0', off, end)
+        if idx == -1:
+            raise ValueError('illegal string: not \\0 terminated')
+        return data[off:idx], idx + 1
 
     def __reqprov(self, tag, flags, version, strong=None):
         pnames = self.header.gettag(tag)
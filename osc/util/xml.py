@@ -4,6 +4,9 @@ Functions that manipulate with XML.
 
 import io
 import xml.sax.saxutils
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
 from typing import Union
 from xml.etree import ElementTree as ET
 
@@ -83,10 +86,13 @@ def xml_indent(root):
 
 
 def _extend_parser_error_msg(e: ET.ParseError, text: Union[str, bytes]):
-    from ..output import tty
-
     y, x = e.position
     text = text.splitlines()[y-1][x-1:]
+    _append_error_context(e, text)
+
+
+def _append_error_context(e: ET.ParseError, text: Union[str, bytes]):
+    from ..output import tty
 
     if isinstance(text, bytes):
         text = text.decode("utf-8")
@@ -115,11 +121,22 @@ def xml_fromstring(text: str):
         raise
 
 
-def xml_parse(source):
+def xml_parse(source, *, stream: bool = False):
     """
     xml.etree.ElementTree.parse() wrapper that extends error message in ParseError
     exceptions with a snippet of the broken XML.
+
+    :param stream: Parse the source incrementally with ``xml_iterparse()``
+                   instead of reading it into memory first.
+                   Recommended for potentially large sources such as HTTP responses.
     """
+    if stream:
+        root = None
+        for event, element in xml_iterparse(source, events=("start",)):
+            if root is None:
+                root = element
+        return ET.ElementTree(root)
+
     if isinstance(source, str):
         # source is a file name
         with open(source, "rb") as f:
@@ -138,3 +155,129 @@ def xml_parse(source):
     except ET.ParseError as e:
         _extend_parser_error_msg(e, data)
         raise
+
+
+class _ErrorContextBuffer:
+    """
+    Keeps only the most recent ``size`` bytes (or characters) of the parsed data
+    and enough information to locate the lines reported in ParseError positions.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.data = None
+        # number of lines that were dropped from the beginning of the buffer
+        self.dropped_lines = 0
+        # number of columns of the first line in the buffer that were dropped
+        self.dropped_columns = 0
+
+    def append(self, chunk: Union[str, bytes]):
+        if self.data is None:
+            self.data = chunk[:0]
+        self.data += chunk
+
+        excess = len(self.data) - self.size
+        if excess <= 0:
+            return
+
+        dropped = self.data[:excess]
+        self.data = self.data[excess:]
+        newline = "\n" if isinstance(dropped, str) else b"\n"
+        lines = dropped.count(newline)
+        if lines:
+            self.dropped_lines += lines
+            self.dropped_columns = len(dropped) - dropped.rfind(newline) - 1
+        else:
+            self.dropped_columns += len(dropped)
+
+    def get_line(self, y: int, x: int) -> Optional[Union[str, bytes]]:
+        """
+        Return the ``y``-th line starting at ``x``-th column (both 1-based)
+        or ``None`` if it is no longer in the buffer.
+        """
+        if self.data is None:
+            return None
+
+        index = y - 1 - self.dropped_lines
+        lines = self.data.split(b"\n" if isinstance(self.data, bytes) else "\n")
+        if index < 0 or index >= len(lines):
+            return None
+
+        if index == 0:
+            x -= self.dropped_columns
+            if x < 1:
+                return None
+        return lines[index][x-1:].rstrip(b"\r" if isinstance(self.data, bytes) else "\r")
+
+
+def xml_iterparse(
+    source,
+    events: Tuple[str, ...] = ("end",),
+    *,
+    chunk_size: int = 64 * 1024,
+    context_size: int = 64 * 1024,
+) -> Iterator[Tuple[str, ET.Element]]:
+    """
+    Parse XML incrementally with xml.etree.ElementTree.XMLPullParser
+    and yield ``(event, element)`` tuples as soon as the data is available.
+
+    Unlike ``xml_parse()``, the source is never held in memory as a whole.
+    Only the last ``context_size`` bytes are kept to extend error message
+    in ParseError exceptions with a snippet of the broken XML.
+
+    The elements are still attached to their parents,
+    remove the processed ones to keep the memory usage low, see ``xml_iterchildren()``.
+
+    :param source: File name or a file-like object such as a HTTP response.
+    :param events: Events to report, see xml.etree.ElementTree.XMLPullParser.
+    """
+    if isinstance(source, str):
+        # source is a file name
+        with open(source, "rb") as f:
+            yield from xml_iterparse(f, events, chunk_size=chunk_size, context_size=context_size)
+        return
+
+    parser = ET.XMLPullParser(events=events)
+    context = _ErrorContextBuffer(context_size)
+
+    try:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            context.append(chunk)
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+    except ET.ParseError as e:
+        text = context.get_line(*e.position)
+        if text is not None:
+            _append_error_context(e, text)
+        raise
+
+
+def xml_iterchildren(source, tag: Optional[str] = None, **kwargs) -> Iterator[ET.Element]:
+    """
+    Parse XML incrementally with ``xml_iterparse()`` and yield the complete child elements of the root element.
+    The yielded elements are detached from the root element so they can be garbage collected once processed.
+
+    :param source: File name or a file-like object such as a HTTP response.
+    :param tag: Yield only children with the given tag.
+    """
+    root = None
+    depth = 0
+    for event, element in xml_iterparse(source, events=("start", "end"), **kwargs):
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        root.remove(element)
+        if tag is None or element.tag == tag:
+            yield element
@@ -176,7 +176,7 @@ def urldecorator(method, url, **kwargs):
 
         # mock connection pool, but only just once
         if not hasattr(test_method, "_MockHTTPConnectionPool"):
-            wrapped_test_method = patch('urllib3.HTTPConnectionPool', MockHTTPConnectionPool)(wrapped_test_method)
+            wrapped_test_method = patch('osc.connection.HTTPConnectionPool', MockHTTPConnectionPool)(wrapped_test_method)
             wrapped_test_method._MockHTTPConnectionPool = True
 
         wrapped_test_method.__name__ = test_method.__name__
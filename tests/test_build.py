@@ -1,8 +1,21 @@
+import os
+import shutil
+import tempfile
+import time
 import unittest
+from unittest.mock import patch
+from xml.etree import ElementTree as ET
 
 import osc.conf
+from osc import pkgcache
 from osc.build import check_trusted_projects
+from osc.build import get_preinstall_image
+from osc.build import query_prefer_pkgs
 from osc.oscerr import UserAbort
+from osc.util.packagequery import PackageError
+from osc.util.packagequery import PackageQuery
+
+from .test_rpmquery import make_rpm
 
 
 class TestTrustedProjects(unittest.TestCase):
@@ -38,5 +51,115 @@ class TestTrustedProjects(unittest.TestCase):
         check_trusted_projects(apiurl, ["foo"], interactive=False)
 
 
+class TestPreinstallImage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.img_info = ET.fromstring(
+            '<preinstallimage project="prj" repository="repo" package="pkg" filename="image.tar.zst" hdrmd5="abc">'
+            '<binary>bash</binary>'
+            '</preinstallimage>'
+        )
+        self.image_dir = os.path.join(self.tmpdir, "prj", "repo", "x86_64")
+        os.makedirs(self.image_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, size):
+        path = os.path.join(self.image_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+        return path
+
+    def test_garbage_collection_keeps_info(self):
+        image = self.write("image.tar.zst", 100)
+        info = self.write("preinstallimage.info", 10)
+        self.write("old.rpm", 100)
+
+        imagefile, _, imageinfo, bins = get_preinstall_image("http://localhost", "x86_64", self.tmpdir, self.img_info, offline=True)
+        self.assertEqual((imagefile, imageinfo, bins), (image, info, ["bash"]))
+
+        # the info file is recorded as used, so it's not the first one to be removed
+        access = pkgcache.PackageCacheIndex(self.tmpdir)
+        self.assertEqual(access.get_access()[info][1], "package")
+        access.close()
+
+        result = pkgcache.collect_garbage(self.tmpdir, 150, keep=[imagefile, imageinfo])
+        self.assertEqual([os.path.basename(i) for i in result.removed], ["old.rpm"])
+        self.assertTrue(os.path.exists(info))
+
+    def test_missing_info(self):
+        image = self.write("image.tar.zst", 100)
+        imagefile, _, imageinfo, _ = get_preinstall_image("http://localhost", "x86_64", self.tmpdir, self.img_info, offline=True)
+        self.assertEqual(imagefile, image)
+        self.assertEqual(imageinfo, "")
+
+
+class TestQueryPreferPkgs(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.pkgs_dir = os.path.join(self.tmpdir, "pkgs")
+        os.makedirs(self.pkgs_dir)
+        patcher = patch("osc.util.xdg.XDG_CACHE_HOME", os.path.join(self.tmpdir, "cache"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_rpm(self, name, version):
+        path = os.path.join(self.pkgs_dir, f"{name}-{version}-1.x86_64.rpm")
+        entries = [
+            (1000, 6, name.encode("utf-8")),
+            (1001, 6, version.encode("utf-8")),
+            (1002, 6, b"1"),
+            (1022, 6, b"x86_64"),
+            (1047, 8, [name.encode("utf-8")]),
+            (1112, 4, [0]),
+            (1113, 8, [b""]),
+        ]
+        make_rpm(path, entries)
+        # files modified just now are not cached
+        mtime = time.time() - 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_cache(self):
+        paths = [self.make_rpm("foo", "1.0"), self.make_rpm("bar", "2.0")]
+        result = query_prefer_pkgs({self.pkgs_dir: paths})
+        self.assertEqual([i.name() for i in result], [b"foo", b"bar"])
+        self.assertEqual(result[1].evr(), b"2.0-1")
+        self.assertEqual(result[0].path(), paths[0])
+
+        # the unchanged packages are taken from the cache
+        with patch.object(PackageQuery, "query", side_effect=AssertionError("not cached")):
+            result = query_prefer_pkgs({self.pkgs_dir: paths})
+        self.assertEqual([i.provides() for i in result], [[b"foo"], [b"bar"]])
+        self.assertEqual(result[0].vercmp(result[1]), -1)
+
+        # a changed package is queried again
+        paths[0] = self.make_rpm("foo", "1.0")
+        with open(paths[0], "ab") as f:
+            f.write(b"more payload")
+        with patch.object(PackageQuery, "query", wraps=PackageQuery.query) as query:
+            result = query_prefer_pkgs({self.pkgs_dir: paths})
+        self.assertEqual([i.args[0] for i in query.call_args_list], [paths[0]])
+        self.assertEqual(result[0].name(), b"foo")
+
+    @patch("osc.build.PREFER_PKGS_MIN_PER_JOB", 1)
+    def test_processes(self):
+        paths = [self.make_rpm(f"pkg{i}", "1.0") for i in range(4)]
+        result = query_prefer_pkgs({self.pkgs_dir: paths}, jobs=2)
+        self.assertEqual([i.name() for i in result], [b"pkg0", b"pkg1", b"pkg2", b"pkg3"])
+
+    def test_error(self):
+        path = os.path.join(self.pkgs_dir, "broken.rpm")
+        with open(path, "wb") as f:
+            f.write(b"not a package")
+        self.assertRaises(PackageError, query_prefer_pkgs, {self.pkgs_dir: [path]})
+
+
 if __name__ == "__main__":
     unittest.main()
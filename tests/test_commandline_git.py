@@ -0,0 +1,102 @@
+import argparse
+import contextlib
+import io
+import json
+import threading
+import time
+import types
+import unittest
+from unittest.mock import patch
+
+from osc.commandline_git import GitObsCommand
+from osc.commands_git.pr_comment import PullRequestCommentCommand
+from osc.commandline_git import RateLimiter
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.command = types.SimpleNamespace(gitea_conn=types.SimpleNamespace(pool_size=1))
+        self.stdout = io.StringIO()
+        self.stderr = io.StringIO()
+
+    def run_batch(self, pr_ids, func, **kwargs):
+        args = argparse.Namespace(jobs=4, rate_limit=0, summary_json=False)
+        for key, value in kwargs.items():
+            setattr(args, key, value)
+        with contextlib.redirect_stdout(self.stdout), contextlib.redirect_stderr(self.stderr):
+            return GitObsCommand.run_batch(self.command, args, pr_ids, func)
+
+    def test_success(self):
+        barrier = threading.Barrier(2, timeout=10)
+
+        def func(owner, repo, number):
+            # blocks unless the pull requests are processed concurrently
+            barrier.wait()
+            print(f"Processing {owner}/{repo}#{number}")
+
+        results = self.run_batch(["pool/foo#1", "pool/bar#2"], func)
+        self.assertEqual([i.pr_id for i in results], ["pool/foo#1", "pool/bar#2"])
+        self.assertTrue(all(i.ok for i in results))
+        # the output is in the order of the pull requests
+        self.assertEqual(self.stdout.getvalue(), "Processing pool/foo#1\nProcessing pool/bar#2\n")
+        self.assertEqual(self.command.gitea_conn.pool_size, 4)
+
+    def test_failure(self):
+        def func(owner, repo, number):
+            print(f"Closing {owner}/{repo}#{number}")
+            if number == 1:
+                raise RuntimeError("failed")
+
+        with self.assertRaises(SystemExit) as cm:
+            self.run_batch(["pool/foo#1", "pool/bar#2"], func, summary_json=True)
+        self.assertEqual(cm.exception.code, 1)
+
+        summary = json.loads(self.stdout.getvalue())
+        self.assertEqual(summary["total"], 2)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["results"][0], {"id": "pool/foo#1", "ok": False, "error": "failed", "status": None})
+        self.assertEqual(summary["results"][1]["ok"], True)
+        self.assertIn("pool/foo#1: failed", self.stderr.getvalue())
+        # the output of the operations doesn't break the json on stdout
+        self.assertIn("Closing pool/foo#1\n", self.stderr.getvalue())
+        self.assertIn("Closing pool/bar#2\n", self.stderr.getvalue())
+
+
+class TestPullRequestComment(unittest.TestCase):
+    @patch("osc.gitea_api.PullRequest.add_comment")
+    def test_summary_json(self, add_comment):
+        command = types.SimpleNamespace(gitea_conn=types.SimpleNamespace(pool_size=1), print_gitea_settings=lambda: None)
+        command.run_batch = lambda *args: GitObsCommand.run_batch(command, *args)
+        args = argparse.Namespace(id=["pool/foo#1", "pool/bar#2"], message="LGTM", jobs=1, rate_limit=0, summary_json=True)
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            PullRequestCommentCommand.run(command, args)
+
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(add_comment.call_count, 2)
+        self.assertIn("LGTM\n", stderr.getvalue())
+        self.assertIn("Adding a comment to pull request pool/foo#1 ...\n", stderr.getvalue())
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate(self):
+        limiter = RateLimiter(20)
+        start = time.monotonic()
+        for i in range(5):
+            limiter.wait()
+        # the first operation starts immediately, the others 1/20 s apart
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_no_limit(self):
+        limiter = RateLimiter(0)
+        start = time.monotonic()
+        for i in range(100):
+            limiter.wait()
+        self.assertLess(time.monotonic() - start, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from osc.commands_git.pr_dump import PullRequestDumpCommand
+from osc.gitea_api import PullRequest
+
+
+PR_DATA = {
+    "number": 1,
+    "updated_at": "2025-01-01T00:00:00Z",
+    "merge_base": "base-sha",
+    "head": {"sha": "head-sha"},
+    "base": {"sha": "base-sha"},
+}
+
+
+class TestIsDumpUpToDate(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.is_dump_up_to_date = PullRequestDumpCommand.is_dump_up_to_date.__get__(object())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_dump(self, status="SUCCESS", pr_data=PR_DATA):
+        os.makedirs(os.path.join(self.tmpdir, "metadata"), exist_ok=True)
+        with open(os.path.join(self.tmpdir, "STATUS"), "w", encoding="utf-8") as f:
+            f.write(status)
+        with open(os.path.join(self.tmpdir, "metadata", "pr.json"), "w", encoding="utf-8") as f:
+            json.dump(pr_data, f)
+
+    def pr_obj(self, **kwargs):
+        data = json.loads(json.dumps(PR_DATA))
+        data.update(kwargs)
+        return PullRequest(data)
+
+    def test_up_to_date(self):
+        self.write_dump()
+        self.assertTrue(self.is_dump_up_to_date(self.tmpdir, self.pr_obj()))
+
+    def test_missing(self):
+        self.assertFalse(self.is_dump_up_to_date(self.tmpdir, self.pr_obj()))
+
+    def test_failed(self):
+        self.write_dump(status="FAILED")
+        self.assertFalse(self.is_dump_up_to_date(self.tmpdir, self.pr_obj()))
+
+    def test_updated(self):
+        self.write_dump()
+        self.assertFalse(self.is_dump_up_to_date(self.tmpdir, self.pr_obj(updated_at="2025-01-02T00:00:00Z")))
+
+    def test_head_changed(self):
+        self.write_dump()
+        self.assertFalse(self.is_dump_up_to_date(self.tmpdir, self.pr_obj(head={"sha": "new-sha"})))
+
+    def test_alternates_missing(self):
+        self.write_dump()
+        objects_info = os.path.join(self.tmpdir, "head", ".git", "objects", "info")
+        os.makedirs(objects_info)
+        with open(os.path.join(objects_info, "alternates"), "w", encoding="utf-8") as f:
+            f.write(os.path.join(self.tmpdir, "mirror", "objects") + "\n")
+        self.assertFalse(self.is_dump_up_to_date(self.tmpdir, self.pr_obj()))
+
+        os.makedirs(os.path.join(self.tmpdir, "mirror", "objects"))
+        self.assertTrue(self.is_dump_up_to_date(self.tmpdir, self.pr_obj()))
+
+    def test_merge_base_changed(self):
+        self.write_dump()
+        self.assertFalse(self.is_dump_up_to_date(self.tmpdir, self.pr_obj(merge_base="new-sha")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import threading
+import unittest
+
+from osc.commands_git.pr_review_interactive import PrefetchCancelled
+from osc.commands_git.pr_review_interactive import Prefetcher
+
+
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def func(self, item):
+        with self.lock:
+            self.calls.append(item)
+        if item == "fail":
+            raise RuntimeError(item)
+        return item.upper()
+
+    def test_prefetch(self):
+        prefetcher = Prefetcher(self.func, ["a", "b", "c", "d", "e"], depth=2)
+        self.addCleanup(prefetcher.close)
+
+        self.assertEqual(prefetcher.get(0), "A")
+        # the following items are submitted together with the requested one
+        self.assertEqual(sorted(prefetcher._futures), [0, 1, 2])
+
+        self.assertEqual(prefetcher.get(1), "B")
+        # results of the processed items are dropped
+        self.assertEqual(sorted(prefetcher._futures), [1, 2, 3])
+
+        self.assertEqual(prefetcher.get(4), "E")
+        self.assertEqual(sorted(prefetcher._futures), [4])
+
+        # no item is fetched more than once
+        prefetcher.close()
+        self.assertEqual(len(self.calls), len(set(self.calls)))
+
+    def test_no_prefetch(self):
+        prefetcher = Prefetcher(self.func, ["a", "b"], depth=0)
+        self.assertEqual(prefetcher.get(0), "A")
+        self.assertEqual(self.calls, ["a"])
+        self.assertIsNone(prefetcher._executor)
+
+    def test_exception(self):
+        prefetcher = Prefetcher(self.func, ["fail", "b"], depth=1)
+        self.addCleanup(prefetcher.close)
+        self.assertRaises(RuntimeError, prefetcher.get, 0)
+        self.assertEqual(prefetcher.get(1), "B")
+
+    def test_close(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def func(item):
+            started.set()
+            release.wait(10)
+            if prefetcher.cancelled.is_set():
+                raise PrefetchCancelled()
+            return item
+
+        prefetcher = Prefetcher(func, ["a", "b", "c", "d"], depth=3, jobs=1)
+        prefetcher._submit(0)
+        prefetcher._submit(1)
+        started.wait(10)
+        future = prefetcher._futures[0]
+        pending = prefetcher._futures[1]
+
+        prefetcher.close()
+        release.set()
+        self.assertTrue(pending.cancelled())
+        self.assertRaises(PrefetchCancelled, future.result, 10)
+        self.assertRaises(PrefetchCancelled, prefetcher.get, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import os
 import sys
 import unittest
+from unittest.mock import patch
 from urllib.error import HTTPError
 from xml.etree import ElementTree as ET
 
@@ -371,6 +372,29 @@ class TestCommit(OscTestCase):
         self._check_status(p, 'add', '!')
         self._check_status(p, 'bar', ' ')
 
+    @patch.object(osc.core.Package, 'put_source_file')
+    def test_upload_parallel(self, put):
+        """upload several files in parallel"""
+        self._change_to_pkg('multiple')
+        p = osc.core.Package('.')
+        p._Package__put_source_files(['nochange', 'add', 'add2'], 'tdir', jobs=3)
+        self.assertEqual(sorted(i[0][0] for i in put.call_args_list), ['add', 'add2', 'nochange'])
+        self.assertEqual(sys.stdout.getvalue(), '...')
+
+    @patch.object(osc.core.Package, 'put_source_file')
+    def test_upload_parallel_meter(self, put):
+        """a single meter counts the uploaded files on a terminal"""
+        self._change_to_pkg('multiple')
+        p = osc.core.Package('.')
+        with patch.object(sys.stdout, 'isatty', return_value=True), \
+                patch('osc.obs_scm.package.create_text_meter') as create_text_meter:
+            p._Package__put_source_files(['nochange', 'add', 'add2'], 'tdir', jobs=3)
+        meter = create_text_meter.return_value
+        meter.start.assert_called_once_with('uploading 3 files', 3)
+        self.assertEqual([i[0][0] for i in meter.update.call_args_list], [1, 2, 3])
+        meter.end.assert_called_once_with()
+        self.assertEqual(sys.stdout.getvalue(), '\n')
+
 
 if __name__ == '__main__':
     unittest.main()
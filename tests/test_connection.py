@@ -0,0 +1,151 @@
+import http.cookiejar
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import urllib3.response
+
+import osc.conf
+from osc.connection import ConnectionPoolMixin
+from osc.connection import CookieJarAuthHandler
+from osc.connection import get_pool_stats
+from osc.connection import http_GET
+
+
+OSCRC = """
+[general]
+apiurl = https://api.example.com
+cookiejar = {cookiejar}
+
+[https://api.example.com]
+user = Admin
+pass = opensuse
+"""
+
+
+def make_response(data=b"<status/>", status=200, headers=None):
+    return urllib3.response.HTTPResponse(body=io.BytesIO(data), headers=headers or {}, status=status, preload_content=False)
+
+
+def make_cookie(value):
+    return http.cookiejar.Cookie(
+        version=0, name="openSUSE_session", value=value, port=None, port_specified=False,
+        domain="api.example.com", domain_specified=False, domain_initial_dot=False,
+        path="/", path_specified=True, secure=False, expires=None, discard=True,
+        comment=None, comment_url=None, rest={},
+    )
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePoolBase:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    def _get_conn(self, timeout=None):
+        return self.conn
+
+    def _put_conn(self, conn):
+        pass
+
+
+class FakePool(ConnectionPoolMixin, FakePoolBase):
+    pass
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_idle_timeout(self):
+        pool = FakePool()
+        pool.idle_timeout = 10
+
+        conn = pool._get_conn()
+        pool._put_conn(conn)
+        self.assertFalse(pool._get_conn().closed)
+
+        conn.osc_last_used -= 60
+        self.assertTrue(pool._get_conn().closed)
+        self.assertEqual(pool.num_expired, 1)
+
+    def test_no_idle_timeout(self):
+        pool = FakePool()
+        conn = pool._get_conn()
+        pool._put_conn(conn)
+        conn.osc_last_used -= 3600
+        self.assertFalse(pool._get_conn().closed)
+
+    def test_stats(self):
+        pool = FakePool()
+        pool.num_requests = 10
+        pool.num_connections = 2
+        pool.num_expired = 1
+        self.assertEqual(get_pool_stats(pool), "10 requests, 3 connections opened, 7 reused")
+
+
+class MockPool:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def urlopen(self, method, url, body=None, headers=None, **kwargs):
+        self.requests.append((method, url, dict(headers)))
+        response = self.responses.pop(0)
+        if callable(response):
+            response = response()
+        return response
+
+
+class TestReauthentication(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.cookiejar_path = os.path.join(self.tmpdir, "cookiejar")
+        oscrc = os.path.join(self.tmpdir, "oscrc")
+        with open(oscrc, "w") as f:
+            f.write(OSCRC.format(cookiejar=self.cookiejar_path))
+        with patch.dict(os.environ, {"OSC_CONFIG": oscrc}):
+            osc.conf.get_config(override_conffile=oscrc, override_no_keyring=True)
+
+        jar = http.cookiejar.LWPCookieJar(self.cookiejar_path)
+        jar.set_cookie(make_cookie("expired"))
+        patcher = patch.dict(CookieJarAuthHandler.COOKIEJARS, {self.cookiejar_path: jar}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.jar = jar
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _request(self, pool):
+        with patch.dict("osc.connection.CONNECTION_POOLS", {"https://api.example.com": pool}):
+            return http_GET("https://api.example.com/about").read()
+
+    def test_basic_auth_after_401(self):
+        unauthorized = make_response(b"", status=401, headers={"WWW-Authenticate": 'Basic realm="obs"'})
+        pool = MockPool([unauthorized, make_response(b"<about/>")])
+        self.assertEqual(self._request(pool), b"<about/>")
+        self.assertEqual(pool.requests[0][2]["Cookie"], "openSUSE_session=expired")
+        self.assertTrue(pool.requests[1][2]["Authorization"].startswith("Basic "))
+        self.assertTrue(unauthorized.isclosed())
+
+    def test_reuse_cookie_of_other_thread(self):
+        def unauthorized():
+            # another thread re-authenticates while the request is in flight
+            self.jar.set_cookie(make_cookie("new"))
+            return make_response(b"", status=401, headers={"WWW-Authenticate": 'Basic realm="obs"'})
+
+        pool = MockPool([unauthorized, make_response(b"<about/>")])
+        self.assertEqual(self._request(pool), b"<about/>")
+        self.assertEqual(pool.requests[1][2]["Cookie"], "openSUSE_session=new")
+        self.assertNotIn("Authorization", pool.requests[1][2])
+
+
+if __name__ == "__main__":
+    unittest.main()
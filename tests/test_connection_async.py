@@ -0,0 +1,105 @@
+import asyncio
+import io
+import threading
+import unittest
+import urllib.error
+from unittest.mock import patch
+
+import urllib3.response
+
+from osc._private.api import async_get
+from osc.connection_async import AsyncClient
+
+
+def make_response(data, status=200):
+    return urllib3.response.HTTPResponse(body=io.BytesIO(data), status=status, preload_content=False)
+
+
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.client = AsyncClient(jobs=4)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.client.close()
+        self.loop.close()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    @patch("osc.connection.set_pool_maxsize")
+    @patch("osc.connection.http_request")
+    def test_request(self, http_request, set_pool_maxsize):
+        http_request.side_effect = lambda method, url, headers=None, data=None: make_response(url.encode("utf-8"))
+
+        async def main():
+            urls = [f"https://api.example.com/source/prj{i}/_meta" for i in range(20)]
+            return await asyncio.gather(*[self.client.request("GET", url) for url in urls])
+
+        responses = self.run_async(main())
+        self.assertEqual([i.read() for i in responses], [f"https://api.example.com/source/prj{i}/_meta".encode("utf-8") for i in range(20)])
+        self.assertEqual(responses[0].status, 200)
+        set_pool_maxsize.assert_called_once_with(4)
+
+    @patch("osc.connection.set_pool_maxsize")
+    def test_aexit_doesnt_block(self, set_pool_maxsize):
+        release = threading.Event()
+        ticks = []
+
+        async def tick():
+            while not release.is_set():
+                ticks.append(None)
+                if len(ticks) == 10:
+                    # the loop kept running while the client was waiting for the request
+                    release.set()
+                await asyncio.sleep(0.01)
+
+        async def main():
+            async with self.client:
+                request = asyncio.ensure_future(self.client.run(release.wait, 10))
+                ticker = asyncio.ensure_future(tick())
+                await asyncio.sleep(0)
+            await ticker
+            return await request
+
+        self.assertTrue(self.run_async(main()))
+
+    @patch("osc.connection.set_pool_maxsize")
+    @patch("osc.connection.http_request")
+    def test_concurrency(self, http_request, set_pool_maxsize):
+        barrier = threading.Barrier(4, timeout=10)
+
+        def request(method, url, headers=None, data=None):
+            # blocks unless 4 requests run at the same time
+            barrier.wait()
+            return make_response(b"<status/>")
+
+        http_request.side_effect = request
+
+        async def main():
+            return await asyncio.gather(*[self.client.request("GET", "url") for i in range(8)])
+
+        self.assertEqual(len(self.run_async(main())), 8)
+
+    @patch("osc.connection.set_pool_maxsize")
+    @patch("osc.connection.http_request")
+    def test_http_error(self, http_request, set_pool_maxsize):
+        response = make_response(b"<status code='unknown_project'/>", status=404)
+        http_request.side_effect = urllib.error.HTTPError("url", 404, "Not Found", {}, response)
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            self.run_async(self.client.request("GET", "url"))
+        self.assertEqual(cm.exception.code, 404)
+        self.assertEqual(cm.exception.read(), b"<status code='unknown_project'/>")
+
+    @patch("osc.connection.set_pool_maxsize")
+    @patch("osc.connection.http_request")
+    def test_async_get(self, http_request, set_pool_maxsize):
+        http_request.return_value = make_response(b"<project name='prj'/>")
+        root = self.run_async(async_get("https://api.example.com", ["source", "prj", "_meta"], client=self.client))
+        self.assertEqual(root.get("name"), "prj")
+        self.assertEqual(http_request.call_args[0][:2], ("GET", "https://api.example.com/source/prj/_meta"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest.mock import patch
+
+from osc import fetch
+from osc.pkgcache import PackageCacheIndex
+
+
+class FakeChecker:
+    checked = []
+
+    def readkeys(self, keys):
+        pass
+
+    def check(self, pkg):
+        self.checked.append(os.path.basename(pkg))
+        if "broken" in pkg:
+            raise Exception("signature verification failed")
+
+    def cleanup(self):
+        pass
+
+
+@patch("osc.conf.config", {"builtin_signature_check": True, "verify_jobs": 1})
+@patch("osc.checker.Checker", FakeChecker)
+@patch("osc.util.packagequery.PackageQuery.queryhdrmd5", new=lambda path: "hdrmd5-" + os.path.basename(path))
+class TestVerifyPacs(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.index = PackageCacheIndex(self.tmpdir)
+        self.key = os.path.join(self.tmpdir, "_pubkey")
+        with open(self.key, "w") as f:
+            f.write("key")
+        FakeChecker.checked = []
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmpdir)
+
+    def buildinfo(self, *names):
+        deps = []
+        for name in names:
+            path = os.path.join(self.tmpdir, name)
+            with open(path, "w") as f:
+                f.write(name)
+            mtime = time.time() - 3600
+            os.utime(path, (mtime, mtime))
+            deps.append(types.SimpleNamespace(fullfilename=path))
+        return types.SimpleNamespace(deps=deps, keys=[self.key], prjkeys=["prj"])
+
+    def test_skip_verified(self):
+        bi = self.buildinfo("foo.rpm", "bar.rpm", "baz.deb")
+        fetch.verify_pacs(bi, index=self.index)
+        self.assertEqual(FakeChecker.checked, ["foo.rpm", "bar.rpm"])
+
+        FakeChecker.checked = []
+        fetch.verify_pacs(bi, index=self.index)
+        self.assertEqual(FakeChecker.checked, [])
+
+        # a different key requires verifying the packages again
+        with open(self.key, "w") as f:
+            f.write("other key")
+        fetch.verify_pacs(bi, index=self.index)
+        self.assertEqual(FakeChecker.checked, ["foo.rpm", "bar.rpm"])
+
+    def test_replaced_same_stat(self):
+        bi = self.buildinfo("foo.rpm")
+        fetch.verify_pacs(bi, index=self.index)
+        self.assertEqual(FakeChecker.checked, ["foo.rpm"])
+
+        # the package was replaced by another one with the same size and mtime
+        FakeChecker.checked = []
+        with patch("osc.util.packagequery.PackageQuery.queryhdrmd5", new=lambda path: "other-hdrmd5"):
+            fetch.verify_pacs(bi, index=self.index)
+        self.assertEqual(FakeChecker.checked, ["foo.rpm"])
+
+    def test_failed(self):
+        bi = self.buildinfo("foo.rpm", "broken.rpm")
+        self.assertRaises(SystemExit, fetch.verify_pacs, bi, index=self.index)
+
+        # only the successfully verified package is recorded
+        FakeChecker.checked = []
+        self.assertRaises(SystemExit, fetch.verify_pacs, bi, index=self.index)
+        self.assertEqual(FakeChecker.checked, ["broken.rpm"])
+
+    def test_chunks(self):
+        # the packages are split among the jobs and the failures are reported in the order of the packages
+        bi = self.buildinfo(*[f"pkg{i}.rpm" for i in range(4)], "broken.rpm")
+        with patch("osc.fetch.VERIFY_MIN_PACS_PER_JOB", 1), patch("osc.fetch.ProcessPoolExecutor", FakeExecutor):
+            self.assertRaises(SystemExit, fetch.verify_pacs, bi, index=self.index, jobs=2)
+        self.assertEqual(sorted(FakeChecker.checked), ["broken.rpm"] + [f"pkg{i}.rpm" for i in range(4)])
+        self.assertEqual(FakeExecutor.chunks, [["pkg0.rpm", "pkg2.rpm", "broken.rpm"], ["pkg1.rpm", "pkg3.rpm"]])
+
+
+@patch("osc.conf.config", {"api_host_options": {"http://localhost": {"disable_hdrmd5_check": False}}})
+@patch("osc.pkgcache.PackageCacheIndex.get_hdrmd5", new=lambda self, path: "hdrmd5")
+class TestFetchParallel(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.fetcher = fetch.Fetcher(cachedir=self.tmpdir, download_jobs=4)
+        self.fetcher.progress_obj = None
+
+    def tearDown(self):
+        self.fetcher.header_index.close()
+        shutil.rmtree(self.tmpdir)
+
+    def pacs(self, *names):
+        # all packages share the same, not yet existing, directory
+        localdir = os.path.join(self.tmpdir, "prj", "repo", "x86_64")
+        return [
+            types.SimpleNamespace(
+                localdir=localdir,
+                fullfilename=os.path.join(localdir, name),
+                filename=name,
+                hdrmd5="hdrmd5",
+                project="prj",
+            )
+            for name in names
+        ]
+
+    def fake_fetch(self, pac, prefix="", grabber=None):
+        with open(pac.fullfilename, "w") as f:
+            f.write(pac.filename)
+
+    def test_fetch_parallel(self):
+        pacs = self.pacs("a.rpm", "b.rpm", "c.rpm", "d.rpm")
+
+        # make all workers create the directory at the same time
+        barrier = threading.Barrier(len(pacs), timeout=10)
+        makedirs = os.makedirs
+
+        def synchronized_makedirs(*args, **kwargs):
+            barrier.wait()
+            return makedirs(*args, **kwargs)
+
+        with patch.object(fetch.Fetcher, "fetch", new=self.fake_fetch), \
+                patch("os.makedirs", side_effect=synchronized_makedirs), \
+                patch("sys.stdout"):
+            self.fetcher._Fetcher__fetch_parallel(pacs, "http://localhost")
+
+        for pac in pacs:
+            self.assertTrue(os.path.isfile(pac.fullfilename))
+        self.assertEqual(self.fetcher.cpio, {})
+
+    def test_messages_after_meter(self):
+        pacs = self.pacs("a.rpm", "b.rpm")
+        stdout = io.StringIO()
+
+        def fake_fetch(fetcher, pac, prefix="", grabber=None):
+            print(f"message {pac.filename}")
+            self.fake_fetch(pac)
+
+        class FakeMeter:
+            def start(self, basename, size):
+                pass
+
+            def update(self, amount_read):
+                stdout.write("meter\n")
+
+            def end(self):
+                stdout.write("end\n")
+
+        self.fetcher.progress_obj = FakeMeter()
+        with patch.object(fetch.Fetcher, "fetch", new=fake_fetch), \
+                patch("osc.fetch.create_text_meter", return_value=FakeMeter()), \
+                contextlib.redirect_stdout(stdout):
+            self.fetcher._Fetcher__fetch_parallel(pacs, "http://localhost")
+
+        self.assertEqual(stdout.getvalue(), "meter\nmeter\nend\nmessage a.rpm\nmessage b.rpm\n")
+
+    def test_cancel(self):
+        pacs = self.pacs("a.rpm", "b.rpm")
+        started = threading.Event()
+        aborted = []
+
+        def fake_fetch(fetcher, pac, prefix="", grabber=None):
+            if pac.filename == "a.rpm":
+                started.wait(10)
+                raise KeyboardInterrupt()
+            started.set()
+            # a running download is aborted instead of being awaited
+            aborted.append(grabber.cancel_event.wait(10))
+
+        with patch.object(fetch.Fetcher, "fetch", new=fake_fetch), patch("sys.stdout"):
+            self.assertRaises(KeyboardInterrupt, self.fetcher._Fetcher__fetch_parallel, pacs, "http://localhost")
+        self.assertEqual(aborted, [True])
+
+
+class FakeExecutor:
+    chunks = []
+
+    def __init__(self, max_workers):
+        FakeExecutor.chunks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, func, keys, pac_list, quiet):
+        from concurrent.futures import Future
+
+        FakeExecutor.chunks.append([os.path.basename(i) for i in pac_list])
+        future = Future()
+        future.set_result(func(keys, pac_list, quiet))
+        return future
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+import unittest
+import urllib.parse
+from unittest.mock import patch
+
+from urllib3 import HTTPResponse
+
+from osc.gitea_api import Login
+from osc.gitea_api.connection import Connection
+from osc.gitea_api.connection import GiteaHTTPResponse
+from osc.gitea_api.http_signer import HttpSigner
+
+
+BASE_URL = "https://gitea.example.com/api/v1/orgs/pool/repos"
+
+
+def make_page(page, total=120, limit=50):
+    last_page = (total + limit - 1) // limit
+    items = list(range((page - 1) * limit, min(page * limit, total)))
+    links = []
+    if page < last_page:
+        links.append(f'<{BASE_URL}?limit={limit}&page={page + 1}>; rel="next"')
+        links.append(f'<{BASE_URL}?limit={limit}&page={last_page}>; rel="last"')
+    headers = {"X-Total-Count": str(total)}
+    if links:
+        headers["Link"] = ",".join(links)
+    return GiteaHTTPResponse(HTTPResponse(body=json.dumps(items).encode("utf-8"), headers=headers, status=200))
+
+
+class TestRequestAllPages(unittest.TestCase):
+    def setUp(self):
+        self.conn = Connection(Login(name="alice", user="alice", url="https://gitea.example.com"))
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def _request(self, conn, method, url, json_data=None, *, context=None, exception_map=None):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+        page = int(query.get("page", ["1"])[0])
+        with self.lock:
+            self.requests.append((id(conn), page))
+        if page == 2:
+            # the following pages arrive earlier
+            time.sleep(0.1)
+        return make_page(page)
+
+    def _get_items(self, **kwargs):
+        with patch.object(Connection, "request", autospec=True, side_effect=self._request):
+            result = []
+            for response in self.conn.request_all_pages("GET", "/api/v1/orgs/pool/repos?limit=50", **kwargs):
+                result.extend(response.json())
+            return result
+
+    def test_concurrent(self):
+        self.assertEqual(self._get_items(jobs=4), list(range(120)))
+        self.assertEqual(sorted(page for _, page in self.requests), [1, 2, 3])
+
+    def test_sequential(self):
+        self.assertEqual(self._get_items(jobs=1), list(range(120)))
+        self.assertEqual(self.requests, [(id(self.conn), 1), (id(self.conn), 2), (id(self.conn), 3)])
+
+    def test_page_urls(self):
+        urls = self.conn._get_page_urls(make_page(1, total=160))
+        self.assertEqual(urls, [f"{BASE_URL}?limit=50&page={i}" for i in (2, 3, 4)])
+        self.assertEqual(self.conn._get_page_urls(make_page(1, total=20)), [])
+
+
+class FakeConnection:
+    barrier = None
+
+    def __init__(self):
+        self.closed = False
+
+    def request(self, method, url, body, headers):
+        self.url = url
+
+    def getresponse(self):
+        if self.barrier:
+            # blocks unless the requests run at the same time
+            self.barrier.wait()
+        return HTTPResponse(body=json.dumps(self.url).encode("utf-8"), status=200)
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        with patch.object(Connection, "_new_conn", autospec=True, side_effect=self._new_conn):
+            self.conn = Connection(Login(name="alice", user="alice", url="https://gitea.example.com"), pool_size=2)
+
+    def _new_conn(self, conn):
+        conn._num_connections += 1
+        return FakeConnection()
+
+    def test_pool(self):
+        with patch.object(Connection, "_new_conn", autospec=True, side_effect=self._new_conn):
+            first = self.conn._get_conn()
+            self.assertIs(first, self.conn.conn)
+            second = self.conn._get_conn()
+            self.assertIsNot(first, second)
+            self.conn._put_conn(first)
+            self.conn._put_conn(second)
+            # the most recently used connection is reused first
+            self.assertIs(self.conn._get_conn(), second)
+            self.conn._put_conn(second)
+
+        self.conn.close()
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+
+    def test_concurrent_requests(self):
+        FakeConnection.barrier = threading.Barrier(2, timeout=10)
+        self.addCleanup(setattr, FakeConnection, "barrier", None)
+        results = []
+
+        def request(url):
+            results.append(self.conn.request("GET", url).json())
+
+        with patch.object(Connection, "_new_conn", autospec=True, side_effect=self._new_conn):
+            threads = [threading.Thread(target=request, args=(f"/api/v1/repos/pool/{i}",)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(results), ["/api/v1/repos/pool/0", "/api/v1/repos/pool/1"])
+        self.assertEqual(self.conn._pool.qsize(), 2)
+
+    @patch("time.sleep")
+    def test_retry_after(self, sleep):
+        responses = [
+            HTTPResponse(body=b"", headers={"Retry-After": "7"}, status=429),
+            HTTPResponse(body=b"[]", status=200),
+        ]
+        with patch.object(self.conn.conn, "request"), patch.object(self.conn.conn, "getresponse", side_effect=responses):
+            self.assertEqual(self.conn.request("GET", "/api/v1/user").json(), [])
+        sleep.assert_called_once_with(7.0)
+
+
+class TestHttpSigner(unittest.TestCase):
+    def test_key_loaded_once(self):
+        login = Login(name="alice", user="alice", url="https://gitea.example.com", ssh_key="id_ed25519", ssh_key_agent_pub="SHA256:abc")
+        signer = HttpSigner(login)
+        with patch.object(HttpSigner, "_get_signer_from_file", return_value=(lambda data: b"signature", "ed25519")) as get_signer:
+            signer.get_signed_header("GET", "/api/v1/user")
+            header = signer.get_signed_header("GET", "/api/v1/user")
+        self.assertEqual(get_signer.call_count, 1)
+        self.assertIn('algorithm="ed25519"', header["Signature"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,14 @@ import os
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 import unittest
 
 from osc.gitea_api import Git
+from osc.gitea_api import GitCommandCancelled
+from osc.gitea_api.git import get_background_env
+from osc.gitea_api.git import run_background_command
 
 
 @unittest.skipIf(not shutil.which("git"), "The 'git' executable is not available")
@@ -151,5 +156,30 @@ class TestGiteaApiGit(unittest.TestCase):
         self.assertEqual(g.topdir, self.tmpdir)
 
 
+class TestRunBackgroundCommand(unittest.TestCase):
+    def test_output(self):
+        self.assertEqual(run_background_command(["echo", " foo "]), "foo")
+
+    def test_failure(self):
+        self.assertRaises(subprocess.CalledProcessError, run_background_command, ["false"])
+
+    def test_no_terminal(self):
+        # stdin is closed and there is no controlling terminal to prompt on
+        self.assertEqual(run_background_command(["sh", "-c", "cat; tty || true"]), "not a tty")
+
+    def test_env(self):
+        env = get_background_env({"GIT_SSH_COMMAND": "ssh -i key"})
+        self.assertEqual(env["GIT_TERMINAL_PROMPT"], "0")
+        self.assertEqual(env["GIT_SSH_COMMAND"], "ssh -i key -o BatchMode=yes")
+
+    def test_cancel(self):
+        cancelled = threading.Event()
+        threading.Timer(0.2, cancelled.set).start()
+        start = time.monotonic()
+        # the child of the shell must be terminated too, otherwise it would keep the stdout pipe open
+        self.assertRaises(GitCommandCancelled, run_background_command, ["sh", "-c", "sleep 10; true"], cancelled=cancelled)
+        self.assertLess(time.monotonic() - start, 5)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from urllib3 import HTTPResponse
+
+from osc.gitea_api import Config
+from osc.gitea_api import GiteaHttpCache
+from osc.gitea_api import Login
+from osc.gitea_api.connection import Connection
+
+
+CONFIG = """
+general:
+  http_cache: true
+  http_cache_ttl: 60
+logins:
+- name: alice
+  url: https://gitea.example.com
+  user: alice
+  token: "1234"
+- name: bob
+  url: https://gitea.example.com
+  user: bob
+  token: "5678"
+  http_cache: false
+"""
+
+
+class TestGiteaHttpCacheOptions(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.config_path = os.path.join(self.tmpdir, "config.yml")
+        with open(self.config_path, "w") as f:
+            f.write(CONFIG)
+        self.config = Config(self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_general(self):
+        options = self.config.get_http_cache_options("alice")
+        self.assertEqual(options, {"http_cache": True, "http_cache_ttl": 60, "http_cache_size": 100})
+
+    def test_login_override(self):
+        options = self.config.get_http_cache_options("bob")
+        self.assertEqual(options["http_cache"], False)
+
+    @patch("osc.util.xdg.XDG_CACHE_HOME", "/tmp/cache")
+    def test_from_login(self):
+        cache = GiteaHttpCache.from_login(self.config, self.config.get_login("alice"))
+        self.assertEqual(cache.path, "/tmp/cache/git-obs/http/gitea.example.com/alice")
+        self.assertEqual(cache.ttl, 60)
+        self.assertIsNone(GiteaHttpCache.from_login(self.config, self.config.get_login("bob")))
+
+
+class TestConnectionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.cache = GiteaHttpCache(self.tmpdir, ttl=0, max_size=1024**2)
+        login = Login(name="alice", user="alice", url="https://gitea.example.com", token="1234")
+        self.conn = Connection(login, cache=self.cache)
+        self.requests = []
+        self.responses = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _request(self, method, url, body, headers):
+        self.requests.append((method, url, dict(headers)))
+
+    def _get(self, url="/api/v1/repos/pool/foo/pulls"):
+        with patch.object(self.conn.conn, "request", new=self._request):
+            with patch.object(self.conn.conn, "getresponse", new=lambda: self.responses.pop(0)):
+                return self.conn.request("GET", url)
+
+    def test_not_modified(self):
+        headers = {"ETag": '"1"', "Link": '</api/v1/repos/pool/foo/pulls?page=2>; rel="next"', "X-Total-Count": "60"}
+        self.responses = [
+            HTTPResponse(body=b'[{"number": 1}]', headers=headers, status=200),
+            HTTPResponse(body=b"", status=304),
+        ]
+        self.assertEqual(self._get().json(), [{"number": 1}])
+        response = self._get()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.json(), [{"number": 1}])
+        self.assertEqual(response.headers["X-Total-Count"], "60")
+        self.assertIn("Link", response.headers)
+        self.assertEqual(self.requests[1][2]["If-None-Match"], '"1"')
+
+    def test_ttl(self):
+        self.cache.ttl = 60
+        self.responses = [HTTPResponse(body=b'{"login": "alice"}', status=200)]
+        self.assertEqual(self._get("/api/v1/user").json(), {"login": "alice"})
+        self.assertEqual(self._get("/api/v1/user").json(), {"login": "alice"})
+        self.assertEqual(len(self.requests), 1)
+
+    def test_no_validators(self):
+        self.responses = [
+            HTTPResponse(body=b'{"login": "alice"}', status=200),
+            HTTPResponse(body=b'{"login": "alice2"}', status=200),
+        ]
+        self._get("/api/v1/user")
+        self.assertEqual(self._get("/api/v1/user").json(), {"login": "alice2"})
+        self.assertNotIn("If-None-Match", self.requests[1][2])
+
+
+if __name__ == "__main__":
+    unittest.main()
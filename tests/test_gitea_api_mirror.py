@@ -0,0 +1,169 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from osc.gitea_api import Config
+from osc.gitea_api import GitMirror
+from osc.gitea_api import Repo
+
+
+CONFIG = """
+general:
+  git_mirror_dir: /tmp/mirrors
+logins:
+- name: alice
+  url: https://gitea.example.com
+  user: alice
+  token: "1234"
+- name: bob
+  url: https://gitea.example.com
+  user: bob
+  token: "5678"
+  git_mirror_dir: ""
+"""
+
+
+class TestGitMirrorOptions(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.config_path = os.path.join(self.tmpdir, "config.yml")
+        with open(self.config_path, "w") as f:
+            f.write(CONFIG)
+        self.config = Config(self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_from_login(self):
+        mirror = GitMirror.from_login(self.config, self.config.get_login("alice"))
+        self.assertEqual(mirror.path, "/tmp/mirrors/gitea.example.com")
+        self.assertEqual(mirror.get_path("Owner", "Repo"), "/tmp/mirrors/gitea.example.com/owner/repo.git")
+        self.assertEqual(mirror.get_clone_config(), {"lfs.storage": "/tmp/mirrors/gitea.example.com/lfs"})
+
+    def test_login_override(self):
+        self.assertIsNone(GitMirror.from_login(self.config, self.config.get_login("bob")))
+
+
+@unittest.skipIf(not shutil.which("git"), "The 'git' executable is not available")
+class TestGitMirror(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.origin = os.path.join(self.tmpdir, "origin")
+        self.git("init", "-q", "-b", "main", self.origin)
+        self.commit("initial")
+
+        self.mirror = GitMirror(os.path.join(self.tmpdir, "mirrors"))
+        self.conn = None
+        repo_obj = Repo({"ssh_url": self.origin, "clone_url": self.origin, "parent": None})
+        patcher = patch.object(Repo, "get", return_value=repo_obj)
+        self.repo_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def git(self, *args, cwd=None):
+        env = dict(os.environ, GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com")
+        env.update(GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com")
+        return subprocess.check_output(["git"] + list(args), cwd=cwd, env=env, encoding="utf-8").strip()
+
+    def commit(self, message):
+        with open(os.path.join(self.origin, "file"), "a") as f:
+            f.write(message + "\n")
+        self.git("add", "file", cwd=self.origin)
+        self.git("commit", "-q", "-m", message, cwd=self.origin)
+        return self.git("rev-parse", "HEAD", cwd=self.origin)
+
+    def test_update(self):
+        path = self.mirror.update(self.conn, "Pool", "Foo")
+        self.assertEqual(path, self.mirror.get_path("pool", "foo"))
+        self.assertEqual(self.git("config", "gc.pruneExpire", cwd=path), "never")
+        self.assertIsNotNone(self.mirror.get_last_update("pool", "foo"))
+
+        commit = self.commit("second")
+        self.mirror.update(self.conn, "pool", "foo")
+        self.assertEqual(self.git("rev-parse", "main", cwd=path), commit)
+        # the repo is queried only for the initial clone
+        self.assertEqual(self.repo_get.call_count, 1)
+
+    def test_clone(self):
+        directory = os.path.join(self.tmpdir, "clone")
+        Repo.clone(self.conn, "pool", "foo", directory=directory, cwd=self.tmpdir, quiet=True, mirror=self.mirror)
+
+        # the objects are borrowed from the mirror
+        with open(os.path.join(directory, ".git", "objects", "info", "alternates")) as f:
+            alternates = f.read().strip()
+        self.assertEqual(alternates, os.path.join(self.mirror.get_path("pool", "foo"), "objects"))
+        self.assertEqual(self.git("config", "lfs.storage", cwd=directory), self.mirror.lfs_storage)
+
+    def add_lfs_object(self, oid):
+        path = os.path.join(self.mirror.lfs_storage, "objects", oid[:2], oid[2:4], oid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w"):
+            pass
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+        return path
+
+    def test_clone_dissociate(self):
+        directory = os.path.join(self.tmpdir, "clone")
+        Repo.clone(self.conn, "pool", "foo", directory=directory, cwd=self.tmpdir, quiet=True, mirror=self.mirror, dissociate=True)
+
+        # the objects are copied from the mirror
+        self.assertFalse(os.path.exists(os.path.join(directory, ".git", "objects", "info", "alternates")))
+        self.assertTrue(os.path.isdir(self.mirror.get_path("pool", "foo")))
+        self.assertEqual(self.git("rev-parse", "HEAD", cwd=directory), self.git("rev-parse", "HEAD", cwd=self.origin))
+
+    def test_get_lfs_oids(self):
+        oid = "ab" * 32
+        with open(os.path.join(self.origin, "file.tar"), "w") as f:
+            f.write(f"version https://git-lfs.github.com/spec/v1\noid sha256:{oid}\nsize 123\n")
+        self.git("add", "file.tar", cwd=self.origin)
+        self.git("commit", "-q", "-m", "lfs", cwd=self.origin)
+
+        self.mirror.update(self.conn, "pool", "foo")
+        self.assertEqual(self.mirror.get_lfs_oids("pool", "foo"), {oid})
+
+    def test_prune(self):
+        self.mirror.update(self.conn, "pool", "foo")
+        self.mirror.update(self.conn, "pool", "bar")
+        lfs_object = self.add_lfs_object("abcd")
+
+        old = time.time() - 3600
+        os.utime(os.path.join(self.mirror.get_path("pool", "foo"), GitMirror.STAMP_FILE), (old, old))
+
+        self.assertEqual(self.mirror.prune(60, dry_run=True), [self.mirror.get_path("pool", "foo"), lfs_object])
+        self.assertTrue(os.path.isdir(self.mirror.get_path("pool", "foo")))
+
+        self.assertEqual(self.mirror.prune(60), [self.mirror.get_path("pool", "foo"), lfs_object])
+        self.assertFalse(os.path.exists(self.mirror.get_path("pool", "foo")))
+        self.assertFalse(os.path.exists(lfs_object))
+        self.assertTrue(os.path.isdir(self.mirror.get_path("pool", "bar")))
+
+    def test_prune_lfs_in_use(self):
+        oid = "cd" * 32
+        with open(os.path.join(self.origin, "file.tar"), "w") as f:
+            f.write(f"version https://git-lfs.github.com/spec/v1\noid sha256:{oid}\nsize 123\n")
+        self.git("add", "file.tar", cwd=self.origin)
+        self.git("commit", "-q", "-m", "lfs", cwd=self.origin)
+        self.mirror.update(self.conn, "pool", "foo")
+
+        # old, but referenced by the remaining mirror
+        used = self.add_lfs_object(oid)
+        unused = self.add_lfs_object("ef" * 32)
+
+        self.assertEqual(self.mirror.prune(60), [unused])
+        self.assertTrue(os.path.exists(used))
+
+    def test_prune_locked(self):
+        self.mirror.update(self.conn, "pool", "foo")
+        with self.mirror.lock("pool", "foo"):
+            self.assertEqual(self.mirror.prune(0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import os
 import tempfile
+import threading
 import unittest
+from unittest.mock import patch
 
 import osc.conf
 import osc.grabber as osc_grabber
@@ -30,5 +32,51 @@ class TestMirrorGroup(unittest.TestCase):
         mg.urlgrab(None, os.path.join(self.tmpdir, "file"))
 
 
+class TestFileGrabber(unittest.TestCase):
+    def test_cancel(self):
+        cancel_event = threading.Event()
+        closed = []
+
+        def streamfile(url, progress_obj=None, text=None):
+            try:
+                yield b"data"
+                cancel_event.set()
+                yield b"more data"
+            finally:
+                closed.append(True)
+
+        gr = osc_grabber.OscFileGrabber(cancel_event=cancel_event)
+        with tempfile.TemporaryDirectory(prefix="osc_test") as tmpdir, patch("osc.grabber.streamfile", streamfile):
+            path = os.path.join(tmpdir, "file")
+            self.assertRaises(osc_grabber.GrabCancelled, gr.urlgrab, "http://localhost/file", path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"data")
+        # the download is stopped
+        self.assertEqual(closed, [True])
+
+
+class TestStreamReader(unittest.TestCase):
+    def test_read(self):
+        f = osc_grabber._StreamReader([b"abc", b"", b"defgh", b"i"])
+        self.assertEqual(f.read(2), b"ab")
+        self.assertEqual(f.read(4), b"c")
+        self.assertEqual(f.read(4), b"defg")
+        self.assertEqual(f.read(), b"hi")
+        self.assertEqual(f.read(), b"")
+
+    def test_close_generator(self):
+        closed = []
+
+        def chunks():
+            try:
+                yield b"data"
+            finally:
+                closed.append(True)
+
+        with osc_grabber._StreamReader(chunks()) as f:
+            f.read(1)
+        self.assertEqual(closed, [True])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,159 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import urllib3.response
+
+import osc.conf
+from osc.connection import http_GET
+from osc.http_cache import HttpCache
+
+
+OSCRC = """
+[general]
+apiurl = https://api.example.com
+http_cache_dir = {cache_dir}
+cookiejar = {cookiejar}
+
+[https://api.example.com]
+user = Admin
+pass = opensuse
+http_cache = 1
+http_cache_ttl = {ttl}
+"""
+
+
+def make_response(data=b"<status/>", status=200, headers=None):
+    headers = dict(headers or {})
+    headers.setdefault("Content-Length", str(len(data)))
+    return urllib3.response.HTTPResponse(body=io.BytesIO(data), headers=headers, status=status, preload_content=False)
+
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.cache = HttpCache(self.tmpdir, ttl=0, max_size=1024**2)
+        self.key = HttpCache.get_key("https://api.example.com/source/prj/_meta", "Admin", {})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_store_get(self):
+        response = make_response(headers={"ETag": '"123"', "Content-Type": "application/xml"})
+        response = self.cache.store(self.key, "https://api.example.com/source/prj/_meta", response)
+        self.assertEqual(response.read(), b"<status/>")
+
+        entry = self.cache.get(self.key)
+        self.assertEqual(entry.etag, '"123"')
+        self.assertEqual(entry.to_response().read(), b"<status/>")
+
+        headers = {}
+        entry.add_validators(headers)
+        self.assertEqual(headers, {"If-None-Match": '"123"'})
+
+    def test_key(self):
+        other_user = HttpCache.get_key("https://api.example.com/source/prj/_meta", "other", {})
+        self.assertNotEqual(self.key, other_user)
+
+    def test_no_validators(self):
+        response = self.cache.store(self.key, "url", make_response())
+        self.assertEqual(response.read(), b"<status/>")
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_too_big(self):
+        data = b"x" * 1024**2
+        response = self.cache.store(self.key, "url", make_response(data, headers={"ETag": '"123"'}))
+        self.assertEqual(response.read(), data)
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_ttl(self):
+        self.cache.ttl = 60
+        self.cache.store(self.key, "url", make_response())
+        entry = self.cache.get(self.key)
+        self.assertTrue(self.cache.is_fresh(entry))
+        entry.meta["stored_at"] -= 120
+        self.assertFalse(self.cache.is_fresh(entry))
+
+    def test_evict(self):
+        self.cache.max_size = 100
+        keys = []
+        for i in range(3):
+            key = HttpCache.get_key(f"url{i}", None, {})
+            self.cache.store(key, f"url{i}", make_response(b"x" * 12, headers={"ETag": f'"{i}"'}))
+            old = time.time() - 100 + i
+            os.utime(self.cache.get(key).path + ".json", (old, old))
+            keys.append(key)
+
+        self.cache.max_size = 30
+        self.cache._evict()
+        self.assertIsNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+
+class MockPool:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def urlopen(self, method, url, body=None, headers=None, **kwargs):
+        self.requests.append((method, url, dict(headers)))
+        return self.responses.pop(0)
+
+
+class TestHttpRequestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.url = "https://api.example.com/source/prj/_meta"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _configure(self, ttl=0):
+        oscrc = os.path.join(self.tmpdir, "oscrc")
+        with open(oscrc, "w") as f:
+            f.write(OSCRC.format(cache_dir=os.path.join(self.tmpdir, "cache"), cookiejar=os.path.join(self.tmpdir, "cookiejar"), ttl=ttl))
+        with patch.dict(os.environ, {"OSC_CONFIG": oscrc}):
+            osc.conf.get_config(override_conffile=oscrc, override_no_keyring=True)
+
+    def _request(self, pool):
+        with patch.dict("osc.connection.CONNECTION_POOLS", {"https://api.example.com": pool}):
+            return http_GET(self.url).read()
+
+    def test_not_modified(self):
+        self._configure()
+        pool = MockPool([
+            make_response(b"<project/>", headers={"ETag": '"1"'}),
+            make_response(b"", status=304),
+        ])
+        self.assertEqual(self._request(pool), b"<project/>")
+        self.assertEqual(self._request(pool), b"<project/>")
+        self.assertNotIn("If-None-Match", pool.requests[0][2])
+        self.assertEqual(pool.requests[1][2]["If-None-Match"], '"1"')
+
+    def test_modified(self):
+        self._configure()
+        pool = MockPool([
+            make_response(b"<project/>", headers={"ETag": '"1"'}),
+            make_response(b"<project name='new'/>", headers={"ETag": '"2"'}),
+            make_response(b"", status=304),
+        ])
+        self.assertEqual(self._request(pool), b"<project/>")
+        self.assertEqual(self._request(pool), b"<project name='new'/>")
+        self.assertEqual(self._request(pool), b"<project name='new'/>")
+        self.assertEqual(pool.requests[2][2]["If-None-Match"], '"2"')
+
+    def test_ttl(self):
+        self._configure(ttl=3600)
+        pool = MockPool([make_response(b"<project/>", headers={"ETag": '"1"'})])
+        self.assertEqual(self._request(pool), b"<project/>")
+        self.assertEqual(self._request(pool), b"<project/>")
+        self.assertEqual(len(pool.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import os
+import time
 import unittest
+from unittest.mock import patch
 
 import osc.core
 import osc.oscerr
@@ -86,6 +88,46 @@ class TestPackageStatus(OscTestCase):
         st = p.get_status(True)
         self.assertEqual(exp_st, st)
 
+    def _make_old(self, *paths):
+        # files modified just now are not cached because of possible racy writes
+        mtime = time.time() - 3600
+        for path in paths:
+            os.utime(path, (mtime, mtime))
+
+    def test_stat_cache(self):
+        """the digests of unchanged files are stored in the stat cache and reused"""
+        self._change_to_pkg('simple')
+        self._make_old('test', 'nochange')
+        exp_st = [('A', 'add'), ('?', 'exists'), ('D', 'foo'), ('!', 'merge'), ('R', 'missing'),
+                  ('!', 'missing_added'), ('M', 'nochange'), ('S', 'skipped'), (' ', 'test')]
+        self.assertEqual(exp_st, osc.core.Package('.').get_status())
+        self.assertTrue(os.path.isfile(os.path.join('.osc', '_stat_cache')))
+
+        with patch("osc.util.digest.file_digests") as file_digests:
+            self.assertEqual(exp_st, osc.core.Package('.').get_status())
+            file_digests.assert_not_called()
+
+    def test_stat_cache_modified(self):
+        """a modification changes the stat data and invalidates the cached digest"""
+        self._change_to_pkg('simple')
+        self._make_old('test')
+        p = osc.core.Package('.')
+        self.assertEqual(p.status('test'), ' ')
+        p.save_stat_cache()
+
+        with open('test', 'a') as f:
+            f.write('modified')
+        self._make_old('test')
+        self.assertEqual(osc.core.Package('.').status('test'), 'M')
+
+    def test_stat_cache_racy(self):
+        """recently modified files are not cached"""
+        self._change_to_pkg('simple')
+        os.utime('test')
+        p = osc.core.Package('.')
+        self.assertEqual(p.status('test'), ' ')
+        self.assertNotIn('test', p.stat_cache.entries)
+
 
 if __name__ == '__main__':
     unittest.main()
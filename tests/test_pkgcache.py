@@ -0,0 +1,187 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from osc.pkgcache import HeaderInfo
+from osc.pkgcache import PackageCacheIndex
+from osc.pkgcache import collect_garbage
+from osc.util.packagequery import PackageQuerySnapshot
+
+
+class TestPackageCacheIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.index = PackageCacheIndex(self.tmpdir)
+        self.path = os.path.join(self.tmpdir, "prj", "repo", "x86_64", "foo-1.0-1.x86_64.rpm")
+        os.makedirs(os.path.dirname(self.path))
+        self._write(b"rpm data")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        # files modified just now are not indexed
+        mtime = time.time() - 3600
+        os.utime(self.path, (mtime, mtime))
+
+    def test_add_lookup(self):
+        self.assertIsNone(self.index.lookup(self.path))
+        info = HeaderInfo(canonname="foo-1.0-1.x86_64.rpm", name="foo", epoch="", version="1.0", release="1", arch="x86_64")
+        self.index.add(self.path, info)
+
+        # a new instance reads the persistent index
+        index = PackageCacheIndex(self.tmpdir)
+        info = index.lookup(self.path)
+        index.close()
+        self.assertEqual(info.canonname, "foo-1.0-1.x86_64.rpm")
+        self.assertEqual(info.nevra, "foo-1.0-1.x86_64")
+        self.assertIsNone(info.hdrmd5)
+
+    def test_lookup_modified(self):
+        self.index.add(self.path, HeaderInfo(canonname="foo-1.0-1.x86_64.rpm"))
+        self._write(b"other rpm data")
+        self.assertIsNone(self.index.lookup(self.path))
+
+    @patch("osc.util.packagequery.PackageQuery.queryhdrmd5", return_value="0123456789abcdef0123456789abcdef")
+    def test_get_hdrmd5(self, queryhdrmd5):
+        self.assertEqual(self.index.get_hdrmd5(self.path), "0123456789abcdef0123456789abcdef")
+        self.assertEqual(self.index.get_hdrmd5(self.path), "0123456789abcdef0123456789abcdef")
+        self.assertEqual(queryhdrmd5.call_count, 1)
+
+        self.index.remove(self.path)
+        self.assertIsNone(self.index.lookup(self.path))
+
+    @patch("osc.util.packagequery.PackageQuery.queryhdrmd5", return_value="0123456789abcdef0123456789abcdef")
+    def test_get_hdrmd5_racy(self, queryhdrmd5):
+        os.utime(self.path)
+        self.index.get_hdrmd5(self.path)
+        self.index.get_hdrmd5(self.path)
+        self.assertEqual(queryhdrmd5.call_count, 2)
+
+    def test_verified(self):
+        hdrmd5 = "0123456789abcdef0123456789abcdef"
+        self.assertFalse(self.index.is_verified(self.path, hdrmd5, "keys"))
+        self.index.add_verified([(self.path, hdrmd5)], "keys")
+        self.assertTrue(self.index.is_verified(self.path, hdrmd5, "keys"))
+
+        # verified with different keys
+        self.assertFalse(self.index.is_verified(self.path, hdrmd5, "other-keys"))
+        self.assertFalse(self.index.is_verified(self.path, "fedcba9876543210fedcba9876543210", "keys"))
+
+        self._write(b"other rpm data")
+        self.assertFalse(self.index.is_verified(self.path, hdrmd5, "keys"))
+
+    def test_verified_racy(self):
+        os.utime(self.path)
+        self.index.add_verified([(self.path, "0123456789abcdef0123456789abcdef")], "keys")
+        self.assertFalse(self.index.is_verified(self.path, "0123456789abcdef0123456789abcdef", "keys"))
+
+    def test_snapshots(self):
+        snapshot = PackageQuerySnapshot("RpmQuery", self.path, name=b"foo", provides=[b"foo = 1.0-1"])
+        self.assertIsNone(self.index.get_snapshot(self.path))
+        self.index.add_snapshots([(self.path, snapshot)])
+        result = self.index.get_snapshot(self.path)
+        self.assertEqual(result.to_dict(), snapshot.to_dict())
+
+        self._write(b"other rpm data")
+        self.assertIsNone(self.index.get_snapshot(self.path))
+
+        # files modified just now are not stored
+        os.utime(self.path)
+        self.index.add_snapshots([(self.path, snapshot)])
+        self.assertIsNone(self.index.get_snapshot(self.path))
+
+    def test_prune_snapshots(self):
+        snapshot = PackageQuerySnapshot("RpmQuery", self.path, name=b"foo")
+        self.index.add_snapshots([(self.path, snapshot)])
+        self.index.prune_snapshots()
+        self.assertIsNotNone(self.index.get_snapshot(self.path))
+
+        os.unlink(self.path)
+        self.index.prune_snapshots()
+        self.assertEqual(self.index._execute("SELECT path FROM snapshots"), [])
+
+    def test_unusable_cachedir(self):
+        index = PackageCacheIndex(os.path.join(self.tmpdir, "foo-1.0-1.x86_64.rpm", "not-a-dir"))
+        open(os.path.join(self.tmpdir, "foo-1.0-1.x86_64.rpm"), "w").close()
+        self.assertIsNone(index.lookup(self.path))
+        index.add(self.path, HeaderInfo(canonname="foo-1.0-1.x86_64.rpm"))
+        self.assertIsNone(index.lookup(self.path))
+
+
+class TestCollectGarbage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.repodir = os.path.join(self.tmpdir, "prj", "repo", "x86_64")
+        os.makedirs(self.repodir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, size, age):
+        path = os.path.join(self.repodir, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_lru(self):
+        old = self._write("old.rpm", 100, age=300)
+        new = self._write("new.rpm", 100, age=200)
+        used = self._write("used.rpm", 100, age=100)
+
+        # the oldest file was used by a build recently
+        index = PackageCacheIndex(self.tmpdir)
+        index.touch([old])
+        index.close()
+
+        result = collect_garbage(self.tmpdir, 250)
+        self.assertEqual(result.removed, [new])
+        self.assertEqual(result.freed, 100)
+        self.assertEqual(result.size, 200)
+        self.assertTrue(os.path.exists(old))
+        self.assertTrue(os.path.exists(used))
+
+    def test_keep(self):
+        old = self._write("old.rpm", 100, age=300)
+        new = self._write("new.rpm", 100, age=200)
+
+        result = collect_garbage(self.tmpdir, 150, keep=[old])
+        self.assertEqual(result.removed, [new])
+
+    def test_dry_run(self):
+        old = self._write("old.rpm", 100, age=300)
+        result = collect_garbage(self.tmpdir, 50, dry_run=True)
+        self.assertEqual(result.removed, [old])
+        self.assertTrue(os.path.exists(old))
+
+    def test_stale_preinstall_images(self):
+        image1 = self._write("image1.tar.zst", 100, age=300)
+        image2 = self._write("image2.tar.zst", 100, age=200)
+        index = PackageCacheIndex(self.tmpdir)
+        index.touch([image1], kind="preinstallimage")
+        time.sleep(0.01)
+        index.touch([image2], kind="preinstallimage")
+        index.close()
+
+        # no size limit, only the superseded image is removed
+        result = collect_garbage(self.tmpdir, 0)
+        self.assertEqual(result.removed, [image1])
+        self.assertTrue(os.path.exists(image2))
+
+    def test_remove_empty_dirs(self):
+        self._write("old.rpm", 100, age=300)
+        collect_garbage(self.tmpdir, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "prj")))
+        self.assertTrue(os.path.isdir(self.tmpdir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import os
+import sys
 import unittest
 
 import osc.core
@@ -161,6 +162,33 @@ class TestProjectStatus(OscTestCase):
         p = prj.get_pacobj('doesnotexist')
         self.assertTrue(isinstance(p, type(None)))
 
+    def test_run_checkout_tasks(self):
+        """a failed concurrent checkout doesn't stop the others"""
+        self._change_to_pkg('.')
+        prj = osc.core.Project('.', getPackageList=False)
+
+        def checkout(pac):
+            def func():
+                if pac == 'broken':
+                    raise osc.oscerr.OscIOError(None, 'checkout failed')
+                print(f'checking out {pac}')
+                with prj.packages_lock:
+                    prj.set_state(pac, ' ')
+                    prj.write_packages()
+            return func
+
+        tasks = [(pac, checkout(pac)) for pac in ('new1', 'broken', 'new2')]
+        with self.assertRaises(osc.oscerr.ProjectError):
+            prj.run_checkout_tasks(tasks, jobs=3)
+
+        out = sys.stdout.getvalue()
+        self.assertTrue(out.startswith('checking out new1\nchecking out new2\n'))
+        self.assertIn('3 packages processed: 2 checked out, 0 skipped, 1 failed', out)
+        prj = osc.core.Project('.', getPackageList=False)
+        self.assertEqual(prj.get_state('new1'), ' ')
+        self.assertEqual(prj.get_state('new2'), ' ')
+        self.assertEqual(prj.get_state('broken'), None)
+
 
 if __name__ == '__main__':
     unittest.main()
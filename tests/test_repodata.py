@@ -0,0 +1,169 @@
+import gzip
+import lzma
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from osc.util import repodata
+from osc.util.packagequery import PackageQueries
+
+
+REPOMD = """<?xml version="1.0" encoding="UTF-8"?>
+<repomd xmlns="http://linux.duke.edu/metadata/repo" xmlns:rpm="http://linux.duke.edu/metadata/rpm">
+  <data type="%(type)s">
+    <location href="repodata/%(href)s"/>
+  </data>
+</repomd>
+"""
+
+
+PRIMARY = """<?xml version="1.0" encoding="UTF-8"?>
+<metadata xmlns="http://linux.duke.edu/metadata/common" xmlns:rpm="http://linux.duke.edu/metadata/rpm" packages="3">
+<package type="rpm">
+  <name>foo</name>
+  <arch>x86_64</arch>
+  <version epoch="0" ver="1.0" rel="1.1"/>
+  <description>Foo package</description>
+  <location href="x86_64/foo-1.0-1.1.x86_64.rpm"/>
+  <format>
+    <rpm:provides>
+      <rpm:entry name="foo" flags="EQ" epoch="0" ver="1.0" rel="1.1"/>
+      <rpm:entry name="libfoo.so.1()(64bit)"/>
+    </rpm:provides>
+    <rpm:requires>
+      <rpm:entry name="bar" flags="GE" epoch="0" ver="2"/>
+    </rpm:requires>
+    <file>/usr/bin/foo</file>
+  </format>
+</package>
+<package type="rpm">
+  <name>bar</name>
+  <arch>noarch</arch>
+  <version epoch="0" ver="2.0" rel="1"/>
+  <location href="noarch/bar-2.0-1.noarch.rpm"/>
+  <format/>
+</package>
+<package type="rpm">
+  <name>baz</name>
+  <arch>aarch64</arch>
+  <version epoch="0" ver="3.0" rel="1"/>
+  <location href="aarch64/baz-3.0-1.aarch64.rpm"/>
+  <format/>
+</package>
+</metadata>
+"""
+
+
+PRIMARY_DB_SCHEMA = """
+CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, name TEXT, arch TEXT, version TEXT, epoch TEXT, release TEXT,
+                       description TEXT, location_href TEXT);
+CREATE TABLE provides (name TEXT, flags TEXT, epoch TEXT, version TEXT, release TEXT, pkgKey INTEGER);
+CREATE TABLE requires (name TEXT, flags TEXT, epoch TEXT, version TEXT, release TEXT, pkgKey INTEGER, pre BOOLEAN);
+"""
+
+
+class TestRepoData(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        os.makedirs(os.path.join(self.tmpdir, "repodata"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_repomd(self, data_type, href):
+        with open(os.path.join(self.tmpdir, "repodata", "repomd.xml"), "w") as f:
+            f.write(REPOMD % {"type": data_type, "href": href})
+        return os.path.join(self.tmpdir, "repodata", href)
+
+    def write_primary_xml(self, href, opener):
+        path = self.write_repomd("primary", href)
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(PRIMARY)
+
+    def write_primary_db(self):
+        path = self.write_repomd("primary_db", "primary.sqlite.xz")
+        db_path = os.path.join(self.tmpdir, "primary.sqlite")
+        conn = sqlite3.connect(db_path)
+        conn.executescript(PRIMARY_DB_SCHEMA)
+        conn.executemany(
+            "INSERT INTO packages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (1, "foo", "x86_64", "1.0", "0", "1.1", "Foo package", "x86_64/foo-1.0-1.1.x86_64.rpm"),
+                (2, "bar", "noarch", "2.0", "0", "1", None, "noarch/bar-2.0-1.noarch.rpm"),
+                (3, "baz", "aarch64", "3.0", "0", "1", None, "aarch64/baz-3.0-1.aarch64.rpm"),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO provides VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("foo", "EQ", "0", "1.0", "1.1", 1),
+                ("libfoo.so.1()(64bit)", None, None, None, None, 1),
+                ("baz", "EQ", "0", "3.0", "1", 3),
+            ],
+        )
+        conn.execute("INSERT INTO requires VALUES ('bar', 'GE', '0', '2', NULL, 1, 0)")
+        conn.commit()
+        conn.close()
+
+        with open(db_path, "rb") as f_in, lzma.open(path, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+
+    def assertFoo(self, query):
+        self.assertEqual(query.name(), b"foo")
+        self.assertEqual(query.epoch(), b"0")
+        self.assertEqual(query.version(), b"1.0")
+        self.assertEqual(query.release(), b"1.1")
+        self.assertEqual(query.arch(), b"x86_64")
+        self.assertEqual(query.description(), b"Foo package")
+        self.assertEqual(query.path(), os.path.join(self.tmpdir, "x86_64", "foo-1.0-1.1.x86_64.rpm"))
+        self.assertEqual(query.provides(), [b"foo = 1.0-1.1", b"libfoo.so.1()(64bit)"])
+        self.assertEqual(query.requires(), [b"bar >= 2"])
+        self.assertEqual(query.conflicts(), [])
+        self.assertEqual(query.canonname(), b"foo-1.0-1.1.x86_64.rpm")
+
+    def test_primary_xml_gz(self):
+        self.write_primary_xml("primary.xml.gz", gzip.open)
+        queries = repodata.queries(self.tmpdir)
+        self.assertEqual([i.name() for i in queries], [b"foo", b"bar", b"baz"])
+        self.assertFoo(queries[0])
+
+    def test_primary_xml_xz(self):
+        self.write_primary_xml("primary.xml.xz", lzma.open)
+        queries = repodata.queries(self.tmpdir)
+        self.assertEqual([i.name() for i in queries], [b"foo", b"bar", b"baz"])
+        self.assertFoo(queries[0])
+
+    def test_primary_xml_wanted_arch(self):
+        self.write_primary_xml("primary.xml.gz", gzip.open)
+        queries = repodata.queries(self.tmpdir, "x86_64")
+        self.assertEqual([i.name() for i in queries], [b"foo", b"bar"])
+
+        package_queries = PackageQueries("x86_64")
+        for query in repodata.iter_queries(self.tmpdir, "x86_64"):
+            package_queries.add(query)
+        self.assertEqual(sorted(package_queries), [b"bar", b"foo"])
+
+    def test_primary_db(self):
+        self.write_primary_db()
+        queries = repodata.queries(self.tmpdir)
+        self.assertEqual([i.name() for i in queries], [b"foo", b"bar", b"baz"])
+        self.assertFoo(queries[0])
+        self.assertEqual(queries[1].provides(), [])
+        # the table doesn't exist in the database
+        self.assertEqual(queries[0].recommends(), [])
+
+    def test_primary_db_wanted_arch(self):
+        self.write_primary_db()
+        queries = repodata.queries(self.tmpdir, "aarch64")
+        self.assertEqual([i.name() for i in queries], [b"bar", b"baz"])
+        self.assertEqual(queries[1].provides(), [b"baz = 3.0-1"])
+
+    def test_no_primary(self):
+        self.write_repomd("other", "other.xml.gz")
+        self.assertRaises(OSError, repodata.queries, self.tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,6 +26,16 @@ class TestResults(OscTestCase):
         out = self._run_osc('prjresults', '--xml', 'testproject')
         self.assertEqualMultiline(out, self._get_fixture('result.xml') + '\n')
 
+    @GET('http://localhost/build/testproject/_result', file='result.xml')
+    def testPrjresultsCsv(self):
+        out = self._run_osc('prjresults', '--csv', 'testproject')
+        expected = (
+            "_;SLE_12_SP3/x86_64/published;SLE_12_SP4/x86_64/published;"
+            "openSUSE_Leap_15.0/x86_64/published;openSUSE_Leap_42.3/x86_64/published\n"
+            "python-MarkupSafe;disabled;disabled;disabled;disabled\n"
+        )
+        self.assertEqualMultiline(out, expected)
+
     @GET('http://localhost/build/testproject/_result', file='result-dirty.xml')
     @GET('http://localhost/build/testproject/_result?oldstate=c57e2ee592dbbf26ebf19cc4f1bc1e83', file='result.xml')
     def testPrjresultsWatch(self):
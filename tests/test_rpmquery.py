@@ -0,0 +1,114 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from osc.util.rpmquery import RpmHeaderEntry
+from osc.util.rpmquery import RpmQuery
+
+
+def make_header(entries):
+    """
+    Return a rpm header with ``entries`` that is a list of ``(tag, type, value)`` tuples.
+    """
+    index = b""
+    store = b""
+    alignment = {3: 2, 4: 4, 5: 8}
+    for tag, type, value in entries:
+        align = alignment.get(type, 1)
+        store += b"\0" * (-len(store) % align)
+        offset = len(store)
+        if type in (6, 42):
+            count = 1
+            store += value + b"\0"
+        elif type in (8, 9):
+            count = len(value)
+            store += b"".join(i + b"\0" for i in value)
+        elif type == 7:
+            count = len(value)
+            store += value
+        else:
+            fmt = {3: "h", 4: "i", 5: "q"}[type]
+            count = len(value)
+            store += struct.pack(f"!{count}{fmt}", *value)
+        index += struct.pack("!4i", tag, type, offset, count)
+    return struct.pack("!I3i", RpmQuery.HEADER_MAGIC, 0, len(entries), len(store)) + index + store
+
+
+def make_rpm(path, entries, hdrmd5=b"\x01" * 16):
+    lead = bytearray(RpmQuery.LEAD_SIZE)
+    struct.pack_into("!I", lead, 0, RpmQuery.LEAD_MAGIC)
+    struct.pack_into("!h", lead, 78, RpmQuery.HEADERSIG_TYPE)
+    sig = make_header([(1004, 7, hdrmd5)])
+    # the signature header is padded to 8 bytes
+    sig += b"\0" * (-(len(sig) - RpmHeaderEntry.ENTRY_SIZE) % 8)
+    with open(path, "wb") as f:
+        f.write(bytes(lead) + sig + make_header(entries) + b"payload")
+
+
+class TestRpmQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.path = os.path.join(self.tmpdir, "foo-1.0-1.x86_64.rpm")
+        make_rpm(
+            self.path,
+            [
+                (100, 8, [b"C"]),
+                (1000, 6, b"foo"),
+                (1001, 6, b"1.0"),
+                (1002, 6, b"1"),
+                (1003, 4, [2]),
+                (1004, 9, [b"summary"]),
+                (1022, 6, b"x86_64"),
+                (1044, 6, b"foo-1.0-1.src.rpm"),
+                (1047, 8, [b"foo", b"bar"]),
+                (1112, 4, [8, 0]),
+                (1113, 8, [b"2:1.0-1", b""]),
+                (1049, 8, [b"baz", b"rpmlib(Foo)"]),
+                (1048, 4, [12, 1 << 24]),
+                (1050, 8, [b"1.0", b"1"]),
+                (1028, 3, [1, 2]),
+                (5008, 5, [2**40]),
+            ],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_query(self):
+        rpmq = RpmQuery.query(self.path)
+        self.assertEqual(rpmq.name(), b"foo")
+        self.assertEqual(rpmq.version(), b"1.0")
+        self.assertEqual(rpmq.release(), b"1")
+        self.assertEqual(rpmq.epoch(), 2)
+        self.assertEqual(rpmq.arch(), b"x86_64")
+        self.assertEqual(rpmq.summary(), b"summary")
+        self.assertIsNone(rpmq.url())
+        self.assertEqual(rpmq.provides(), [b"foo = 2:1.0-1", b"bar"])
+        self.assertEqual(rpmq.requires(), [b"baz >= 1.0", b"rpmlib(Foo)"])
+        self.assertEqual(rpmq.canonname(), b"foo-1.0-1.x86_64.rpm")
+        self.assertEqual(rpmq.gettag(1028).data, (1, 2))
+        self.assertEqual(rpmq.gettag(5008).data, (2**40,))
+        self.assertEqual(len(rpmq.header), 16)
+
+    def test_queryhdrmd5(self):
+        self.assertEqual(RpmQuery.queryhdrmd5(self.path), "01" * 16)
+
+    def test_lazy_decoding(self):
+        rpmq = RpmQuery.query(self.path)
+        entry = rpmq.gettag(1000)
+        self.assertFalse(entry._decoded)
+        self.assertEqual(entry.data, b"foo")
+        self.assertTrue(entry._decoded)
+
+    def test_invalid_data(self):
+        make_rpm(self.path, [(1000, 6, b"foo"), (1001, 42, b"unsupported")])
+        rpmq = RpmQuery.query(self.path)
+        self.assertEqual(rpmq.name(), b"foo")
+        # undecodable entries have no data
+        self.assertIsNone(rpmq.gettag(1001).data)
+
+
+if __name__ == "__main__":
+    unittest.main()
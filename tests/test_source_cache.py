@@ -0,0 +1,91 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from osc.obs_scm.source_cache import SourceCache
+from osc.util import digest
+
+
+class TestSourceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.cache = SourceCache(os.path.join(self.tmpdir, "cache"), max_size=1024**2)
+        digest.clear_memo()
+
+    def tearDown(self):
+        digest.clear_memo()
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path, hashlib.md5(data).hexdigest()
+
+    def test_put_get(self):
+        source, md5 = self._write("source", b"data")
+        self.cache.put(md5, source)
+
+        target = os.path.join(self.tmpdir, "target")
+        self.assertTrue(self.cache.get(md5, target))
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"data")
+        self.assertNotEqual(os.stat(target).st_ino, os.stat(self.cache.get_path(md5)).st_ino)
+
+    def test_get_hardlink(self):
+        source, md5 = self._write("source", b"data")
+        self.cache.put(md5, source)
+
+        target = os.path.join(self.tmpdir, "target")
+        self.assertTrue(self.cache.get(md5, target, hardlink=True))
+        self.assertEqual(os.stat(target).st_ino, os.stat(self.cache.get_path(md5)).st_ino)
+
+    def test_get_missing(self):
+        target = os.path.join(self.tmpdir, "target")
+        self.assertFalse(self.cache.get(hashlib.md5(b"data").hexdigest(), target))
+        self.assertFalse(os.path.exists(target))
+
+    def test_put_wrong_md5(self):
+        source, _ = self._write("source", b"data")
+        md5 = hashlib.md5(b"other data").hexdigest()
+        self.cache.put(md5, source)
+        self.assertFalse(os.path.exists(self.cache.get_path(md5)))
+
+    def test_get_modified(self):
+        source, md5 = self._write("source", b"data")
+        self.cache.put(md5, source)
+
+        # a hardlinked file got modified in place
+        with open(self.cache.get_path(md5), "wb") as f:
+            f.write(b"modified")
+
+        target = os.path.join(self.tmpdir, "target")
+        self.assertFalse(self.cache.get(md5, target))
+        self.assertFalse(os.path.exists(self.cache.get_path(md5)))
+
+    def test_invalid_md5(self):
+        self.assertRaises(ValueError, self.cache.get_path, "../../etc/passwd")
+
+    def test_evict(self):
+        self.cache.max_size = 10
+        self.cache.MIN_AGE = 0
+
+        source1, md5_1 = self._write("source1", b"12345678")
+        self.cache.put(md5_1, source1)
+        # make the first file the least recently used one
+        old = time.time() - 3600
+        os.utime(self.cache.get_path(md5_1) + SourceCache.USED_SUFFIX, (old, old))
+
+        source2, md5_2 = self._write("source2", b"abcdefgh")
+        self.cache.put(md5_2, source2)
+
+        self.assertFalse(os.path.exists(self.cache.get_path(md5_1)))
+        self.assertTrue(os.path.exists(self.cache.get_path(md5_2)))
+        self.assertEqual(self.cache.size, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import os
 import shutil
 import tempfile
@@ -5,6 +6,8 @@ import unittest
 
 from osc.util.cpio import CpioRead
 from osc.util.cpio import CpioError
+from osc.util.cpio import CpioStreamRead
+from osc.util.cpio import CpioWrite
 
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
@@ -26,6 +29,12 @@ class TestCpio(unittest.TestCase):
         os.chdir(self.old_cwd)
         shutil.rmtree(self.tmpdir)
 
+    @staticmethod
+    def read_fixture():
+        archive = CpioRead(os.path.join(FIXTURES_DIR, "archive.cpio"))
+        archive.read()
+        return list(archive)
+
     def test_file_list(self):
         actual = [i.filename for i in self.cpio]
         expected = [
@@ -67,5 +76,98 @@ class TestCpio(unittest.TestCase):
             self.assertEqual(f.read(), "file-in-a-dir\n")
 
 
+class ShortReadStream(io.RawIOBase):
+    """
+    A non-seekable stream that returns at most 3 bytes per read() call
+    to simulate chunked network reads.
+    """
+
+    def __init__(self, data):
+        super().__init__()
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self.data.read(min(len(b), 3))
+        b[:len(data)] = data
+        return len(data)
+
+
+class TestCpioStream(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        with open(os.path.join(FIXTURES_DIR, "archive.cpio"), "rb") as f:
+            self.data = f.read()
+        self.cpio = CpioStreamRead(ShortReadStream(self.data), bufsize=5)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_file_list(self):
+        actual = [i.filename for i in self.cpio]
+        expected = [i.filename for i in TestCpio.read_fixture()]
+        self.assertEqual(actual, expected)
+
+    def test_consumes_trailer_padding(self):
+        stream = ShortReadStream(self.data)
+        list(CpioStreamRead(stream))
+        self.assertEqual(stream.read(), b"")
+
+    def test_copyin_file(self):
+        paths = {}
+        for hdr in self.cpio:
+            if hdr.filename in (b"a\nb", b"dir/file"):
+                paths[hdr.filename] = self.cpio.copyin_file(hdr, dest=self.tmpdir)
+
+        self.assertEqual(paths[b"a\nb"], os.path.join(self.tmpdir, "a\nb"))
+        with open(paths[b"a\nb"], "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "newline\n")
+
+        self.assertEqual(paths[b"dir/file"], os.path.join(self.tmpdir, "dir/file"))
+        with open(paths[b"dir/file"], "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "file-in-a-dir\n")
+
+    def test_copyin_file_new_fn(self):
+        for hdr in self.cpio:
+            if hdr.filename == b"a\nb":
+                path = self.cpio.copyin_file(hdr, dest=self.tmpdir, new_fn="renamed")
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "newline\n")
+
+    def test_copyin_file_abspath(self):
+        hdr = next(iter(self.cpio))
+        self.assertEqual(hdr.filename, b"/tmp/foo")
+        self.assertRaises(CpioError, self.cpio.copyin_file, hdr, self.tmpdir)
+
+    def test_copyin_file_previous_member(self):
+        it = iter(self.cpio)
+        hdr = next(it)
+        next(it)
+        self.assertRaises(CpioError, self.cpio.copyin_file, hdr, self.tmpdir, "foo")
+
+    def test_large_member(self):
+        content = os.urandom(100003)
+        archive = CpioWrite()
+        archive.add(b"large", content)
+        archive.add(b"small", b"data")
+        stream = CpioStreamRead(ShortReadStream(archive.get()), bufsize=4096)
+        result = {}
+        for hdr in stream:
+            f = io.BytesIO()
+            stream.copyfileobj(hdr, f)
+            result[hdr.filename] = f.getvalue()
+        self.assertEqual(result, {b"large": content, b"small": b"data"})
+
+    def test_truncated(self):
+        stream = CpioStreamRead(ShortReadStream(self.data[:200]))
+        self.assertRaises(CpioError, list, stream)
+
+    def test_unsupported_format(self):
+        stream = CpioStreamRead(ShortReadStream(b"x" * 200))
+        self.assertRaises(CpioError, list, stream)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from osc.util import digest
+
+
+class TestFileDigests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="osc_test_")
+        self.path = os.path.join(self.tmpdir, "file")
+        digest.clear_memo()
+
+    def tearDown(self):
+        digest.clear_memo()
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, data, old=True):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        if old:
+            # files modified just now are not memoized
+            mtime = time.time() - 3600
+            os.utime(self.path, (mtime, mtime))
+
+    def test_digests(self):
+        data = b"osc" * 1000
+        self._write(data)
+        result = digest.file_digests(self.path, ["md5", "sha256"])
+        self.assertEqual(result, {
+            "md5": hashlib.md5(data).hexdigest(),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+
+    def test_empty_file(self):
+        self._write(b"")
+        result = digest.file_digests(self.path, ["md5"])
+        self.assertEqual(result, {"md5": hashlib.md5(b"").hexdigest()})
+
+    def test_mmap(self):
+        data = os.urandom(digest.BUFSIZE) * 5 + b"tail"
+        self._write(data)
+        self.assertGreaterEqual(len(data), digest.MMAP_THRESHOLD)
+        result = digest.file_digests(self.path, ["md5", "sha256"])
+        self.assertEqual(result["md5"], hashlib.md5(data).hexdigest())
+        self.assertEqual(result["sha256"], hashlib.sha256(data).hexdigest())
+
+    def test_memo(self):
+        self._write(b"data")
+        digest.file_digests(self.path, ["md5"])
+        with patch("osc.util.digest._update_hashes") as update_hashes:
+            digest.file_digests(self.path, ["md5"])
+            update_hashes.assert_not_called()
+
+            # a missing algorithm requires reading the file again
+            digest.file_digests(self.path, ["md5", "sha256"])
+            self.assertEqual(len(update_hashes.call_args[0][2]), 1)
+
+    def test_memo_modified(self):
+        self._write(b"data")
+        digest.file_digests(self.path, ["md5"])
+        self._write(b"changed")
+        result = digest.file_digests(self.path, ["md5"])
+        self.assertEqual(result["md5"], hashlib.md5(b"changed").hexdigest())
+
+    def test_memo_racy(self):
+        self._write(b"data", old=False)
+        digest.file_digests(self.path, ["md5"])
+        self.assertEqual(digest._MEMO, {})
+
+    def test_hdrmd5_not_rpm(self):
+        self._write(b"not a rpm")
+        result = digest.file_digests(self.path, ["md5", digest.HDRMD5])
+        self.assertEqual(result[digest.HDRMD5], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import sys
+import threading
+import time
+import unittest
+
+from osc.util.parallel import ThreadStdout
+from osc.util.parallel import run_tasks
+from osc.util.parallel import run_tasks_and_report
+
+
+class TestRunTasks(unittest.TestCase):
+    def test_ordered_results(self):
+        def task(num):
+            def func():
+                # finish the tasks in the reversed order
+                time.sleep((5 - num) * 0.01)
+                print(f"task {num} line 1")
+                print(f"task {num} line 2")
+                return num * 10
+            return func
+
+        tasks = [(f"task{i}", task(i)) for i in range(5)]
+        results = list(run_tasks(tasks, jobs=5))
+
+        self.assertEqual([i.name for i in results], [f"task{i}" for i in range(5)])
+        self.assertEqual([i.result for i in results], [0, 10, 20, 30, 40])
+        self.assertEqual(results[3].output, "task 3 line 1\ntask 3 line 2\n")
+        self.assertTrue(all(i.ok for i in results))
+
+    def test_concurrency(self):
+        barrier = threading.Barrier(3, timeout=5)
+        tasks = [(str(i), barrier.wait) for i in range(3)]
+        results = list(run_tasks(tasks, jobs=3))
+        self.assertTrue(all(i.ok for i in results))
+
+    def test_exception(self):
+        def fail():
+            print("before failure")
+            raise ValueError("failed")
+
+        results = list(run_tasks([("ok", lambda: 1), ("fail", fail)], jobs=2))
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].exception, ValueError)
+        self.assertEqual(results[1].output, "before failure\n")
+
+    def test_base_exception(self):
+        def exit():
+            sys.exit(1)
+
+        self.assertRaises(SystemExit, list, run_tasks([("exit", exit)], jobs=1))
+
+    def test_stdout_restored(self):
+        stdout = sys.stdout
+        list(run_tasks([("task", lambda: None)], jobs=1))
+        self.assertIs(sys.stdout, stdout)
+        self.assertNotIsInstance(sys.stdout, ThreadStdout)
+
+
+class TestRunTasksAndReport(unittest.TestCase):
+    def test_report(self):
+        def fail():
+            print("failing")
+            raise ValueError("failed")
+
+        def ok():
+            print("ok")
+            return 1
+
+        output = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            results = run_tasks_and_report([("fail", fail), ("ok", ok)], jobs=2, error_prefix="Failed to run ", output=output)
+
+        self.assertEqual([(i.name, i.ok) for i in results], [("fail", False), ("ok", True)])
+        self.assertEqual(output.getvalue(), "failing\nok\n")
+        self.assertEqual(stderr.getvalue(), "Failed to run fail: failed\n")
+
+    def test_report_inline(self):
+        output = io.StringIO()
+        thread = threading.current_thread()
+
+        def first():
+            print("first")
+            raise ValueError("failed")
+
+        def second():
+            # the tasks run in the calling thread and their output isn't held back
+            self.assertIs(threading.current_thread(), thread)
+            self.assertEqual(output.getvalue(), "first\n")
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            results = run_tasks_and_report([("first", first), ("second", second)], jobs=1, output=output)
+
+        self.assertEqual([i.ok for i in results], [False, True])
+        self.assertEqual(stderr.getvalue(), "first: failed\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import unittest
+from xml.etree import ElementTree as ET
+
+from osc.util.xml import xml_iterchildren
+from osc.util.xml import xml_iterparse
+from osc.util.xml import xml_parse
+
+
+DATA = b"""<?xml version="1.0"?>
+<collection matches="2">
+  <request id="1"><state name="new"/></request>
+  <other/>
+  <request id="2"><state name="review"/></request>
+</collection>
+"""
+
+
+class ReadCounter(io.BytesIO):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def read(self, *args):
+        self.reads += 1
+        return super().read(*args)
+
+
+class TestXmlIterparse(unittest.TestCase):
+    def test_events(self):
+        events = [(event, element.tag) for event, element in xml_iterparse(io.BytesIO(DATA), chunk_size=10)]
+        self.assertEqual(events[0], ("end", "state"))
+        self.assertEqual(events[-1], ("end", "collection"))
+        self.assertEqual(len(events), 6)
+
+    def test_incremental(self):
+        f = ReadCounter(DATA)
+        events = xml_iterparse(f, chunk_size=10)
+        next(events)
+        # the first element is available before the whole document is read
+        self.assertLess(f.tell(), len(DATA))
+        self.assertLess(f.reads, len(DATA) // 10)
+
+    def test_str(self):
+        root = xml_parse(io.StringIO(DATA.decode("utf-8")), stream=True).getroot()
+        self.assertEqual(root.tag, "collection")
+        self.assertEqual(len(root), 3)
+
+    def test_parse_stream(self):
+        root = xml_parse(io.BytesIO(DATA), stream=True).getroot()
+        self.assertEqual(ET.tostring(root), ET.tostring(xml_parse(io.BytesIO(DATA)).getroot()))
+
+    def test_error_context(self):
+        data = b"<root>\n" + b"<a/>\n" * 1000 + b"<b>broken\x01</b>\n</root>\n"
+        with self.assertRaises(ET.ParseError) as cm:
+            list(xml_iterparse(io.BytesIO(data), chunk_size=100, context_size=200))
+        self.assertIn("0x01</b>", cm.exception.msg)
+
+        # the same message as without streaming
+        with self.assertRaises(ET.ParseError) as cm_parse:
+            xml_parse(io.BytesIO(data))
+        self.assertEqual(cm.exception.msg, cm_parse.exception.msg)
+
+    def test_error_context_dropped(self):
+        # the error position is no longer in the buffer
+        data = b"<root>" + b"<a/>" * 1000 + b"<b>broken\x01</b></root>"
+        with self.assertRaises(ET.ParseError) as cm:
+            list(xml_iterparse(io.BytesIO(data), chunk_size=100, context_size=1))
+        self.assertNotIn("0x01", cm.exception.msg)
+
+
+class TestXmlIterchildren(unittest.TestCase):
+    def test_iterchildren(self):
+        children = list(xml_iterchildren(io.BytesIO(DATA), chunk_size=10))
+        self.assertEqual([i.tag for i in children], ["request", "other", "request"])
+        self.assertEqual(children[0].find("state").get("name"), "new")
+
+    def test_tag(self):
+        children = list(xml_iterchildren(io.BytesIO(DATA), "request"))
+        self.assertEqual([i.get("id") for i in children], ["1", "2"])
+
+    def test_empty_root(self):
+        self.assertEqual(list(xml_iterchildren(io.BytesIO(b"<collection/>"))), [])
+
+
+if __name__ == "__main__":
+    unittest.main()